@@ -0,0 +1,160 @@
+"""
+LLM Response Cache - Content-addressed SQLite cache for provider calls
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable
+
+CACHE_DB_PATH = os.path.join(os.path.dirname(__file__), "..", "llm_cache.db")
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 5000
+
+# Creative calls where users expect a fresh draft every time they click "generate".
+DEFAULT_UNCACHED_METHODS = frozenset({
+    "generate_cover_letter",
+    "suggest_projects",
+    "generate_interview_question",
+    "generate_coding_problem",
+})
+
+def make_cache_key(model: str, method: str, system_prompt: str, user_prompt: str, temperature: float,
+                   response_format: Optional[Dict[str, Any]] = None) -> str:
+    """Content address for one LLM call (response_format included: JSON mode changes the reply)"""
+    payload = json.dumps([model, method, system_prompt, user_prompt, temperature, response_format],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """Persistent LLM response cache with TTL expiry and size-bounded LRU eviction"""
+
+    def __init__(self, db_path: str = CACHE_DB_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, uncached_methods: Iterable[str] = DEFAULT_UNCACHED_METHODS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.uncached_methods = frozenset(uncached_methods)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    method TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache(last_accessed_at)")
+
+    def is_cacheable(self, method: Optional[str]) -> bool:
+        """Whether responses for this provider method may be served from cache"""
+        return bool(method) and method not in self.uncached_methods
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss/expiry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                conn.execute(
+                    "UPDATE llm_cache SET last_accessed_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                    (now, key),
+                )
+                with self._lock:
+                    self._hits += 1
+                return row[0]
+            if row:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, method: str, model: str, response: str):
+        """Store a response and evict expired / least recently used entries"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO llm_cache (key, method, model, response, created_at, last_accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, method, model, response, now, now))
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_accessed_at ASC LIMIT ?
+                    )
+                """, (count - self.max_entries,))
+
+    def delete(self, key: str):
+        """Drop one cached response (e.g. a reply that no longer decodes)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def clear(self) -> int:
+        """Drop every cached response"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM llm_cache").rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus on-disk entry count"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "uncached_methods": sorted(self.uncached_methods),
+        }
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache configured from environment (None when disabled)"""
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            uncached = os.getenv("LLM_CACHE_UNCACHED_METHODS")
+            _cache = LLMResponseCache(
+                ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+                uncached_methods=(
+                    [m.strip() for m in uncached.split(",") if m.strip()]
+                    if uncached is not None else DEFAULT_UNCACHED_METHODS
+                ),
+            )
+        return _cache
@@ -0,0 +1,119 @@
+"""
+JSON Repair - Single-pass decoder for LLM JSON replies
+
+Finds the first top-level JSON value in a reply (ignoring prose or code fences around
+it) with one linear scan that tracks string/escape state and bracket depth, so it never
+backtracks like a greedy regex. If the reply was cut off mid-value (max_tokens, dropped
+stream) it is repaired by cutting back to the last complete value and closing every
+open container, instead of discarding the whole response. A repair never invents an empty
+container: when nothing complete is left to keep, decoding fails like any other bad reply.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON value can be recovered from a reply"""
+
+def _find_start(text: str, expect: Optional[str]) -> int:
+    if expect == "object":
+        return text.find("{")
+    if expect == "array":
+        return text.find("[")
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return min(starts) if starts else -1
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[Tuple[int, str]], str]:
+    """
+    Scan one JSON value starting at text[start]
+
+    Returns:
+        (end index if the value closed, safe cut points as (index, closers), closers still open)
+    """
+    stack: List[str] = []
+    # Per open container: True when the next string in an object is a key
+    expect_key: List[bool] = []
+    safe_points: List[Tuple[int, str]] = []
+    in_string = False
+    escape = False
+    string_is_key = False
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if not string_is_key:
+                    safe_points.append((i + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+        elif ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == "{" and expect_key[-1]
+        elif ch in "{[":
+            # Not a cut point: cutting right after an opener invents an empty container
+            stack.append(ch)
+            expect_key.append(ch == "{")
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                break
+            stack.pop()
+            expect_key.pop()
+            if not stack:
+                return i + 1, safe_points, ""
+            safe_points.append((i + 1, "".join(_CLOSERS[c] for c in reversed(stack))))
+        elif ch == ",":
+            if stack:
+                safe_points.append((i, "".join(_CLOSERS[c] for c in reversed(stack))))
+                expect_key[-1] = stack[-1] == "{"
+        elif ch == ":":
+            if stack:
+                expect_key[-1] = False
+        i += 1
+    return None, safe_points, "".join(_CLOSERS[c] for c in reversed(stack))
+
+def decode_json(text: str, expect: Optional[str] = None, max_repairs: int = 8) -> Any:
+    """
+    Decode the first JSON object/array in text, repairing truncated output
+
+    Args:
+        text: Raw model reply
+        expect: "object", "array" or None (whichever comes first)
+        max_repairs: How many cut points to try (from the end) before giving up; 0 only
+            accepts a complete value
+
+    Returns:
+        Decoded JSON value
+    """
+    text = text or ""
+    try:
+        value = json.loads(text)
+        if expect is None or isinstance(value, dict if expect == "object" else list):
+            return value
+    except json.JSONDecodeError:
+        pass
+
+    start = _find_start(text, expect)
+    if start == -1:
+        raise JSONRepairError("No JSON value found in response")
+    end, safe_points, _ = _scan(text, start)
+    if end is not None:
+        try:
+            return json.loads(text[start:end])
+        except json.JSONDecodeError:
+            # Closed but invalid inside (e.g. trailing comma): fall through to the cut points.
+            pass
+
+    for cut, closers in reversed(safe_points[-max_repairs:] if max_repairs > 0 else []):
+        candidate = text[start:cut].rstrip().rstrip(",") + closers
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if value:  # A repair that keeps nothing is not a recovery
+            return value
+    raise JSONRepairError("Could not repair truncated JSON response")
@@ -0,0 +1,215 @@
+"""
+Prompt Budget - Compact serialization and per-method token budgets for prompt payloads
+
+Structured inputs (JDExtract, ResumeParse, score breakdowns, ...) are serialized
+without indentation or empty fields, restricted to the sections each task needs and
+trimmed to a per-method token budget. Sent tokens are tracked per method for /api/metrics,
+and with PROMPT_STATS_BASELINE=1 so are the savings against the previous full, indented
+serialization.
+"""
+import json
+import math
+import os
+import threading
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+# Input-payload token budgets per provider method (instructions are not counted)
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+TOKEN_BUDGETS: Dict[str, int] = {
+    "build_evidence_map": 5000,
+    "suggest_top_fixes": 3000,
+    "rewrite_bullet": 800,
+    "rewrite_bullets_batch": 3000,
+    "optimize_resume_parse": 8000,
+    "generate_cover_letter": 1500,
+    "suggest_projects": 2000,
+    "generate_roadmap": 1500,
+    "generate_interview_question": 1000,
+    "score_star_response": 1000,
+    "generate_coding_problem": 1000,
+    "review_code": 3000,
+}
+
+# Serialize/measure rounds per section when trimming to budget (binary search on the kept fraction)
+_TRIM_SEARCH_STEPS = 8
+# Savings against the old indented serialization cost a second serialization per call: opt in
+TRACK_BASELINE = os.getenv("PROMPT_STATS_BASELINE", "").lower() in ("1", "true", "yes")
+
+_encoder = None
+
+def load_tokenizer() -> bool:
+    """
+    Load tiktoken's cl100k_base encoding (the first load may download its BPE file)
+
+    Called once at startup, off the request path; until it succeeds token counts use the
+    chars/4 estimate, so a request never waits on the download.
+
+    Returns:
+        True when tiktoken is in use
+    """
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # tiktoken is optional (and needs its BPE file)
+            _encoder = None
+    return _encoder is not None
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when loaded, else a chars/4 estimate"""
+    encoder = _encoder
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def prune_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings, empty lists and empty dicts"""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+def pick(data: Optional[Dict[str, Any]], keys: Iterable[str]) -> Dict[str, Any]:
+    """Subset of a dict (missing keys skipped)"""
+    data = data or {}
+    return {k: data[k] for k in keys if k in data}
+
+def compact_json(value: Any) -> str:
+    """Serialize without whitespace or empty fields"""
+    return json.dumps(prune_empty(value), separators=(",", ":"), ensure_ascii=False)
+
+def _keep_fraction(value: Any, fraction: float) -> Any:
+    """Copy of value with every list cut to its leading ceil(len * fraction) items (at least one)"""
+    if isinstance(value, dict):
+        return {k: _keep_fraction(v, fraction) for k, v in value.items()}
+    if isinstance(value, list):
+        keep = max(1, math.ceil(len(value) * fraction)) if value else 0
+        return [_keep_fraction(v, fraction) for v in value[:keep]]
+    return value
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def _trim_to(value: Any, tokens: int, budget: int) -> Tuple[str, int]:
+    """
+    Largest leading share of value's lists that fits budget tokens
+
+    Starts from the proportional guess budget/tokens and binary-searches the kept fraction,
+    serializing and measuring once per step. Returns (text, tokens) of the best fit, or of
+    the smallest cut (one item per list) when nothing fits.
+    """
+    low, high = 0.0, 1.0
+    guess = max(0.0, min(1.0, budget / tokens)) if tokens else 1.0
+    best = None
+    for _ in range(_TRIM_SEARCH_STEPS):
+        candidate = _serialize(_keep_fraction(value, guess))
+        candidate_tokens = estimate_tokens(candidate)
+        if candidate_tokens <= budget:
+            best = (candidate, candidate_tokens)
+            low = guess
+        else:
+            high = guess
+        if high - low < 0.01:
+            break
+        guess = (low + high) / 2
+    if best is None:
+        smallest = _serialize(_keep_fraction(value, 0.0))
+        best = (smallest, estimate_tokens(smallest))
+    return best
+
+class PromptStats:
+    """Thread-safe per-method counters of payload bytes/tokens before and after compaction"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_method: Dict[str, Dict[str, int]] = {}
+
+    def record(self, method: str, baseline_text: Any, sent_text: str, trimmed: bool,
+               sent_tokens: Optional[int] = None):
+        """
+        Count one call
+
+        Args:
+            baseline_text: What the prompt used to embed, or a function producing it; only
+                           evaluated when baseline tracking (PROMPT_STATS_BASELINE) is on
+            sent_tokens: Token count of sent_text when the caller already measured it
+        """
+        if sent_tokens is None:
+            sent_tokens = estimate_tokens(sent_text)
+        baseline_bytes = baseline_tokens = 0
+        if TRACK_BASELINE:
+            baseline_text = baseline_text() if callable(baseline_text) else baseline_text
+            baseline_bytes = len(baseline_text.encode("utf-8"))
+            baseline_tokens = estimate_tokens(baseline_text)
+        with self._lock:
+            entry = self._by_method.setdefault(method, {
+                "calls": 0, "trimmed_calls": 0, "baseline_bytes": 0, "sent_bytes": 0,
+                "baseline_tokens": 0, "sent_tokens": 0,
+            })
+            entry["calls"] += 1
+            entry["trimmed_calls"] += int(trimmed)
+            entry["baseline_bytes"] += baseline_bytes
+            entry["sent_bytes"] += len(sent_text.encode("utf-8"))
+            entry["baseline_tokens"] += baseline_tokens
+            entry["sent_tokens"] += sent_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            methods = {m: dict(e) for m, e in self._by_method.items()}
+        if not TRACK_BASELINE:
+            return {"tokenizer": "tiktoken" if _encoder is not None else "chars/4", "baseline": False,
+                    "sent_tokens": sum(e["sent_tokens"] for e in methods.values()), "methods": methods}
+        for entry in methods.values():
+            entry["bytes_saved_per_call"] = (entry["baseline_bytes"] - entry["sent_bytes"]) // entry["calls"]
+            entry["tokens_saved_per_call"] = (entry["baseline_tokens"] - entry["sent_tokens"]) // entry["calls"]
+        baseline = sum(e["baseline_tokens"] for e in methods.values())
+        sent = sum(e["sent_tokens"] for e in methods.values())
+        return {
+            "tokenizer": "tiktoken" if _encoder is not None else "chars/4",
+            "baseline": True,
+            "tokens_saved": baseline - sent,
+            "tokens_saved_ratio": round(1 - sent / baseline, 3) if baseline else 0.0,
+            "methods": methods,
+        }
+
+_stats = PromptStats()
+
+def get_prompt_stats() -> PromptStats:
+    return _stats
+
+def render_sections(method: str, sections: Dict[str, Any], baseline: Dict[str, Any],
+                    protect: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Serialize the payload sections of one prompt within the method's token budget
+
+    Args:
+        method: Provider method name (selects the budget and stats bucket)
+        sections: Section name -> already-selected data to send
+        baseline: Section name -> full data the prompt used to embed (for savings stats)
+        protect: Sections that must be sent whole (e.g. the resume being rewritten)
+
+    Returns:
+        Section name -> compact JSON string
+    """
+    budget = TOKEN_BUDGETS.get(method, DEFAULT_TOKEN_BUDGET)
+    data = {name: prune_empty(value) for name, value in sections.items()}
+    rendered = {name: _serialize(value) for name, value in data.items()}
+    tokens = {name: estimate_tokens(text) for name, text in rendered.items()}
+    trimmed = False
+    # Over budget: cut the largest sections first, each to what the others leave it. Lists keep
+    # their leading items (oldest bullets / lowest-priority entries come last in every schema we send).
+    for name in sorted((n for n in rendered if n not in protect), key=lambda n: tokens[n], reverse=True):
+        excess = sum(tokens.values()) - budget
+        if excess <= 0:
+            break
+        rendered[name], tokens[name] = _trim_to(data[name], tokens[name], tokens[name] - excess)
+        trimmed = True
+    sent_text = "\n".join(rendered.values())
+    _stats.record(method, lambda: "\n".join(json.dumps(v, indent=2) for v in baseline.values()),
+                  sent_text, trimmed, sent_tokens=sum(tokens.values()))
+    return rendered
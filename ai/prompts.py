@@ -0,0 +1,601 @@
+"""
+Prompt Builders - Provider-agnostic prompts and response decoding for every AIProvider method
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from ai.json_repair import decode_json, JSONRepairError
+from ai.prompt_budget import render_sections, pick
+from core.schemas import JDExtract, ResumeParse, EvidenceMap, BulletRewriteBatch
+from core.skill_taxonomy import get_skill_taxonomy
+
+@dataclass
+class LLMCall:
+    """One chat completion: prompts, sampling settings and how to decode the reply"""
+    method: str
+    system_prompt: str
+    user_prompt: str
+    temperature: float
+    decode: Callable[[str], Any]
+    # Expected reply shape: "object" requests JSON mode; schema upgrades it to structured output
+    json_output: Optional[str] = None
+    schema: Optional[Type[BaseModel]] = None
+    # False when a repeated prompt needs a fresh reply (repair retries), so the cache is bypassed
+    cacheable: bool = True
+
+    def decode_reply(self, response: str) -> Tuple[Any, bool]:
+        """
+        Decode a reply
+
+        Returns:
+            (decoded value, clean); clean is False when only the decoder's fallback produced a
+            value or the reply had to be repaired, so it must not be cached. Raises when the
+            decoder has no fallback.
+        """
+        strict = getattr(self.decode, "strict", None)
+        if strict is None:
+            return self.decode(response), bool(response)
+        try:
+            return strict(response), True
+        except Exception:
+            return self.decode(response), False
+
+_RAISE = object()
+
+# Sections of JDExtract / ResumeParse that the matching and scoring tasks need
+_JD_SKILLS = ("must_have_skills", "nice_to_have_skills", "keywords")
+_JD_CORE = ("role_title", "seniority") + _JD_SKILLS + ("languages", "frameworks", "tools", "responsibilities", "domain")
+_RESUME_CONTENT = ("skills", "experience", "projects", "certifications", "extracurriculars", "education")
+
+def _matches_schema(value: Any, schema: Optional[Type[BaseModel]]) -> bool:
+    if schema is None:
+        return True
+    try:
+        schema.model_validate(value)
+        return True
+    except ValidationError:
+        return False
+
+def json_decoder(fallback: Any = _RAISE, error_message: str = "Failed to parse response as JSON",
+                 expect: str = "object", schema: Optional[Type[BaseModel]] = None) -> Callable[[str], Any]:
+    """
+    Build a decoder that parses (and repairs truncated) JSON replies, returning fallback (or raising) when unparseable
+
+    A repaired reply is only accepted when it still validates against schema. The decoder's
+    `strict` attribute accepts only a complete (unrepaired) value and raises otherwise, so
+    truncated replies are never cached (see LLMCall.decode_reply).
+    """
+    def decode(response: str) -> Any:
+        try:
+            return decode_json(response or "", expect=expect, max_repairs=0)
+        except JSONRepairError:
+            pass
+        try:
+            value = decode_json(response or "", expect=expect)
+            if _matches_schema(value, schema):
+                return value
+        except JSONRepairError:
+            pass
+        if fallback is _RAISE:
+            raise Exception(error_message)
+        return fallback() if callable(fallback) else fallback
+
+    def strict(response: str) -> Any:
+        try:
+            return decode_json(response or "", expect=expect, max_repairs=0)
+        except JSONRepairError:
+            raise Exception(error_message)
+    decode.strict = strict
+    return decode
+
+def response_format_for(call: LLMCall, structured: bool) -> Optional[Dict[str, Any]]:
+    """
+    OpenAI response_format for a call
+
+    Args:
+        call: The call being made
+        structured: Whether the model supports json_schema structured outputs
+
+    Returns:
+        json_schema format, json_object format, or None for free text / top-level arrays
+    """
+    if call.json_output != "object":
+        return None
+    if structured and call.schema is not None:
+        return {
+            "type": "json_schema",
+            # Non-strict: several schemas use free-form dicts (skills, details) that strict mode rejects.
+            "json_schema": {"name": call.schema.__name__, "schema": call.schema.model_json_schema(), "strict": False},
+        }
+    return {"type": "json_object"}
+
+def _decode_text(response: str) -> str:
+    return (response or "").strip()
+
+def _decode_bullet(response: str) -> str:
+    return (response or "").strip().strip('"').strip("'")
+
+def extract_jd_call(jd_text: str) -> LLMCall:
+    system_prompt = """You are an expert at analyzing job descriptions. Extract structured information and return ONLY valid JSON matching the JDExtract schema."""
+
+    user_prompt = f"""Extract structured information from this job description:
+
+{jd_text}
+
+Return a JSON object with these exact fields:
+- role_title: string
+- seniority: one of "intern", "junior", "mid", "senior"
+- must_have_skills: array of strings
+- nice_to_have_skills: array of strings
+- languages: array of strings (programming languages)
+- frameworks: array of strings
+- tools: array of strings
+- responsibilities: array of strings
+- keywords: array of strings (ATS keywords)
+- domain: string (e.g., "telecom", "fintech", "web", "mobile")
+
+Return ONLY the JSON, no markdown, no explanation."""
+
+    return LLMCall("extract_jd", system_prompt, user_prompt, 0.2,
+                   json_decoder(error_message="Failed to parse JD extraction as JSON", schema=JDExtract),
+                   json_output="object", schema=JDExtract)
+
+def parse_resume_call(resume_text: str) -> LLMCall:
+    system_prompt = """You are an expert at parsing resumes. Extract structured information and return ONLY valid JSON matching the ResumeParse schema."""
+
+    user_prompt = f"""Parse this resume text into structured format:
+
+{resume_text}
+
+Return a JSON object with these exact fields:
+- identity: object with name, email, city, platforms (dict with linkedin, github, portfolio, etc.)
+- skills: object with grouped categories (e.g., "languages": [...], "frameworks": [...], "tools": [...])
+- experience: array of objects, each with company, role, dates, bullets (array of strings)
+- projects: array of objects, each with title, tech_stack (array), bullets (array of strings)
+- certifications: array of strings
+- extracurriculars: array of strings
+- education: array of objects with institution, degree, dates
+
+The text may be only some sections of the resume; use empty values for fields it does not cover.
+Return ONLY the JSON, no markdown, no explanation."""
+
+    return LLMCall("parse_resume", system_prompt, user_prompt, 0.2,
+                   json_decoder(error_message="Failed to parse resume as JSON", schema=ResumeParse),
+                   json_output="object", schema=ResumeParse)
+
+def build_evidence_map_call(jd_extract: Dict, resume_parse: Dict) -> LLMCall:
+    system_prompt = """You are an expert at matching job requirements to resume evidence. Create a detailed evidence map."""
+
+    data = render_sections("build_evidence_map",
+                           {"jd": pick(jd_extract, _JD_SKILLS), "resume": pick(resume_parse, _RESUME_CONTENT)},
+                           {"jd": jd_extract, "resume": resume_parse})
+    user_prompt = f"""Job Requirements:
+{data["jd"]}
+
+Resume:
+{data["resume"]}
+
+Create an evidence map showing:
+1. For each keyword/skill in must_have_skills and nice_to_have_skills, list where it appears in the resume (section + bullet index)
+2. List any missing keywords/skills that are must-haves
+
+Return JSON with:
+- evidence: object mapping keyword -> array of citations like {{"section": "projects", "index": 0, "bullet_index": 1}}
+- missing: array of missing must-have keywords
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("build_evidence_map", system_prompt, user_prompt, 0.3,
+                   json_decoder(fallback=lambda: {"evidence": {}, "missing": []}, schema=EvidenceMap),
+                   json_output="object", schema=EvidenceMap)
+
+def suggest_top_fixes_call(jd_extract: Dict, resume_parse: Dict, score_breakdown: Dict) -> LLMCall:
+    system_prompt = """You are an expert resume coach. The ATS scores are already computed; turn them into concrete, prioritized edits."""
+
+    data = render_sections("suggest_top_fixes",
+                           {"jd": pick(jd_extract, ("role_title",) + _JD_SKILLS + ("responsibilities",)),
+                            "resume": pick(resume_parse, ("skills", "experience", "projects")),
+                            "scores": score_breakdown},
+                           {"jd": jd_extract, "resume": resume_parse, "scores": score_breakdown})
+    user_prompt = f"""Job Requirements:
+{data["jd"]}
+
+Resume:
+{data["resume"]}
+
+Computed ATS scores (do not change them):
+{data["scores"]}
+
+Return a JSON array of the top 3-7 prioritized fixes. Each fix is an object with:
+- target_location: where in the resume to edit (e.g. "Experience 1, bullet 2" or "Skills")
+- constraint_rules: a short string of concrete instructions for the edit
+- expected_score_impact: estimated points gained (integer)
+
+Return ONLY the JSON array, no markdown."""
+
+    return LLMCall("suggest_top_fixes", system_prompt, user_prompt, 0.3,
+                   json_decoder(fallback=list, expect="array"),
+                   json_output="array")
+
+def rewrite_plan_from_score(score_breakdown: Dict, evidence_map: Dict) -> Dict[str, Any]:
+    """Rewrite plan is already computed in score_breakdown (top_fixes), so no LLM call is needed"""
+    return {
+        "prioritized_edits": score_breakdown.get("top_fixes", []),
+        "expected_impact": "high"
+    }
+
+def rewrite_bullet_call(bullet: str, constraints: Dict[str, Any], context: Dict[str, Any]) -> LLMCall:
+    system_prompt = """You are an expert at rewriting resume bullets. Follow constraints strictly. Never hallucinate metrics."""
+
+    data = render_sections("rewrite_bullet", {"constraints": constraints, "context": context},
+                           {"constraints": constraints, "context": context})
+    user_prompt = f"""Rewrite this resume bullet:
+
+"{bullet}"
+
+Constraints:
+{data["constraints"]}
+
+Context:
+{data["context"]}
+
+Rules:
+- Start with action verb
+- Include tool/tech when relevant
+- Include outcome/impact if available in context
+- Never invent metrics (if no metric in context, omit it)
+- Keep under 150 characters
+- Be specific and concrete
+- If constraints list fix_violations, this bullet broke those rules: fix every one of them
+
+Return ONLY the rewritten bullet, no explanation."""
+
+    return LLMCall("rewrite_bullet", system_prompt, user_prompt, 0.4, _decode_bullet,
+                   cacheable="fix_violations" not in constraints)
+
+def _bullet_batch(data: Any) -> Dict[str, str]:
+    rewrites = data.get("rewrites") if isinstance(data, dict) else None
+    result = {}
+    for item in rewrites if isinstance(rewrites, list) else []:
+        if isinstance(item, dict) and item.get("id") is not None and isinstance(item.get("bullet"), str):
+            text = _decode_bullet(item["bullet"])
+            if text:
+                result[str(item["id"])] = text
+    return result
+
+def _decode_bullet_batch(response: str) -> Dict[str, str]:
+    """{"rewrites": [{"id", "bullet"}]} -> id -> rewritten bullet (unusable entries are dropped)"""
+    return _bullet_batch(json_decoder(fallback=dict)(response))
+
+def _decode_bullet_batch_strict(response: str) -> Dict[str, str]:
+    result = _bullet_batch(json_decoder(error_message="Failed to parse bullet rewrites as JSON").strict(response))
+    if not result:
+        raise Exception("No usable bullet rewrites in response")
+    return result
+
+_decode_bullet_batch.strict = _decode_bullet_batch_strict
+
+def rewrite_bullets_batch_call(bullets: List[Dict[str, Any]], constraints: Dict[str, Any],
+                               context: Dict[str, Any]) -> LLMCall:
+    """
+    Rewrite many bullets in one call; constraints and context shared by all of them are sent once
+
+    Args:
+        bullets: [{"id", "bullet", "constraints" (per-bullet extras, optional)}]
+        constraints: Constraints every bullet must meet
+        context: Shared context (e.g. JD keywords, project details)
+    """
+    system_prompt = """You are an expert at rewriting resume bullets. Follow constraints strictly. Never hallucinate metrics."""
+
+    # The bullets are the task itself and are never trimmed; only the context yields to the budget.
+    data = render_sections("rewrite_bullets_batch",
+                           {"constraints": constraints, "context": context, "bullets": bullets},
+                           {"constraints": constraints, "context": context, "bullets": bullets},
+                           protect=("constraints", "bullets"))
+    user_prompt = f"""Rewrite each of these resume bullets:
+{data["bullets"]}
+
+Constraints for every bullet (a bullet's own "constraints" add to these):
+{data["constraints"]}
+
+Shared context:
+{data["context"]}
+
+Rules:
+- Start with action verb
+- Include tool/tech when relevant
+- Include outcome/impact if available in context
+- Never invent metrics (if no metric in context, omit it)
+- Keep under 150 characters
+- Be specific and concrete
+
+Return a JSON object: {{"rewrites": [{{"id": "<id as given>", "bullet": "<rewritten bullet>"}}]}} with one entry per input bullet.
+Return ONLY the JSON, no markdown."""
+
+    repair = "fix_violations" in constraints or any("fix_violations" in (b.get("constraints") or {}) for b in bullets)
+    return LLMCall("rewrite_bullets_batch", system_prompt, user_prompt, 0.4, _decode_bullet_batch,
+                   json_output="object", schema=BulletRewriteBatch, cacheable=not repair)
+
+def optimize_resume_parse_call(
+    jd_extract: Dict[str, Any],
+    resume_parse: Dict[str, Any],
+    score_breakdown: Optional[Dict[str, Any]] = None,
+    evidence_map: Optional[Dict[str, Any]] = None,
+) -> LLMCall:
+    """
+    Produce an optimized ResumeParse JSON for this job.
+    Rules:
+    - Do not invent employers, projects, or metrics.
+    - You may reorder bullets/skills and rephrase bullets for clarity + ATS keywords.
+    - Keep structure compatible with ResumeParse.
+    """
+    system_prompt = (
+        "You are an expert ATS resume optimizer. Return ONLY valid JSON matching the ResumeParse schema. "
+        "Never fabricate new experience, projects, or metrics."
+    )
+
+    # The resume is sent once, whole (it is being rewritten); from the score breakdown only the
+    # headline scores and fixes, and from the evidence map only what is missing.
+    scores = {
+        key: {"score": value.get("score"), "explanation": value.get("explanation")}
+        for key, value in (score_breakdown or {}).items() if isinstance(value, dict) and "score" in value
+    }
+    data = render_sections("optimize_resume_parse",
+                           {"jd": pick(jd_extract, _JD_CORE), "resume": resume_parse,
+                            "scores": {**scores, **pick(score_breakdown, ("final_score", "top_fixes"))},
+                            "evidence": pick(evidence_map, ("missing",))},
+                           {"jd": jd_extract, "resume": resume_parse,
+                            "scores": score_breakdown or {}, "evidence": evidence_map or {}},
+                           protect=("resume",))
+    user_prompt = f"""Job Requirements (JDExtract):
+{data["jd"]}
+
+Current Resume (ResumeParse):
+{data["resume"]}
+
+Optional Score Breakdown:
+{data["scores"]}
+
+Optional Evidence Map (missing must-haves):
+{data["evidence"]}
+
+Task:
+Create an improved ResumeParse JSON that increases ATS match for this job.
+
+Hard rules:
+- Do NOT add new employers, projects, certifications, or degrees.
+- Do NOT invent numbers/metrics. If a bullet has no metric, keep it metric-free.
+- Prefer incorporating JD must-have skills into existing bullets/skills where truthful.
+- Keep bullets concise and action-oriented.
+- Ensure all required fields exist and types match the ResumeParse schema.
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("optimize_resume_parse", system_prompt, user_prompt, 0.3,
+                   json_decoder(error_message="Failed to parse optimized resume as JSON",
+                                schema=ResumeParse),
+                   json_output="object", schema=ResumeParse)
+
+def generate_cover_letter_call(jd_extract: Dict, resume_parse: Dict, tone: str = "professional") -> LLMCall:
+    system_prompt = """You are an expert at writing cover letters. Write a compelling, role-specific cover letter."""
+
+    data = render_sections("generate_cover_letter",
+                           {"experience": resume_parse.get('experience', [])[:2],
+                            "projects": resume_parse.get('projects', [])[:2]},
+                           {"experience": resume_parse.get('experience', [])[:2],
+                            "projects": resume_parse.get('projects', [])[:2]})
+    user_prompt = f"""Write a cover letter for this role:
+
+Job: {jd_extract.get('role_title', '')} at {jd_extract.get('company', 'Company')}
+Requirements: {', '.join(jd_extract.get('must_have_skills', [])[:5])}
+
+Candidate: {resume_parse.get('identity', {}).get('name', 'Candidate')}
+Experience: {data["experience"]}
+Projects: {data["projects"]}
+
+Requirements:
+- Exactly 3 paragraphs
+- Maximum 250 words total
+- Include 2-4 keywords naturally from the job description
+- Cite 1-2 specific proof points from resume/projects
+- Tone: {tone}
+- Role and company specific
+
+Return ONLY the cover letter text, no headers, no explanations."""
+
+    return LLMCall("generate_cover_letter", system_prompt, user_prompt, 0.7, _decode_text)
+
+def suggest_projects_call(jd_extract: Dict, resume_parse: Dict) -> LLMCall:
+    system_prompt = """You are an expert at suggesting relevant projects for CS students based on job requirements."""
+
+    # Project ideas only need the skill gap and what has already been built.
+    projects = [pick(p, ("title", "tech_stack")) for p in resume_parse.get("projects") or [] if isinstance(p, dict)]
+    data = render_sections("suggest_projects",
+                           {"jd": pick(jd_extract, ("role_title", "seniority") + _JD_SKILLS + ("domain",)),
+                            "resume": {"skills": resume_parse.get("skills", {}), "projects": projects}},
+                           {"jd": jd_extract, "resume": resume_parse})
+    user_prompt = f"""Job Requirements:
+{data["jd"]}
+
+Current Resume:
+{data["resume"]}
+
+Suggest 3-7 project ideas that would strengthen this resume for this role. Each project should include:
+- title
+- goal
+- core_features (array)
+- tech_stack (array)
+- difficulty ("easy" or "medium")
+- estimated_time (string like "2 weeks")
+- potential_bullets (array of 2-3 example bullet points)
+
+Return JSON array of project objects. Return ONLY the JSON array, no markdown."""
+
+    return LLMCall("suggest_projects", system_prompt, user_prompt, 0.6,
+                   json_decoder(fallback=list, expect="array"),
+                   json_output="array")
+
+def roadmap_skill_gaps(jd_extract: Dict, resume_parse: Dict) -> Dict[str, List[str]]:
+    """JD skills the resume does not cover (directly or through a sub-skill), grouped by taxonomy area"""
+    taxonomy = get_skill_taxonomy()
+    skills = resume_parse.get('skills') or {}
+    listed = [str(s) for items in (skills.values() if isinstance(skills, dict) else []) if isinstance(items, list) for s in items]
+    required = [str(s) for s in (jd_extract.get('must_have_skills') or []) + (jd_extract.get('nice_to_have_skills') or [])]
+    return taxonomy.group(s for s in required if s.strip() and not taxonomy.covered(listed, s))
+
+def generate_roadmap_call(jd_extract: Dict, resume_parse: Dict, timeline_weeks: int = 4) -> LLMCall:
+    system_prompt = """You are an expert at creating learning roadmaps for career preparation."""
+
+    data = render_sections("generate_roadmap",
+                           {"jd": pick(jd_extract, ("role_title", "seniority", "must_have_skills", "nice_to_have_skills",
+                                                    "languages", "frameworks", "tools")),
+                            "skills": resume_parse.get('skills', {}),
+                            "gaps": roadmap_skill_gaps(jd_extract, resume_parse)},
+                           {"jd": jd_extract, "skills": resume_parse.get('skills', {})},
+                           protect=("gaps",))
+    user_prompt = f"""Create a {timeline_weeks}-week learning roadmap:
+
+Job Requirements:
+{data["jd"]}
+
+Current Skills:
+{data["skills"]}
+
+Skill Gaps (grouped by area; organize the weeks around these groups):
+{data["gaps"]}
+
+Create a structured roadmap with:
+- timeline_weeks: {timeline_weeks}
+- weeks: array of week objects, each with:
+  - week_number
+  - focus_areas (array)
+  - tasks (array of task objects with title, description, resources, estimated_hours)
+  - milestones (array)
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("generate_roadmap", system_prompt, user_prompt, 0.5,
+                   json_decoder(fallback=lambda: {"timeline_weeks": timeline_weeks, "weeks": []}),
+                   json_output="object")
+
+def generate_interview_question_call(jd_extract: Dict, mode: str, previous_questions: List[str] = None) -> LLMCall:
+    system_prompt = """You are an expert at creating interview questions tailored to job requirements."""
+
+    mode_prompts = {
+        "behavioural": "Generate a behavioural interview question based on the job responsibilities. Focus on STAR format scenarios.",
+        "technical": "Generate a technical interview question based on the must-have skills. Include what the interviewer is looking for.",
+        "mock": "Generate a mixed interview question (behavioural or technical)."
+    }
+
+    data = render_sections("generate_interview_question",
+                           {"jd": pick(jd_extract, ("role_title", "seniority", "must_have_skills", "responsibilities", "domain"))},
+                           {"jd": jd_extract})
+    user_prompt = f"""Job Requirements:
+{data["jd"]}
+
+Mode: {mode}
+{mode_prompts.get(mode, mode_prompts['behavioural'])}
+
+Previous questions: {previous_questions or []}
+
+Return JSON with:
+- question: string
+- type: "behavioural" or "technical"
+- what_interviewer_looks_for: string
+- suggested_answer_structure: string (for behavioural) or key_points (for technical)
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("generate_interview_question", system_prompt, user_prompt, 0.6,
+                   json_decoder(fallback=lambda: {"question": "Tell me about yourself.", "type": "behavioural"}),
+                   json_output="object")
+
+def score_star_response_call(question: str, response: str, jd_extract: Dict) -> LLMCall:
+    system_prompt = """You are an expert at evaluating STAR interview responses using a rubric."""
+
+    data = render_sections("score_star_response",
+                           {"jd": pick(jd_extract, ("role_title", "seniority", "must_have_skills", "responsibilities"))},
+                           {"jd": jd_extract})
+    user_prompt = f"""Question: {question}
+
+Response: {response}
+
+Job Context:
+{data["jd"]}
+
+Score this response using STAR rubric:
+- Situation clarity: 0-20
+- Task clarity: 0-20
+- Action specificity: 0-20
+- Result impact: 0-20
+- Relevance to role: 0-20
+
+Total: 0-100
+
+Also provide:
+- strengths: array of strings
+- improvements: array of strings
+- overall_feedback: string
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("score_star_response", system_prompt, user_prompt, 0.3,
+                   json_decoder(fallback=lambda: {"total_score": 0, "strengths": [], "improvements": []}),
+                   json_output="object")
+
+def generate_coding_problem_call(jd_extract: Dict, difficulty: str = "medium") -> LLMCall:
+    system_prompt = """You are an expert at creating original coding interview problems. Never copy LeetCode problems."""
+
+    data = render_sections("generate_coding_problem",
+                           {"jd": pick(jd_extract, ("role_title", "seniority", "must_have_skills", "languages", "domain"))},
+                           {"jd": jd_extract})
+    user_prompt = f"""Job Requirements:
+{data["jd"]}
+
+Difficulty: {difficulty}
+
+Create an ORIGINAL coding problem (not from LeetCode) that tests skills relevant to this role.
+
+Return JSON with:
+- title: string
+- topic: string (e.g., "arrays", "hashmaps", "strings", "graphs")
+- difficulty: "{difficulty}"
+- prompt: string (problem description)
+- examples: array of example objects with input, output, explanation
+- constraints: array of strings
+- test_cases: array of test case objects with input, expected_output
+- hints: array of strings (optional)
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("generate_coding_problem", system_prompt, user_prompt, 0.7,
+                   json_decoder(fallback=lambda: {"title": "Problem", "prompt": "", "test_cases": []}),
+                   json_output="object")
+
+def review_code_call(problem: Dict, code: str, test_results: Dict) -> LLMCall:
+    system_prompt = """You are an expert at reviewing code solutions for correctness, edge cases, and complexity."""
+
+    data = render_sections("review_code", {"problem": problem, "test_results": test_results},
+                           {"problem": problem, "test_results": test_results})
+    user_prompt = f"""Problem:
+{data["problem"]}
+
+Solution Code:
+{code}
+
+Test Results:
+{data["test_results"]}
+
+Review the code and provide:
+- correctness: "correct", "partial", or "incorrect"
+- edge_cases_handled: boolean
+- time_complexity: string
+- space_complexity: string
+- feedback: string
+- suggestions: array of strings
+
+Return ONLY the JSON, no markdown."""
+
+    return LLMCall("review_code", system_prompt, user_prompt, 0.3,
+                   json_decoder(fallback=lambda: {"correctness": "unknown", "feedback": "Unable to review code"}),
+                   json_output="object")
@@ -23,8 +23,8 @@ class AIProvider(ABC):
         pass
     
     @abstractmethod
-    def compute_score_breakdown(self, jd_extract: Dict, resume_parse: Dict, evidence_map: Dict) -> Dict[str, Any]:
-        """Compute ATS score breakdown"""
+    def suggest_top_fixes(self, jd_extract: Dict, resume_parse: Dict, score_breakdown: Dict) -> List[Dict[str, Any]]:
+        """Write prioritized fixes for an already computed score breakdown"""
         pass
     
     @abstractmethod
@@ -37,6 +37,12 @@ class AIProvider(ABC):
         """Rewrite a single bullet point with constraints"""
         pass
 
+    @abstractmethod
+    def rewrite_bullets_batch(self, bullets: List[Dict[str, Any]], constraints: Dict[str, Any],
+                              context: Dict[str, Any]) -> Dict[str, str]:
+        """Rewrite many bullets ([{"id", "bullet", ...}]) in one call; returns id -> rewritten bullet"""
+        pass
+
     @abstractmethod
     def optimize_resume_parse(
         self,
@@ -83,3 +89,87 @@ class AIProvider(ABC):
         """Review code solution"""
         pass
 
+class AsyncAIProvider(ABC):
+    """Abstract base class for async AI providers (same contract as AIProvider, awaitable)"""
+    
+    @abstractmethod
+    async def extract_jd(self, jd_text: str) -> Dict[str, Any]:
+        """Extract structured data from job description"""
+        pass
+    
+    @abstractmethod
+    async def parse_resume(self, resume_text: str) -> Dict[str, Any]:
+        """Parse resume into structured format"""
+        pass
+    
+    @abstractmethod
+    async def build_evidence_map(self, jd_extract: Dict, resume_parse: Dict) -> Dict[str, Any]:
+        """Build evidence map between JD and resume"""
+        pass
+    
+    @abstractmethod
+    async def suggest_top_fixes(self, jd_extract: Dict, resume_parse: Dict, score_breakdown: Dict) -> List[Dict[str, Any]]:
+        """Write prioritized fixes for an already computed score breakdown"""
+        pass
+    
+    @abstractmethod
+    async def create_rewrite_plan(self, score_breakdown: Dict, evidence_map: Dict) -> Dict[str, Any]:
+        """Create rewrite plan with prioritized fixes"""
+        pass
+    
+    @abstractmethod
+    async def rewrite_bullet(self, bullet: str, constraints: Dict[str, Any], context: Dict[str, Any]) -> str:
+        """Rewrite a single bullet point with constraints"""
+        pass
+
+    @abstractmethod
+    async def rewrite_bullets_batch(self, bullets: List[Dict[str, Any]], constraints: Dict[str, Any],
+                              context: Dict[str, Any]) -> Dict[str, str]:
+        """Rewrite many bullets ([{"id", "bullet", ...}]) in one call; returns id -> rewritten bullet"""
+        pass
+
+    @abstractmethod
+    async def optimize_resume_parse(
+        self,
+        jd_extract: Dict[str, Any],
+        resume_parse: Dict[str, Any],
+        score_breakdown: Optional[Dict[str, Any]] = None,
+        evidence_map: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Optimize resume_parse for a specific job (returns ResumeParse dict)"""
+        pass
+    
+    @abstractmethod
+    async def generate_cover_letter(self, jd_extract: Dict, resume_parse: Dict, tone: str = "professional") -> str:
+        """Generate cover letter"""
+        pass
+    
+    @abstractmethod
+    async def suggest_projects(self, jd_extract: Dict, resume_parse: Dict) -> List[Dict[str, Any]]:
+        """Suggest projects for CS students"""
+        pass
+    
+    @abstractmethod
+    async def generate_roadmap(self, jd_extract: Dict, resume_parse: Dict, timeline_weeks: int = 4) -> Dict[str, Any]:
+        """Generate learning roadmap"""
+        pass
+    
+    @abstractmethod
+    async def generate_interview_question(self, jd_extract: Dict, mode: str, previous_questions: List[str] = None) -> Dict[str, Any]:
+        """Generate interview question"""
+        pass
+    
+    @abstractmethod
+    async def score_star_response(self, question: str, response: str, jd_extract: Dict) -> Dict[str, Any]:
+        """Score STAR response"""
+        pass
+    
+    @abstractmethod
+    async def generate_coding_problem(self, jd_extract: Dict, difficulty: str = "medium") -> Dict[str, Any]:
+        """Generate original coding problem"""
+        pass
+    
+    @abstractmethod
+    async def review_code(self, problem: Dict, code: str, test_results: Dict) -> Dict[str, Any]:
+        """Review code solution"""
+        pass
@@ -2,9 +2,11 @@
 FastAPI Backend for PathToOffer AI
 """
 from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from typing import List, Optional
+import asyncio
 import os
 import sys
 from dotenv import load_dotenv
@@ -24,7 +26,33 @@ from storage.db import init_database, ensure_default_profile
 init_database()
 ensure_default_profile()
 
-app = FastAPI(title="PathToOffer AI API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background workers draining the persistent task queue (bounded LLM concurrency)
+    from storage.tasks import get_task_pool
+    # Load the skill taxonomy once, before the first request needs it
+    from core.skill_taxonomy import get_skill_taxonomy
+    get_skill_taxonomy()
+    # Token counting: tiktoken's BPE file may need a download, so never load it inside a request
+    from ai.prompt_budget import load_tokenizer
+    await asyncio.to_thread(load_tokenizer)
+    pool = get_task_pool()
+    await pool.start()
+    # Catch the similarity indexes up off the event loop (requests sync what they need meanwhile)
+    from storage.job_index import sync_vector_indexes_in_background
+    index_sync = asyncio.create_task(sync_vector_indexes_in_background())
+    yield
+    index_sync.cancel()
+    await pool.stop()
+    # Release the shared pooled OpenAI connections on shutdown
+    from ai.openai_provider import close_async_openai_client
+    await close_async_openai_client()
+    from core.pdf_text import close_pdf_extractor
+    close_pdf_extractor()
+    from storage.db import close_connection_pool
+    close_connection_pool()
+
+app = FastAPI(title="PathToOffer AI API", version="1.0.0", lifespan=lifespan)
 
 # CORS: localhost defaults + optional production origins (comma-separated), e.g. https://your-app.vercel.app
 _default_origins = [
@@ -44,6 +72,10 @@ _cors_regex = r"^http://(localhost|127\.0\.0\.1):\d+$"
 if os.getenv("CORS_ALLOW_VERCEL_PREVIEWS", "").lower() in ("1", "true", "yes"):
     _cors_regex = _cors_regex + r"|^https://([a-zA-Z0-9-]+\.)*vercel\.app$"
 
+# Refuse oversized resume uploads before FastAPI spools the body
+from storage.files import UploadSizeLimit
+app.add_middleware(UploadSizeLimit, paths=("/api/resume/upload",))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins,
@@ -55,13 +87,13 @@ app.add_middleware(
 
 # Import routers
 try:
-    from routers import jobs, resume, analysis, cover_letter, practice, exports, settings, demo, roadmap, resume_optimize
+    from routers import jobs, resume, analysis, cover_letter, practice, exports, settings, demo, roadmap, resume_optimize, tasks
 except ImportError:
     # Fallback for different import paths
     import sys
     import os
     sys.path.insert(0, os.path.dirname(__file__))
-    from routers import jobs, resume, analysis, cover_letter, practice, exports, settings, demo, roadmap, resume_optimize
+    from routers import jobs, resume, analysis, cover_letter, practice, exports, settings, demo, roadmap, resume_optimize, tasks
 
 app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 app.include_router(resume.router, prefix="/api/resume", tags=["resume"])
@@ -73,6 +105,7 @@ app.include_router(settings.router, prefix="/api/settings", tags=["settings"])
 app.include_router(demo.router, prefix="/api/demo", tags=["demo"])
 app.include_router(roadmap.router, prefix="/api/roadmap", tags=["roadmap"])
 app.include_router(resume_optimize.router, prefix="/api/resume", tags=["resume-optimize"])
+app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 
 @app.get("/")
 async def root():
@@ -82,6 +115,22 @@ async def root():
 async def health():
     return {"status": "ok"}
 
+@app.get("/api/metrics")
+async def metrics():
+    from ai.cache import get_llm_cache
+    from ai.prompt_budget import get_prompt_stats
+    from storage.db import get_connection_pool
+    from storage.tasks import get_task_pool
+    from core.pdf_text import get_pdf_extractor
+    cache = get_llm_cache()
+    return {
+        "llm_cache": cache.stats() if cache else {"enabled": False},
+        "prompts": get_prompt_stats().stats(),
+        "db_pool": get_connection_pool().stats(),
+        "task_pool": get_task_pool().stats(),
+        "pdf_extract": get_pdf_extractor().stats.stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,18 +1,23 @@
 """Analysis API Router"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import sys
 import os
-import asyncio
+from typing import Optional, List, Dict, Any
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries
-from storage.db import get_db_connection
-from core.jd_parser import extract_jd
-from core.resume_parser import parse_resume
-from core.evidence_mapper import build_evidence_map
-from core.scorer import compute_score_breakdown
-from ai.openai_provider import OpenAIProvider
-import json
+from storage.singleflight import single_flight
+from storage.resumes import ensure_parsed
+from storage.tasks import register_task_handler, ProgressReporter
+from core.jd_parser import extract_jd_async
+from core.evidence_mapper import build_evidence_map_async
+from core.scorer import compute_score_breakdown_async
+from core.incremental import rescore_incremental, resume_fingerprint, bullet_records, bullet_contributions
+from ai.provider import AsyncAIProvider
+from routers.dependencies import get_ai_provider
+import hashlib
+import asyncio
+import time
 
 router = APIRouter()
 
@@ -21,117 +26,123 @@ class AnalyzeJDRequest(BaseModel):
     jd_text: str
 
 @router.post("/jd")
-async def analyze_jd(request: AnalyzeJDRequest):
+async def analyze_jd(request: AnalyzeJDRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Extract structured data from JD"""
-    try:
-        ai_provider = OpenAIProvider()
-        # Run blocking LLM call off the event loop so other endpoints (jobs/demo) stay responsive.
-        jd_extract = await asyncio.to_thread(extract_jd, request.jd_text, ai_provider)
+    async def _analyze():
+        jd_extract = await extract_jd_async(request.jd_text, ai_provider)
         queries.save_job_analysis(request.job_id, jd_extract=jd_extract)
         return {"jd_extract": jd_extract}
+
+    try:
+        jd_hash = hashlib.sha256(request.jd_text.encode("utf-8")).hexdigest()[:16]
+        return await single_flight(f"analysis:jd:{request.job_id}:{jd_hash}", _analyze)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 class ScoreRequest(BaseModel):
     job_id: int
 
-@router.post("/score")
-async def score_resume(request: ScoreRequest):
-    """Compute ATS score"""
+async def _report(progress: Optional[ProgressReporter], stage: str):
+    if progress is not None:
+        await progress(stage)
+
+async def _load_parsed_resume(ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Latest resume source, parsing (once per distinct resume text) on first use"""
+    resume = queries.get_latest_resume_source()
+    if not resume:
+        raise HTTPException(status_code=400, detail="Resume not uploaded")
     try:
-        job_id = request.job_id
-        
-        # Get job to access JD text
-        job = queries.get_job(job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        # Get or create analysis
-        analysis = queries.get_job_analysis(job_id)
+        return await ensure_parsed(resume, ai_provider)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Resume not uploaded or could not be parsed")
+    except Exception as e:
+        print(f"Failed to parse resume: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to parse resume: {str(e)}")
 
-        # If we already computed a score, return it (avoids recompute + prevents repeated long calls).
-        if analysis and analysis.get("score_breakdown") and analysis.get("evidence_map"):
-            return {"score_breakdown": analysis["score_breakdown"], "evidence_map": analysis["evidence_map"]}
-        
-        # Auto-analyze JD if not analyzed yet (for demo mode)
-        if not analysis or not analysis.get("jd_extract"):
-            if not job.get("jd_text"):
-                raise HTTPException(status_code=400, detail="Job description not found. Please add a job description first.")
-            
-            try:
-                ai_provider = OpenAIProvider()
-                jd_extract = await asyncio.to_thread(extract_jd, job["jd_text"], ai_provider)
-                queries.save_job_analysis(job_id, jd_extract=jd_extract)
-                analysis = queries.get_job_analysis(job_id)
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Failed to analyze job description: {str(e)}")
-        
-        if not analysis or not analysis.get("jd_extract"):
-            raise HTTPException(status_code=400, detail="JD not analyzed yet")
-        
-        resume = queries.get_latest_resume_source()
-        if not resume:
-            raise HTTPException(status_code=400, detail="Resume not uploaded")
-        
-        # Check if resume needs parsing (parsed_json is None or empty, but raw_text exists)
-        needs_parsing = False
-        if resume.get("parsed_json"):
-            # Already has parsed_json, check if it's valid
-            try:
-                parsed_data = json.loads(resume["parsed_json"])
-                if not parsed_data or not isinstance(parsed_data, dict):
-                    needs_parsing = True
-            except (json.JSONDecodeError, TypeError):
-                needs_parsing = True
-        elif resume.get("raw_text"):
-            # Has raw_text but no parsed_json
-            needs_parsing = True
-        
-        # Auto-parse resume if needed (for demo mode)
-        if needs_parsing and resume.get("raw_text"):
-            try:
-                ai_provider = OpenAIProvider()
-                parsed = await asyncio.to_thread(parse_resume, resume["raw_text"], ai_provider)
-                # Update the existing resume with parsed data
-                resume_id = resume.get("id")
-                if resume_id:
-                    # Update existing resume
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        parsed_json_str = json.dumps(parsed) if parsed else None
-                        cursor.execute("""
-                            UPDATE resume_sources 
-                            SET parsed_json = ? 
-                            WHERE id = ?
-                        """, (parsed_json_str, resume_id))
-                    # Reload resume to get parsed data
-                    resume = queries.get_latest_resume_source()
-                else:
-                    # No ID, save as new
-                    queries.save_resume_source(raw_text=resume["raw_text"], parsed_json=parsed)
-                    resume = queries.get_latest_resume_source()
-            except Exception as e:
-                import traceback
-                error_detail = f"Failed to parse resume: {str(e)}\n{traceback.format_exc()}"
-                print(error_detail)
-                raise HTTPException(status_code=500, detail=f"Failed to parse resume: {str(e)}")
-        
-        # Final check - ensure we have parsed resume data
-        if not resume or not resume.get("parsed"):
-            raise HTTPException(status_code=400, detail="Resume not uploaded or could not be parsed")
-        
-        ai_provider = OpenAIProvider()
-        evidence_map = await asyncio.to_thread(build_evidence_map, analysis["jd_extract"], resume["parsed"], ai_provider)
-        score_breakdown = await asyncio.to_thread(
-            compute_score_breakdown,
-            analysis["jd_extract"],
-            resume["parsed"],
-            evidence_map,
-            ai_provider
-        )
+async def _score_job(job_id: int, ai_provider: AsyncAIProvider, progress: Optional[ProgressReporter] = None):
+    """Full scoring chain for one job (JD extract -> parse -> evidence -> score)"""
+    # Get job to access JD text
+    job = queries.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Get or create analysis
+    analysis = queries.get_job_analysis(job_id)
+
+    # If we already computed a score, return it (avoids recompute + prevents repeated long calls).
+    if analysis and analysis.get("score_breakdown") and analysis.get("evidence_map"):
+        stored_fingerprint = analysis.get("resume_fingerprint")
+        if stored_fingerprint:
+            resume = await _load_parsed_resume(ai_provider)
+            if resume_fingerprint(resume["parsed"]) != stored_fingerprint:
+                # Resume edited since scoring: re-score only the changed bullets
+                return _rescore_job(job_id, analysis, resume["parsed"])
+        return {"score_breakdown": analysis["score_breakdown"], "evidence_map": analysis["evidence_map"]}
+    
+    # Auto-analyze JD if not analyzed yet (for demo mode)
+    await _report(progress, "jd_extract")
+    if not analysis or not analysis.get("jd_extract"):
+        if not job.get("jd_text"):
+            raise HTTPException(status_code=400, detail="Job description not found. Please add a job description first.")
         
-        queries.save_job_analysis(job_id, evidence_map=evidence_map, score_breakdown=score_breakdown)
-        return {"score_breakdown": score_breakdown, "evidence_map": evidence_map}
+        try:
+            jd_extract = await extract_jd_async(job["jd_text"], ai_provider)
+            queries.save_job_analysis(job_id, jd_extract=jd_extract)
+            analysis = queries.get_job_analysis(job_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to analyze job description: {str(e)}")
+    
+    if not analysis or not analysis.get("jd_extract"):
+        raise HTTPException(status_code=400, detail="JD not analyzed yet")
+    
+    await _report(progress, "parse")
+    resume = await _load_parsed_resume(ai_provider)
+    
+    await _report(progress, "evidence")
+    evidence_map = await build_evidence_map_async(analysis["jd_extract"], resume["parsed"], ai_provider)
+    await _report(progress, "score")
+    score_breakdown = await compute_score_breakdown_async(
+        analysis["jd_extract"],
+        resume["parsed"],
+        evidence_map,
+        ai_provider
+    )
+    
+    queries.save_job_analysis(job_id, evidence_map=evidence_map, score_breakdown=score_breakdown,
+                              resume_fingerprint=resume_fingerprint(resume["parsed"]))
+    # Seed the per-bullet cache so the first edit already rescores just the changed bullet
+    records = bullet_records(resume["parsed"])
+    contributions = bullet_contributions(analysis["jd_extract"], [r["text"] for r in records])
+    queries.save_bullet_contributions(job_id, {r["content_hash"]: c for r, c in zip(records, contributions)})
+    return {"score_breakdown": score_breakdown, "evidence_map": evidence_map}
+
+def _rescore_job(job_id: int, analysis: Dict[str, Any], resume_parse: Dict[str, Any], persist: bool = True) -> Dict[str, Any]:
+    """Local incremental rescore against the stored analysis (no LLM call)"""
+    started = time.perf_counter()
+    result = rescore_incremental(
+        analysis["jd_extract"],
+        resume_parse,
+        queries.get_bullet_contributions(job_id),
+        stored_evidence_map=analysis.get("evidence_map"),
+    )
+    queries.save_bullet_contributions(job_id, result["new_contributions"])
+    if persist:
+        queries.save_job_analysis(job_id, evidence_map=result["evidence_map"], score_breakdown=result["score_breakdown"],
+                                  resume_fingerprint=resume_fingerprint(resume_parse))
+    return {
+        "score_breakdown": result["score_breakdown"],
+        "evidence_map": result["evidence_map"],
+        "rescored_bullets": result["rescored_bullets"],
+        "reused_bullets": result["reused_bullets"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+@router.post("/score")
+async def score_resume(request: ScoreRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
+    """Compute ATS score"""
+    try:
+        # Double clicks / multiple tabs share one in-flight computation per job.
+        return await single_flight(f"analysis:score:{request.job_id}", lambda: _score_job(request.job_id, ai_provider))
     except HTTPException:
         raise
     except Exception as e:
@@ -140,6 +151,127 @@ async def score_resume(request: ScoreRequest):
         print(error_detail)
         raise HTTPException(status_code=500, detail=f"Failed to score resume: {str(e)}")
 
+class RescoreRequest(BaseModel):
+    job_id: int
+    resume_parse: Optional[Dict[str, Any]] = None  # edited parse; default: the latest resume
+    persist: bool = True
+
+@router.post("/rescore")
+async def rescore_resume(request: RescoreRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
+    """Re-score after resume edits, recomputing only changed bullets (local, milliseconds)"""
+    try:
+        analysis = queries.get_job_analysis(request.job_id)
+        if not analysis or not analysis.get("jd_extract"):
+            raise HTTPException(status_code=400, detail="JD not analyzed yet")
+        resume_parse = request.resume_parse
+        if resume_parse is None:
+            resume_parse = (await _load_parsed_resume(ai_provider))["parsed"]
+        return _rescore_job(request.job_id, analysis, resume_parse, persist=request.persist)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Upper bound on jobs processed at once by /score-batch (each may need a JD extraction call)
+SCORE_BATCH_MAX_CONCURRENCY = int(os.getenv("SCORE_BATCH_MAX_CONCURRENCY", "8"))
+SCORE_BATCH_MAX_JOBS = 200
+
+class ScoreBatchRequest(BaseModel):
+    job_ids: List[int]
+    concurrency: int = 4
+    rescore: bool = False
+
+async def _ensure_jd_extract(job: Dict[str, Any], ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Cached jd_extract for a job, extracting (single-flight, same key as /jd) when missing"""
+    analysis = queries.get_job_analysis(job["id"])
+    if analysis and analysis.get("jd_extract"):
+        return analysis["jd_extract"]
+    jd_text = job.get("jd_text") or ""
+    if not jd_text.strip():
+        raise HTTPException(status_code=400, detail="Job description not found. Please add a job description first.")
+
+    async def _extract():
+        jd_extract = await extract_jd_async(jd_text, ai_provider)
+        queries.save_job_analysis(job["id"], jd_extract=jd_extract)
+        return {"jd_extract": jd_extract}
+
+    jd_hash = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()[:16]
+    return (await single_flight(f"analysis:jd:{job['id']}:{jd_hash}", _extract))["jd_extract"]
+
+def _batch_row(job: Dict[str, Any], score_breakdown: Dict[str, Any], evidence_map: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    return {
+        "job_id": job["id"],
+        "title": job.get("title"),
+        "company": job.get("company"),
+        "status": job.get("status"),
+        "final_score": score_breakdown.get("final_score", 0),
+        "scores": {
+            key: (score_breakdown.get(key) or {}).get("score", 0)
+            for key in ["keyword_coverage", "alignment", "evidence_strength", "bullet_quality", "formatting"]
+        },
+        "missing": (evidence_map or {}).get("missing", []),
+        "cached": cached,
+        "error": None,
+    }
+
+async def _score_batch_job(job_id: int, resume_parse: Dict[str, Any], rescore: bool,
+                           ai_provider: AsyncAIProvider, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Score one job of a batch; failures are reported in the row instead of raised"""
+    async with semaphore:
+        try:
+            job = queries.get_job(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            analysis = queries.get_job_analysis(job_id)
+            if not rescore and analysis and analysis.get("score_breakdown") and analysis.get("evidence_map"):
+                return _batch_row(job, analysis["score_breakdown"], analysis["evidence_map"], cached=True)
+
+            jd_extract = await _ensure_jd_extract(job, ai_provider)
+            # Local evidence + scoring only: top_fixes are rule-based here, so the batch costs
+            # no LLM calls beyond missing JD extractions and results are not persisted over
+            # a full /score analysis.
+            evidence_map = await build_evidence_map_async(jd_extract, resume_parse)
+            score_breakdown = await compute_score_breakdown_async(jd_extract, resume_parse, evidence_map)
+            return _batch_row(job, score_breakdown, evidence_map, cached=False)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+            print(f"Batch scoring failed for job {job_id}: {detail}")
+            return {"job_id": job_id, "final_score": None, "error": str(detail)}
+
+@router.post("/score-batch")
+async def score_batch(request: ScoreBatchRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
+    """Score the latest resume against many jobs and rank them by fit"""
+    job_ids = list(dict.fromkeys(request.job_ids))
+    if not job_ids:
+        raise HTTPException(status_code=400, detail="job_ids is empty")
+    if len(job_ids) > SCORE_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {SCORE_BATCH_MAX_JOBS} jobs per batch")
+    try:
+        resume = await _load_parsed_resume(ai_provider)
+        semaphore = asyncio.Semaphore(max(1, min(request.concurrency, SCORE_BATCH_MAX_CONCURRENCY)))
+        rows = await asyncio.gather(*[
+            _score_batch_job(job_id, resume["parsed"], request.rescore, ai_provider, semaphore)
+            for job_id in job_ids
+        ])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to score batch: {str(e)}")
+
+    scored = sorted((r for r in rows if not r.get("error")), key=lambda r: (-r["final_score"], r["job_id"]))
+    failed = [r for r in rows if r.get("error")]
+    for rank, row in enumerate(scored, start=1):
+        row["rank"] = rank
+    return {"results": scored + failed, "scored": len(scored), "failed": len(failed)}
+
+async def _analysis_task(task, report):
+    """Task queue handler: full scoring chain with per-stage progress"""
+    job_id = task["job_id"]
+    # Own key: following an HTTP /score leader would run its chain without this task's progress
+    return await single_flight(f"task:analysis:score:{job_id}", lambda: _score_job(job_id, get_ai_provider(), report))
+
+register_task_handler("analysis", _analysis_task)
+
 @router.get("/{job_id}")
 async def get_analysis(job_id: int):
     """Get analysis for a job"""
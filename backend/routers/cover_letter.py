@@ -1,12 +1,14 @@
 """Cover Letter API Router"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries
-from core.cover_letter import generate_cover_letter, format_cover_letter_with_links
-from ai.openai_provider import OpenAIProvider
+from storage.tasks import register_task_handler
+from core.cover_letter import generate_cover_letter_async, format_cover_letter_with_links
+from ai.provider import AsyncAIProvider
+from routers.dependencies import get_ai_provider
 
 router = APIRouter()
 
@@ -14,41 +16,47 @@ class GenerateCLRequest(BaseModel):
     job_id: int
     tone: str = "professional"
 
+async def _generate_cover_letter(job_id: int, tone: str, ai_provider: AsyncAIProvider):
+    """Generate a cover letter for a job and append it to the saved versions"""
+    job = queries.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    analysis = queries.get_job_analysis(job_id)
+    if not analysis or not analysis.get("jd_extract"):
+        raise HTTPException(status_code=400, detail="JD not analyzed yet")
+    
+    resume = queries.get_latest_resume_source()
+    if not resume or not resume.get("parsed"):
+        raise HTTPException(status_code=400, detail="Resume not uploaded")
+    
+    cl_text = await generate_cover_letter_async(
+        analysis["jd_extract"],
+        resume["parsed"],
+        ai_provider,
+        tone
+    )
+    
+    formatted_cl = format_cover_letter_with_links(cl_text, resume["parsed"])
+    
+    # Save as a new version
+    queries.add_cover_letter_version(job_id, formatted_cl, tone)
+    
+    return {"cover_letter": formatted_cl}
+
 @router.post("/generate")
-async def generate_cover_letter_endpoint(request: GenerateCLRequest):
+async def generate_cover_letter_endpoint(request: GenerateCLRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Generate cover letter"""
     try:
-        job = queries.get_job(request.job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        
-        analysis = queries.get_job_analysis(request.job_id)
-        if not analysis or not analysis.get("jd_extract"):
-            raise HTTPException(status_code=400, detail="JD not analyzed yet")
-        
-        resume = queries.get_latest_resume_source()
-        if not resume or not resume.get("parsed"):
-            raise HTTPException(status_code=400, detail="Resume not uploaded")
-        
-        ai_provider = OpenAIProvider()
-        cl_text = generate_cover_letter(
-            analysis["jd_extract"],
-            resume["parsed"],
-            ai_provider,
-            request.tone
-        )
-        
-        formatted_cl = format_cover_letter_with_links(cl_text, resume["parsed"])
-        
-        # Save to assets
-        assets = queries.get_job_assets(request.job_id) or {}
-        versions = assets.get("cover_letter_versions", [])
-        versions.append({"text": formatted_cl, "tone": request.tone})
-        queries.save_job_assets(request.job_id, cover_letter_versions=versions)
-        
-        return {"cover_letter": formatted_cl}
+        return await _generate_cover_letter(request.job_id, request.tone, ai_provider)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _cover_letter_task(task, report):
+    """Task queue handler for cover letter generation"""
+    await report("cover_letter")
+    return await _generate_cover_letter(task["job_id"], task["params"].get("tone", "professional"), get_ai_provider())
+
+register_task_handler("cover_letter", _cover_letter_task)
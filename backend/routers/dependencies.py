@@ -0,0 +1,10 @@
+"""Shared FastAPI dependencies for routers"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
+from ai.provider import AsyncAIProvider
+from ai.openai_provider import get_async_openai_provider
+
+def get_ai_provider() -> AsyncAIProvider:
+    """Async AI provider backed by the process-wide pooled OpenAI client"""
+    return get_async_openai_provider()
@@ -21,11 +21,8 @@ async def export_resume(job_id: int):
             raise HTTPException(status_code=404, detail="Job not found")
 
         # Prefer an optimized resume version if it exists for this job
-        assets = queries.get_job_assets(job_id)
-        resume_parse = None
-        if assets and assets.get("resume_versions"):
-            latest_version = assets["resume_versions"][-1]
-            resume_parse = latest_version.get("parsed")
+        latest_version = queries.get_latest_resume_version(job_id)
+        resume_parse = latest_version.get("parsed") if latest_version else None
 
         # Fallback to latest uploaded/demo resume
         if not resume_parse:
@@ -55,8 +52,8 @@ async def export_cover_letter(job_id: int):
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
-        assets = queries.get_job_assets(job_id)
-        if not assets or not assets.get("cover_letter_versions"):
+        latest_cover_letter = queries.get_latest_cover_letter_version(job_id)
+        if not latest_cover_letter:
             raise HTTPException(status_code=400, detail="Cover letter not generated yet")
         
         resume = queries.get_latest_resume_source()
@@ -64,7 +61,7 @@ async def export_cover_letter(job_id: int):
             raise HTTPException(status_code=400, detail="Resume not uploaded")
         
         # Get latest cover letter version
-        cover_letter_text = assets["cover_letter_versions"][-1]["text"]
+        cover_letter_text = latest_cover_letter["text"]
         
         output_path = files.get_export_path(f"cover_letter_{job_id}.pdf")
         export_cover_letter_pdf(cover_letter_text, resume["parsed"], output_path)
@@ -120,10 +117,8 @@ async def export_package(job_id: int):
         
         # Resume PDF - prefer optimized version
         assets = queries.get_job_assets(job_id)
-        resume_parse = None
-        if assets and assets.get("resume_versions"):
-            latest_version = assets["resume_versions"][-1]
-            resume_parse = latest_version.get("parsed")
+        latest_version = queries.get_latest_resume_version(job_id)
+        resume_parse = latest_version.get("parsed") if latest_version else None
         
         # Fallback to latest uploaded/demo resume
         if not resume_parse:
@@ -137,8 +132,9 @@ async def export_package(job_id: int):
             pdf_paths.append(resume_path)
         
         # Cover Letter PDF
-        if assets and assets.get("cover_letter_versions") and resume_parse:
-            cover_letter_text = assets["cover_letter_versions"][-1]["text"]
+        latest_cover_letter = queries.get_latest_cover_letter_version(job_id)
+        if latest_cover_letter and resume_parse:
+            cover_letter_text = latest_cover_letter["text"]
             cl_path = files.get_export_path(f"cover_letter_{job_id}.pdf")
             export_cover_letter_pdf(cover_letter_text, resume_parse, cl_path)
             pdf_paths.append(cl_path)
@@ -1,15 +1,26 @@
 """
 Jobs API Router
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+import asyncio
 import sys
 import os
+import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries
+from storage.singleflight import single_flight
+from storage.resumes import resume_for_job, ensure_parsed
+from storage.tasks import register_task_handler
+from storage.job_index import similar_jobs, resume_text, index_job, unindex_job
+from core.pipeline import build_job_pipeline, PipelineError
+from core.incremental import resume_fingerprint
+from ai.provider import AsyncAIProvider
+from routers.dependencies import get_ai_provider
 
 router = APIRouter()
 
@@ -30,14 +41,84 @@ class JobUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 @router.get("")
-async def get_jobs():
-    """Get all jobs"""
+async def get_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(queries.JOB_LIST_FIELDS)),
+):
+    """List jobs, most recently updated first (pass back next_cursor for the next page)"""
     try:
-        jobs = queries.get_all_jobs()
-        return {"jobs": jobs}
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        return queries.list_jobs(limit=limit, cursor=cursor, status=status, tag=tag, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/count")
+async def count_jobs(status: Optional[str] = None, tag: Optional[str] = None):
+    """Number of jobs matching the list filters"""
+    try:
+        return {"count": queries.count_jobs(status=status, tag=tag)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search")
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    """Full-text search over title, company, JD and tags (BM25-ranked, with snippets)"""
+    try:
+        return queries.search_jobs(q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/similar")
+async def get_similar_jobs(
+    to: str = Query(..., description='"resume" (latest resume) or a job id'),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Saved jobs ranked by local vector similarity to the resume or to another job (no LLM calls);
+    against the resume, each job also lists the resume bullets closest to its JD
+    """
+    try:
+        started = time.perf_counter()
+        if to == "resume":
+            resume = resume_for_job(None)
+            if not resume:
+                raise HTTPException(status_code=400, detail="Resume not uploaded")
+            results = await asyncio.to_thread(similar_jobs, query_text=resume_text(resume), limit=limit,
+                                              resume_id=resume["id"])
+        elif to.isdigit():
+            try:
+                results = await asyncio.to_thread(similar_jobs, job_id=int(to), limit=limit)
+            except KeyError:
+                raise HTTPException(status_code=404, detail="Job not found")
+        else:
+            raise HTTPException(status_code=400, detail='to must be "resume" or a job id')
+        return {"to": to, "results": results, "took_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _refresh_job_index(job_id: int, deleted: bool = False):
+    """Keep the similarity index current; failures only delay it to the next sync"""
+    try:
+        if deleted:
+            unindex_job(job_id)
+        else:
+            index_job(job_id)
+    except Exception as e:
+        print(f"Failed to update similarity index for job {job_id}: {e}")
+
 @router.get("/{job_id}")
 async def get_job(job_id: int):
     """Get a specific job"""
@@ -63,6 +144,7 @@ async def create_job(job: JobCreate):
             status=job.status,
             tags=job.tags
         )
+        await asyncio.to_thread(_refresh_job_index, job_id)
         return {"id": job_id, "message": "Job created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -78,6 +160,7 @@ async def update_job(job_id: int, job: JobUpdate):
         success = queries.update_job(job_id, **update_data)
         if not success:
             raise HTTPException(status_code=404, detail="Job not found")
+        await asyncio.to_thread(_refresh_job_index, job_id)
         return {"message": "Job updated successfully"}
     except HTTPException:
         raise
@@ -91,9 +174,127 @@ async def delete_job(job_id: int):
         success = queries.delete_job(job_id)
         if not success:
             raise HTTPException(status_code=404, detail="Job not found")
+        await asyncio.to_thread(_refresh_job_index, job_id, True)
         return {"message": "Job deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# Cap on stages (i.e. LLM calls) in flight for one /prepare run
+PREPARE_MAX_CONCURRENCY = int(os.getenv("PREPARE_MAX_CONCURRENCY", "4"))
+
+class PrepareRequest(BaseModel):
+    stages: Optional[List[str]] = None  # default: everything
+    force: bool = False                 # recompute stages that already have saved output
+    concurrency: int = PREPARE_MAX_CONCURRENCY
+    tone: str = "professional"
+    timeline_weeks: int = 4
+
+def _saved_stage_outputs(job_id: int, resume: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage outputs already persisted for this job, so /prepare only fills the gaps"""
+    analysis = queries.get_job_analysis(job_id) or {}
+    assets = queries.get_job_assets(job_id) or {}
+    latest_version = queries.get_latest_resume_version(job_id)
+    latest_letter = queries.get_latest_cover_letter_version(job_id)
+    saved = {
+        "jd_extract": analysis.get("jd_extract"),
+        "resume_parse": resume.get("parsed"),
+        "evidence_map": analysis.get("evidence_map"),
+        "score": analysis.get("score_breakdown"),
+        "optimize": latest_version.get("parsed") if latest_version else None,
+        "cover_letter": latest_letter.get("text") if latest_letter else None,
+        "roadmap": assets.get("roadmap"),
+        "interview_pack": assets.get("interview_pack"),
+    }
+    return {name: value for name, value in saved.items() if value}
+
+async def _prepare_job(job_id: int, request: PrepareRequest, ai_provider: AsyncAIProvider, report=None):
+    """Run the job pipeline, persisting each stage's output as soon as it finishes"""
+    job = queries.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    resume = resume_for_job(job)
+    if not resume:
+        raise HTTPException(status_code=400, detail="Resume not uploaded")
+
+    async def parse_resume(_: str) -> Dict[str, Any]:
+        # Shared parse cache: stored on the resume row, at most one LLM parse per resume text
+        return (await ensure_parsed(resume, ai_provider))["parsed"]
+
+    pipeline = build_job_pipeline(ai_provider, jd_text=job.get("jd_text"), resume_text=resume.get("raw_text"),
+                                  tone=request.tone, timeline_weeks=request.timeline_weeks, parse_resume=parse_resume)
+    saved = _saved_stage_outputs(job_id, resume)
+    if request.force:
+        # Roots stay cached: forcing a re-run means new downstream outputs, not re-extracting inputs
+        saved = {name: saved[name] for name in ("jd_extract", "resume_parse") if name in saved}
+
+    resume_parse = {"value": resume.get("parsed")}
+
+    async def persist(stage: str, output: Any):
+        if stage == "jd_extract":
+            queries.save_job_analysis(job_id, jd_extract=output)
+        elif stage == "resume_parse":
+            resume_parse["value"] = output
+        elif stage == "evidence_map":
+            queries.save_job_analysis(job_id, evidence_map=output)
+        elif stage == "score":
+            # Fingerprint lets /analysis/score detect later resume edits and rescore incrementally
+            fingerprint = resume_fingerprint(resume_parse["value"]) if resume_parse["value"] else None
+            queries.save_job_analysis(job_id, score_breakdown=output, resume_fingerprint=fingerprint)
+        elif stage == "optimize":
+            queries.add_resume_version(job_id, {
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "label": "Optimized",
+                "source": "ai",
+                "parsed": output,
+            })
+        elif stage == "cover_letter":
+            queries.add_cover_letter_version(job_id, output, request.tone)
+        elif stage == "roadmap":
+            queries.save_job_assets(job_id, roadmap=output)
+        elif stage == "interview_pack":
+            queries.save_job_assets(job_id, interview_pack=output)
+
+    concurrency = max(1, min(request.concurrency, PREPARE_MAX_CONCURRENCY))
+    try:
+        run = await pipeline.run(request.stages, cached=saved, concurrency=concurrency,
+                                 on_stage_start=report, on_stage_done=persist)
+    except PipelineError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "job_id": job_id,
+        "status": run.status,
+        "errors": run.errors,
+        "timings": run.timings,
+        "elapsed": run.elapsed,
+        "results": run.results,
+    }
+
+def _prepare_key(job_id: int, request: PrepareRequest) -> str:
+    stages = ",".join(sorted(request.stages)) if request.stages else "*"
+    return f"jobs:prepare:{job_id}:{stages}:{int(request.force)}:{request.tone}:{request.timeline_weeks}"
+
+@router.post("/{job_id}/prepare")
+async def prepare_job(job_id: int, request: Optional[PrepareRequest] = None,
+                      ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
+    """Produce the full job workup (analysis, score, optimized resume, cover letter, roadmap, interview pack)"""
+    request = request or PrepareRequest()
+    try:
+        return await single_flight(_prepare_key(job_id, request), lambda: _prepare_job(job_id, request, ai_provider))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _prepare_task(task, report):
+    """Task queue handler for the full job workup (each stage is reported as progress)"""
+    request = PrepareRequest(**(task["params"] or {}))
+    # Own key: following an HTTP /prepare leader would run its stages without this task's progress
+    result = await single_flight(f"task:{_prepare_key(task['job_id'], request)}",
+                                 lambda: _prepare_job(task["job_id"], request, get_ai_provider(), report))
+    # Outputs are persisted per stage; keep the task row small
+    return {k: v for k, v in result.items() if k != "results"}
+
+register_task_handler("prepare", _prepare_task)
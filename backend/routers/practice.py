@@ -1,14 +1,15 @@
 """Practice API Router"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries
-from core.interview_engine import generate_interview_question, score_star_response
-from core.coding_engine import generate_coding_problem, review_code
-from ai.openai_provider import OpenAIProvider
+from core.interview_engine import generate_interview_question_async, score_star_response_async
+from core.coding_engine import generate_coding_problem_async, review_code_async
+from ai.provider import AsyncAIProvider
+from routers.dependencies import get_ai_provider
 
 router = APIRouter()
 
@@ -23,7 +24,7 @@ class ScoreResponseRequest(BaseModel):
     response: str
 
 @router.post("/question")
-async def generate_question(request: GenerateQuestionRequest):
+async def generate_question(request: GenerateQuestionRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Generate interview question"""
     try:
         job = queries.get_job(request.job_id)
@@ -34,8 +35,7 @@ async def generate_question(request: GenerateQuestionRequest):
         if not analysis or not analysis.get("jd_extract"):
             raise HTTPException(status_code=400, detail="JD not analyzed yet")
         
-        ai_provider = OpenAIProvider()
-        question = generate_interview_question(
+        question = await generate_interview_question_async(
             analysis["jd_extract"],
             request.mode,
             request.previous_questions or [],
@@ -49,7 +49,7 @@ async def generate_question(request: GenerateQuestionRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/score")
-async def score_response(request: ScoreResponseRequest):
+async def score_response(request: ScoreResponseRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Score STAR response"""
     try:
         job = queries.get_job(request.job_id)
@@ -60,8 +60,7 @@ async def score_response(request: ScoreResponseRequest):
         if not analysis or not analysis.get("jd_extract"):
             raise HTTPException(status_code=400, detail="JD not analyzed yet")
         
-        ai_provider = OpenAIProvider()
-        score = score_star_response(
+        score = await score_star_response_async(
             request.question,
             request.response,
             analysis["jd_extract"],
@@ -90,7 +89,7 @@ class ReviewCodeRequest(BaseModel):
     test_results: dict = {}
 
 @router.post("/coding/problem")
-async def generate_coding_problem_endpoint(request: GenerateProblemRequest):
+async def generate_coding_problem_endpoint(request: GenerateProblemRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Generate coding problem"""
     try:
         job = queries.get_job(request.job_id)
@@ -101,8 +100,7 @@ async def generate_coding_problem_endpoint(request: GenerateProblemRequest):
         if not analysis or not analysis.get("jd_extract"):
             raise HTTPException(status_code=400, detail="JD not analyzed yet")
         
-        ai_provider = OpenAIProvider()
-        problem = generate_coding_problem(
+        problem = await generate_coding_problem_async(
             analysis["jd_extract"],
             request.difficulty,
             ai_provider
@@ -115,11 +113,10 @@ async def generate_coding_problem_endpoint(request: GenerateProblemRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/coding/review")
-async def review_code_endpoint(request: ReviewCodeRequest):
+async def review_code_endpoint(request: ReviewCodeRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Review code solution"""
     try:
-        ai_provider = OpenAIProvider()
-        review = review_code(
+        review = await review_code_async(
             request.problem,
             request.code,
             request.test_results,
@@ -1,17 +1,21 @@
 """Resume API Router"""
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.responses import FileResponse, Response
 from typing import Optional
-import asyncio
 import sys
 import os
 import html
+import asyncio
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries, files
 from storage.db import get_db_connection
-from core.resume_parser import parse_resume, extract_text_from_pdf
+from storage.singleflight import single_flight
+from storage.resumes import ensure_parsed
+from core.resume_parser import extract_text_from_pdf
 from core.schemas import ResumeParse
-from ai.openai_provider import OpenAIProvider
+from core.skill_taxonomy import get_skill_taxonomy
+from ai.provider import AsyncAIProvider
+from routers.dependencies import get_ai_provider
 from pydantic import BaseModel
 from copy import deepcopy
 
@@ -78,23 +82,26 @@ def _render_text_resume_html(title: str, text: str) -> str:
 </html>"""
 
 def _add_missing_skills_to_parsed_resume(resume_parsed: dict, missing_skills: list[str]) -> dict:
-    """Heuristic: add missing skills to parsed resume skills.tools (and avoid duplicates)."""
+    """Add missing skills to the parsed resume's skills under their taxonomy category (default: tools).
+
+    Skills already listed under any spelling, or implied by a listed sub-skill (PostgreSQL covers SQL), are skipped.
+    """
+    taxonomy = get_skill_taxonomy()
     updated = deepcopy(resume_parsed or {})
     skills = updated.get("skills") or {}
     if not isinstance(skills, dict):
         skills = {}
-    tools = skills.get("tools") or []
-    if not isinstance(tools, list):
-        tools = []
-    existing = {str(t).strip().lower() for t in tools if str(t).strip()}
+    listed = [str(t) for items in skills.values() if isinstance(items, list) for t in items if str(t).strip()]
     for s in missing_skills:
         key = str(s).strip()
-        if not key:
+        if not key or taxonomy.covered(listed, key):
             continue
-        if key.lower() not in existing:
-            tools.append(key)
-            existing.add(key.lower())
-    skills["tools"] = tools
+        category = taxonomy.category(key)
+        bucket = category if category in skills and isinstance(skills.get(category), list) else "tools"
+        if not isinstance(skills.get(bucket), list):
+            skills[bucket] = []
+        skills[bucket].append(taxonomy.canonical(key))
+        listed.append(key)
     updated["skills"] = skills
     return updated
 
@@ -107,32 +114,29 @@ class SaveResumeVersionRequest(BaseModel):
     parsed: dict
 
 @router.post("/upload")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(file: UploadFile = File(...), ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """Upload and parse resume"""
     try:
-        # Save file
-        file_path = files.save_uploaded_file(file, file.filename)
+        # Stream to disk (size-capped, hashed, type sniffed from the bytes rather than the name)
+        stored = await files.save_upload_stream(file, file.filename)
         
-        # Extract text
-        if file.filename.endswith('.pdf'):
-            resume_text = extract_text_from_pdf(file_path)
+        # Extract text off the event loop
+        if stored.kind == "pdf":
+            resume_text = await asyncio.to_thread(extract_text_from_pdf, stored.path, stored.sha256)
         else:
-            with open(file_path, 'r') as f:
-                resume_text = f.read()
+            resume_text = await asyncio.to_thread(files.read_text_file, stored.path)
         
-        # Parse with AI
-        ai_provider = OpenAIProvider()
-        # Run blocking LLM call off the event loop so other endpoints stay responsive.
-        parsed = await asyncio.to_thread(parse_resume, resume_text, ai_provider)
+        # Save to database (with both file_path and raw_text); identical text reuses its row and parse
+        resume_id = queries.save_resume_source(file_path=stored.path, raw_text=resume_text)
         
-        # Save to database (with both file_path and raw_text)
-        resume_id = queries.save_resume_source(
-            file_path=file_path, 
-            raw_text=resume_text,
-            parsed_json=parsed
-        )
+        # Parse with AI (skipped when this text was parsed before)
+        resume = await ensure_parsed(queries.get_resume_source(resume_id), ai_provider)
         
-        return {"id": resume_id, "parsed": parsed}
+        return {"id": resume_id, "parsed": resume["parsed"]}
+    except files.UploadRejected as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -213,34 +217,27 @@ async def clear_resumes():
 @router.get("/versions/{job_id}")
 async def get_resume_versions(job_id: int):
     """Get resume versions saved for a job."""
-    assets = queries.get_job_assets(job_id)
-    return {"resume_versions": (assets.get("resume_versions") if assets else []) or []}
+    return {"resume_versions": queries.get_resume_versions(job_id)}
 
 @router.post("/versions")
 async def save_resume_version(request: SaveResumeVersionRequest):
     """Save a resume version for a job (client/server generated)."""
     try:
-        assets = queries.get_job_assets(request.job_id) or {}
-        versions = assets.get("resume_versions") or []
-        if not isinstance(versions, list):
-            versions = []
-        versions.append({
+        queries.add_resume_version(request.job_id, {
             "label": request.label,
-            "created_at": None,  # optional; db updated_at exists, UI can show label only
             "parsed": request.parsed,
         })
-        queries.save_job_assets(request.job_id, resume_versions=versions)
-        return {"resume_versions": versions}
+        return {"resume_versions": queries.get_resume_versions(request.job_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/optimize")
-async def optimize_resume(request: OptimizeResumeRequest):
+async def optimize_resume(request: OptimizeResumeRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     """
     Create an optimized resume version for a job, based on current analysis.
-    This does NOT overwrite the uploaded resume; it saves a new version under job_assets.resume_versions.
+    This does NOT overwrite the uploaded resume; it appends a new row to resume_versions.
     """
-    try:
+    async def _optimize():
         analysis = queries.get_job_analysis(request.job_id)
         if not analysis or not analysis.get("evidence_map") or not analysis.get("jd_extract"):
             raise HTTPException(status_code=400, detail="Analyze and score this job first to generate fixes.")
@@ -250,14 +247,9 @@ async def optimize_resume(request: OptimizeResumeRequest):
         if not resume:
             raise HTTPException(status_code=400, detail="Resume not uploaded")
 
-        if not resume.get("parsed") and resume.get("raw_text"):
-            ai_provider = OpenAIProvider()
-            parsed = await asyncio.to_thread(parse_resume, resume["raw_text"], ai_provider)
-            # Save a new row so latest has parsed data; simplest approach for now
-            queries.save_resume_source(file_path=resume.get("file_path"), raw_text=resume.get("raw_text"), parsed_json=parsed)
-            resume = queries.get_latest_resume_source()
-
-        if not resume or not resume.get("parsed"):
+        try:
+            resume = await ensure_parsed(resume, ai_provider)
+        except ValueError:
             raise HTTPException(status_code=400, detail="Resume could not be parsed")
 
         missing = (analysis.get("evidence_map") or {}).get("missing") or []
@@ -266,18 +258,17 @@ async def optimize_resume(request: OptimizeResumeRequest):
 
         optimized_parsed = _add_missing_skills_to_parsed_resume(resume["parsed"], missing)
 
-        assets = queries.get_job_assets(request.job_id) or {}
-        versions = assets.get("resume_versions") or []
-        if not isinstance(versions, list):
-            versions = []
-        versions.append({
+        queries.add_resume_version(request.job_id, {
             "label": OPTIMIZED_LABEL,
             "missing_added": missing,
             "parsed": optimized_parsed,
         })
-        queries.save_job_assets(request.job_id, resume_versions=versions)
 
-        return {"message": "Optimized resume version saved", "resume_versions": versions}
+        return {"message": "Optimized resume version saved", "resume_versions": queries.get_resume_versions(request.job_id)}
+
+    try:
+        # Concurrent identical requests share one in-flight optimization.
+        return await single_flight(f"resume:optimize:{request.job_id}", _optimize)
     except HTTPException:
         raise
     except Exception as e:
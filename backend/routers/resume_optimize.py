@@ -1,21 +1,23 @@
 """Resume Optimization API Router"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import sys
 import os
-import asyncio
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 from storage import queries
-from storage.db import get_db_connection
-from ai.openai_provider import OpenAIProvider
-from core.resume_parser import parse_resume
+from storage.singleflight import single_flight
+from storage.resumes import resume_for_job, ensure_parsed
+from storage.tasks import register_task_handler
+from ai.provider import AsyncAIProvider
+from core.rewriter import rewrite_bullets_async
+from core.constraints import DEFAULT_REPAIR_ATTEMPTS
+from routers.dependencies import get_ai_provider
 
 router = APIRouter()
 
-DEMO_RESUME_FILE_PATH = "__demo_resume__"
-
 
 class OptimizeRequest(BaseModel):
     job_id: int
@@ -24,67 +26,111 @@ class OptimizeRequest(BaseModel):
 
 @router.get("/versions/{job_id}")
 async def get_versions(job_id: int):
-    assets = queries.get_job_assets(job_id)
-    return {"resume_versions": assets.get("resume_versions", []) if assets else []}
+    return {"resume_versions": queries.get_resume_versions(job_id)}
+
+
+async def _optimize_resume(job_id: int, label: Optional[str], ai_provider: AsyncAIProvider):
+    """Run the AI optimizer for a job and append the result as a new resume version"""
+    job = queries.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    analysis = queries.get_job_analysis(job_id)
+    if not analysis or not analysis.get("jd_extract"):
+        raise HTTPException(status_code=400, detail="Analyze the job description first.")
+
+    resume = resume_for_job(job)
+    if not resume:
+        raise HTTPException(status_code=400, detail="Resume not found")
+    try:
+        resume = await ensure_parsed(resume, ai_provider)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    optimized = await ai_provider.optimize_resume_parse(
+        analysis["jd_extract"],
+        resume["parsed"],
+        analysis.get("score_breakdown"),
+        analysis.get("evidence_map"),
+    )
+
+    # Append version
+    queries.add_resume_version(
+        job_id,
+        {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "label": label or "Optimized",
+            "source": "ai",
+            "parsed": optimized,
+        }
+    )
+    versions = queries.get_resume_versions(job_id)
+    return {"resume_versions": versions, "latest": versions[-1]}
 
 
 @router.post("/optimize")
-async def optimize_resume(request: OptimizeRequest):
+async def optimize_resume(request: OptimizeRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
     try:
-        job = queries.get_job(request.job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-
-        analysis = queries.get_job_analysis(request.job_id)
-        if not analysis or not analysis.get("jd_extract"):
-            raise HTTPException(status_code=400, detail="Analyze the job description first.")
-
-        is_demo = (job.get("tags") and "demo" in job.get("tags", [])) or ("[Demo]" in str(job.get("title", "")))
-        resume = queries.get_resume_source_by_file_path(DEMO_RESUME_FILE_PATH) if is_demo else queries.get_latest_resume_source()
-        if not resume:
-            raise HTTPException(status_code=400, detail="Resume not found")
-
-        # Ensure parsed
-        if not resume.get("parsed"):
-            raw_text = resume.get("raw_text") or ""
-            if not raw_text.strip():
-                raise HTTPException(status_code=400, detail="Resume text missing")
-            ai_provider = OpenAIProvider()
-            parsed = await asyncio.to_thread(parse_resume, raw_text, ai_provider)
-            rid = resume.get("id")
-            if rid:
-                with get_db_connection() as conn:
-                    cursor = conn.cursor()
-                    import json as _json
-                    cursor.execute("UPDATE resume_sources SET parsed_json = ? WHERE id = ?", (_json.dumps(parsed), rid))
-            resume = queries.get_resume_source_by_file_path(DEMO_RESUME_FILE_PATH) if is_demo else queries.get_latest_resume_source()
-
-        ai_provider = OpenAIProvider()
-        optimized = await asyncio.to_thread(
-            ai_provider.optimize_resume_parse,
-            analysis["jd_extract"],
-            resume["parsed"],
-            analysis.get("score_breakdown"),
-            analysis.get("evidence_map"),
+        # Concurrent identical requests share one in-flight optimization.
+        return await single_flight(
+            f"resume:optimize:{request.job_id}:{request.label or ''}",
+            lambda: _optimize_resume(request.job_id, request.label, ai_provider),
         )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Append version
-        assets = queries.get_job_assets(request.job_id) or {}
-        versions = assets.get("resume_versions", []) or []
-        versions.append(
-            {
-                "created_at": datetime.utcnow().isoformat() + "Z",
-                "label": request.label or "Optimized",
-                "source": "ai",
-                "parsed": optimized,
-            }
-        )
-        queries.save_job_assets(request.job_id, resume_versions=versions)
-        return {"resume_versions": versions, "latest": versions[-1]}
+
+# Bullets per /rewrite-bullets request (all go out in one batch call)
+REWRITE_MAX_BULLETS = 50
+
+
+class RewriteBulletsRequest(BaseModel):
+    bullets: List[Dict[str, Any]]  # [{"id", "bullet", "constraints"?}]
+    constraints: Dict[str, Any] = {}
+    context: Dict[str, Any] = {}
+    job_id: Optional[int] = None  # adds the job's role and key skills to the shared context
+    max_attempts: int = DEFAULT_REPAIR_ATTEMPTS  # repair rounds per bullet that fails its constraints
+
+
+@router.post("/rewrite-bullets")
+async def rewrite_bullets(request: RewriteBulletsRequest, ai_provider: AsyncAIProvider = Depends(get_ai_provider)):
+    """Rewrite many bullets in one round trip, then repair (in one batch call per round) only those that fail their constraints"""
+    try:
+        if not request.bullets:
+            raise HTTPException(status_code=400, detail="No bullets to rewrite")
+        if len(request.bullets) > REWRITE_MAX_BULLETS:
+            raise HTTPException(status_code=400, detail=f"At most {REWRITE_MAX_BULLETS} bullets per request")
+        context = dict(request.context)
+        if request.job_id is not None:
+            analysis = queries.get_job_analysis(request.job_id) or {}
+            jd_extract = analysis.get("jd_extract") or {}
+            context.setdefault("role_title", jd_extract.get("role_title"))
+            context.setdefault("must_have_skills", jd_extract.get("must_have_skills") or [])
+        try:
+            return await rewrite_bullets_async(request.bullets, request.constraints, context, ai_provider,
+                                               max_attempts=max(0, min(request.max_attempts, 3)))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _optimize_task(task, report):
+    """Task queue handler for AI resume optimization"""
+    await report("optimize")
+    job_id = task["job_id"]
+    label = task["params"].get("label")
+    return await single_flight(
+        f"resume:optimize:{job_id}:{label or ''}",
+        lambda: _optimize_resume(job_id, label, get_ai_provider()),
+    )
+
+
+register_task_handler("optimize", _optimize_task)
+
+
 
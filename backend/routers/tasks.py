@@ -0,0 +1,96 @@
+"""Background Tasks API Router"""
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional
+import sys
+import os
+import json
+import asyncio
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
+from storage import queries, tasks
+
+router = APIRouter()
+
+SSE_POLL_INTERVAL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15
+# A stream ends with a 'timeout' event after this long; clients reconnect if they still care
+SSE_STREAM_TIMEOUT_SECONDS = int(os.getenv("SSE_STREAM_TIMEOUT_SECONDS", "600"))
+
+class SubmitTaskRequest(BaseModel):
+    kind: str  # analysis, optimize, roadmap, cover_letter, prepare
+    job_id: int
+    params: Optional[dict] = None
+
+@router.post("", status_code=202)
+async def submit_task(request: SubmitTaskRequest):
+    """Queue long-running work and return its task id immediately"""
+    if request.kind not in tasks.get_task_kinds():
+        raise HTTPException(status_code=400, detail=f"Unknown task kind '{request.kind}'. Expected one of: {', '.join(tasks.get_task_kinds())}")
+    if not queries.get_job(request.job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        task_id = tasks.create_task(request.kind, request.job_id, request.params)
+        tasks.get_task_pool().notify()
+        return {"task_id": task_id, "status": "queued"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/job/{job_id}")
+async def get_job_tasks(job_id: int):
+    """Recent tasks for a job"""
+    return {"tasks": tasks.get_tasks_for_job(job_id)}
+
+@router.get("/{task_id}")
+async def get_task(task_id: str):
+    """Get task status, per-stage progress and (when finished) the result"""
+    task = tasks.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/{task_id}/events")
+async def task_events(task_id: str, request: Request):
+    """Server-Sent Events stream of task progress; ends with a 'done', 'failed' or 'timeout' event"""
+    if not tasks.get_task(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def stream():
+        last_snapshot = None
+        last_sent = time.monotonic()
+        deadline = last_sent + SSE_STREAM_TIMEOUT_SECONDS
+        while True:
+            if await request.is_disconnected():
+                return
+            if time.monotonic() > deadline:
+                yield _sse("timeout", {"id": task_id, "status": last_snapshot[0] if last_snapshot else None})
+                return
+            task = await asyncio.to_thread(tasks.get_task, task_id)
+            if task is None:
+                yield _sse("failed", {"id": task_id, "error": "Task not found"})
+                return
+            snapshot = (task["status"], task["stage"], json.dumps(task["progress"]))
+            if snapshot != last_snapshot:
+                last_snapshot = snapshot
+                last_sent = time.monotonic()
+                if task["status"] == "succeeded":
+                    yield _sse("done", task)
+                    return
+                if task["status"] == "failed":
+                    yield _sse("failed", task)
+                    return
+                yield _sse("progress", {k: task[k] for k in ("id", "kind", "job_id", "status", "stage", "progress")})
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(SSE_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,99 @@
+"""
+Database Lookup Benchmark
+Seeds a throwaway database with N jobs and measures per-job lookups, upserts and deletes
+with the job_id indexes against a forced full scan (the schema before migration 2)
+
+Usage: python benchmark_db.py [--jobs 100000] [--lookups 2000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {pick(0.50):8.3f} ms   p95 {pick(0.95):8.3f} ms   mean {statistics.mean(samples) * 1000:8.3f} ms"
+
+def _time(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def seed(conn, jobs: int):
+    """Insert jobs with one analysis/assets row each and a practice session for every tenth job"""
+    payload = json.dumps({"required_skills": ["python", "sql"], "responsibilities": ["build things"] * 5})
+    conn.executemany(
+        "INSERT INTO jobs (id, title, company, jd_text) VALUES (?, ?, ?, ?)",
+        ((i, f"Engineer {i}", f"Company {i % 500}", "Build and ship software. " * 20) for i in range(1, jobs + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO job_analysis (job_id, jd_extract_json) VALUES (?, ?)",
+        ((i, payload) for i in range(1, jobs + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO job_assets (job_id, roadmap_json) VALUES (?, ?)",
+        ((i, payload) for i in range(1, jobs + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO practice_sessions (job_id, mode) VALUES (?, ?)",
+        ((i, "behavioral") for i in range(1, jobs + 1, 10)),
+    )
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--scan-lookups", type=int, default=50, help="full scans are slow; sample fewer")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pto-bench-")
+    # Must be set before storage is imported (DB_PATH is read at import time)
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "bench.db")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from storage import queries
+    from storage.db import get_db_connection, close_connection_pool, init_database
+
+    try:
+        init_database()
+        print(f"Seeding {args.jobs:,} jobs into {os.environ['DATABASE_PATH']} ...")
+        start = time.perf_counter()
+        with get_db_connection() as conn:
+            seed(conn, args.jobs)
+            conn.execute("ANALYZE")
+        print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+
+        rng = random.Random(0)
+        ids = [(rng.randint(1, args.jobs),) for _ in range(args.lookups)]
+
+        def scan_lookup(job_id):
+            with get_db_connection(readonly=True) as conn:
+                conn.execute("SELECT * FROM job_analysis NOT INDEXED WHERE job_id = ?", (job_id,)).fetchone()
+
+        with get_db_connection(readonly=True) as conn:
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM job_analysis WHERE job_id = ?", (1,)).fetchall()
+        print("query plan:", "; ".join(row[-1] for row in plan))
+
+        print(f"get_job_analysis   (full scan) {_percentiles(_time(scan_lookup, ids[:args.scan_lookups]))}")
+        print(f"get_job_analysis   (indexed)   {_percentiles(_time(queries.get_job_analysis, ids))}")
+        print(f"get_job_assets     (indexed)   {_percentiles(_time(queries.get_job_assets, ids))}")
+        print(f"save_job_analysis  (upsert)    {_percentiles(_time(lambda j: queries.save_job_analysis(j, score_breakdown={'overall_score': 70}), ids))}")
+        print(f"save_job_assets    (upsert)    {_percentiles(_time(lambda j: queries.save_job_assets(j, interview_pack={'questions': []}), ids))}")
+        delete_ids = list(dict.fromkeys(ids))[:200]
+        print(f"delete_job                     {_percentiles(_time(queries.delete_job, delete_ids))}")
+    finally:
+        close_connection_pool()
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Coding Practice Engine
 """
 from typing import Dict, Any
-from ai.provider import AIProvider
+from ai.provider import AIProvider, AsyncAIProvider
 
 def generate_coding_problem(jd_extract: Dict[str, Any], difficulty: str = "medium", 
                            ai_provider: AIProvider = None) -> Dict[str, Any]:
@@ -37,4 +37,16 @@ def review_code(problem: Dict[str, Any], code: str, test_results: Dict[str, Any]
     """
     return ai_provider.review_code(problem, code, test_results)
 
+async def generate_coding_problem_async(jd_extract: Dict[str, Any], difficulty: str = "medium",
+                                        ai_provider: AsyncAIProvider = None) -> Dict[str, Any]:
+    """Async variant of generate_coding_problem"""
+    if ai_provider is None:
+        raise ValueError("AI provider is required")
+    return await ai_provider.generate_coding_problem(jd_extract, difficulty)
+
+async def review_code_async(problem: Dict[str, Any], code: str, test_results: Dict[str, Any],
+                            ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Async variant of review_code"""
+    return await ai_provider.review_code(problem, code, test_results)
+
 
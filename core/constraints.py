@@ -1,61 +1,179 @@
 """
 Constraint Verification - Verifies rewrites meet constraints
+
+A constraint dict is compiled once into a BulletConstraints (required keywords become
+one Aho-Corasick automaton, the action-verb check uses the scorer's lexicon) and reused
+for every bullet it is checked against. Bullets that fail are re-prompted with their
+violations, all of them in one batch call per repair round, under a bounded attempt budget.
 """
-from typing import Dict, Any, List
+import json
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from ai.provider import AIProvider, AsyncAIProvider
+from core.keyword_matcher import SkillMatcher
+from core.scorer import ACTION_VERBS
+
+# Repair rounds per failing bullet, and bullet repairs allowed across one batch
+DEFAULT_REPAIR_ATTEMPTS = 2
+DEFAULT_REPAIR_BUDGET = 20
+
+_COMPILED_CACHE_SIZE = 128
+
+class BulletConstraints:
+    """Compiled constraint rules (max_length, min_length, required_keywords, must_start_with_action_verb)"""
+
+    def __init__(self, constraints: Dict[str, Any]):
+        self.max_length: Optional[int] = constraints.get("max_length")
+        self.min_length: Optional[int] = constraints.get("min_length")
+        self.required_keywords: List[str] = [str(k) for k in constraints.get("required_keywords") or [] if str(k).strip()]
+        self.must_start_with_action_verb = bool(constraints.get("must_start_with_action_verb", False))
+        # Whole-word matching with aliases ("k8s" satisfies "Kubernetes"), not bare substrings
+        self._keywords = SkillMatcher(self.required_keywords, include_components=False) if self.required_keywords else None
+
+    def check(self, bullet: str) -> List[str]:
+        """Violation messages for bullet (empty when it meets every rule)"""
+        violations = []
+        length = len(bullet.strip())
+        if self.max_length is not None and length > self.max_length:
+            violations.append(f"Exceeds max length of {self.max_length} characters")
+        if self.min_length is not None and length < self.min_length:
+            violations.append(f"Shorter than min length of {self.min_length} characters")
+        if self._keywords is not None:
+            found = self._keywords.match(bullet)
+            for keyword in self._keywords.keywords:
+                if keyword not in found:
+                    violations.append(f"Missing required keyword: {keyword}")
+        if self.must_start_with_action_verb:
+            words = bullet.split()
+            first_word = words[0].lower().strip(",.;:") if words else ""
+            if first_word not in ACTION_VERBS:
+                violations.append("Should start with an action verb")
+        return violations
 
-def verify_bullet_constraints(bullet: str, constraints: Dict[str, Any]) -> Dict[str, Any]:
+    def verify(self, bullet: str) -> Dict[str, Any]:
+        violations = self.check(bullet)
+        return {"is_valid": not violations, "violations": violations}
+
+_compiled: "OrderedDict[str, BulletConstraints]" = OrderedDict()
+
+def compile_constraints(constraints: Dict[str, Any]) -> BulletConstraints:
+    """BulletConstraints for a constraint dict, reused across calls with the same rules"""
+    key = json.dumps(constraints or {}, sort_keys=True, default=str)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = BulletConstraints(constraints or {})
+        _compiled[key] = compiled
+        if len(_compiled) > _COMPILED_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    else:
+        _compiled.move_to_end(key)
+    return compiled
+
+def verify_bullet_constraints(bullet: str, constraints: Any) -> Dict[str, Any]:
     """
     Verify bullet meets constraints
-    
+
     Args:
         bullet: Bullet text to verify
-        constraints: Constraint rules
-    
+        constraints: Constraint rules (dict) or a BulletConstraints
+
     Returns:
         Dict with is_valid, violations
     """
-    violations = []
-    
-    # Check max length
-    if "max_length" in constraints:
-        if len(bullet) > constraints["max_length"]:
-            violations.append(f"Exceeds max length of {constraints['max_length']} characters")
-    
-    # Check required keywords
-    if "required_keywords" in constraints:
-        bullet_lower = bullet.lower()
-        for keyword in constraints["required_keywords"]:
-            if keyword.lower() not in bullet_lower:
-                violations.append(f"Missing required keyword: {keyword}")
-    
-    # Check action verb
-    if constraints.get("must_start_with_action_verb", False):
-        action_verbs = ["developed", "created", "built", "designed", "implemented", 
-                       "optimized", "improved", "managed", "led", "achieved"]
-        first_word = bullet.split()[0].lower() if bullet.split() else ""
-        if first_word not in action_verbs:
-            violations.append("Should start with an action verb")
-    
+    if not isinstance(constraints, BulletConstraints):
+        constraints = compile_constraints(constraints)
+    return constraints.verify(bullet)
+
+def _repair_constraints(constraints: Dict[str, Any], violations: List[str]) -> Dict[str, Any]:
+    """Constraints for a repair prompt: the original rules plus what the last attempt broke"""
+    return {**constraints, "fix_violations": violations}
+
+class RepairBudget:
+    """Bullet repairs left for one batch; shared by its repair rounds"""
+
+    def __init__(self, calls: int):
+        self.remaining = max(0, calls)
+
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+def _repair_request(failing: Dict[str, Dict[str, Any]], attempts: Dict[str, int], max_attempts: int,
+                    budget: RepairBudget) -> List[Dict[str, Any]]:
+    """Batch entries for one repair round: bullets still failing with attempts left, while the budget lasts"""
+    request = []
+    for item_id, item in failing.items():
+        if item["violations"] and attempts[item_id] < max_attempts and budget.take():
+            request.append({"id": item_id, "bullet": item["bullet"],
+                            "constraints": _repair_constraints(item.get("extra") or {}, item["violations"])})
+    return request
+
+def _apply_repairs(failing: Dict[str, Dict[str, Any]], attempts: Dict[str, int],
+                   request: List[Dict[str, Any]], rewrites: Dict[str, str]):
+    """Re-verify the round's replies; a bullet the model skipped keeps its last candidate"""
+    for entry in request:
+        item = failing[entry["id"]]
+        attempts[entry["id"]] += 1
+        candidate = rewrites.get(entry["id"])
+        if candidate:
+            item["bullet"] = candidate
+            item["violations"] = compile_constraints(item.get("constraints") or {}).check(candidate)
+
+def _repair_results(failing: Dict[str, Dict[str, Any]], attempts: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
     return {
-        "is_valid": len(violations) == 0,
-        "violations": violations
+        item_id: {"bullet": item["bullet"], "is_valid": not item["violations"], "violations": item["violations"],
+                  "attempts": attempts[item_id]}
+        for item_id, item in failing.items()
     }
 
-def auto_repair_bullet(bullet: str, violations: List[str], ai_provider, context: Dict[str, Any]) -> str:
+def repair_bullets(failing: Dict[str, Dict[str, Any]], ai_provider: AIProvider, context: Dict[str, Any],
+                   constraints: Optional[Dict[str, Any]] = None, max_attempts: int = DEFAULT_REPAIR_ATTEMPTS,
+                   budget: int = DEFAULT_REPAIR_BUDGET) -> Tuple[Dict[str, Dict[str, Any]], int]:
     """
-    Attempt to auto-repair bullet based on violations
-    
+    Re-prompt failing bullets in rounds, each round one rewrite_bullets_batch call carrying every
+    bullet that still fails together with its violations
+
     Args:
-        bullet: Original bullet
-        violations: List of violation messages
+        failing: id -> {"bullet" (failed candidate), "violations", "constraints" (rules it is checked
+                 against), "extra" (per-bullet rules sent with it, optional)}
         ai_provider: AI provider instance
-        context: Context for rewriting
-    
+        context: Shared rewrite context
+        constraints: Rules shared by every bullet (sent once per round)
+        max_attempts: Repair rounds a bullet takes part in
+        budget: Bullet repairs across all rounds (bullets left without budget keep their candidate)
+
     Returns:
-        Repaired bullet
+        (id -> {"bullet", "is_valid", "violations", "attempts"}, batch calls made)
     """
-    # For now, return original - full repair would use AI
-    # This is a placeholder for the verification loop
-    return bullet
-
+    failing = {item_id: dict(item) for item_id, item in failing.items()}
+    attempts = {item_id: 0 for item_id in failing}
+    shared = RepairBudget(budget)
+    calls = 0
+    while True:
+        request = _repair_request(failing, attempts, max_attempts, shared)
+        if not request:
+            break
+        calls += 1
+        _apply_repairs(failing, attempts, request,
+                       ai_provider.rewrite_bullets_batch(request, constraints or {}, context) or {})
+    return _repair_results(failing, attempts), calls
 
+async def repair_bullets_async(failing: Dict[str, Dict[str, Any]], ai_provider: AsyncAIProvider,
+                               context: Dict[str, Any], constraints: Optional[Dict[str, Any]] = None,
+                               max_attempts: int = DEFAULT_REPAIR_ATTEMPTS,
+                               budget: int = DEFAULT_REPAIR_BUDGET) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """Async variant of repair_bullets"""
+    failing = {item_id: dict(item) for item_id, item in failing.items()}
+    attempts = {item_id: 0 for item_id in failing}
+    shared = RepairBudget(budget)
+    calls = 0
+    while True:
+        request = _repair_request(failing, attempts, max_attempts, shared)
+        if not request:
+            break
+        calls += 1
+        _apply_repairs(failing, attempts, request,
+                       await ai_provider.rewrite_bullets_batch(request, constraints or {}, context) or {})
+    return _repair_results(failing, attempts), calls
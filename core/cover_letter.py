@@ -2,7 +2,7 @@
 Cover Letter Generator
 """
 from typing import Dict, Any
-from ai.provider import AIProvider
+from ai.provider import AIProvider, AsyncAIProvider
 
 def generate_cover_letter(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], 
                          ai_provider: AIProvider, tone: str = "professional") -> str:
@@ -20,6 +20,11 @@ def generate_cover_letter(jd_extract: Dict[str, Any], resume_parse: Dict[str, An
     """
     return ai_provider.generate_cover_letter(jd_extract, resume_parse, tone)
 
+async def generate_cover_letter_async(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                                      ai_provider: AsyncAIProvider, tone: str = "professional") -> str:
+    """Async variant of generate_cover_letter"""
+    return await ai_provider.generate_cover_letter(jd_extract, resume_parse, tone)
+
 def format_cover_letter_with_links(cover_letter_text: str, resume_parse: Dict[str, Any]) -> str:
     """
     Format cover letter with header and platform links footer
@@ -1,21 +1,187 @@
 """
 Evidence Mapper - Maps JD requirements to resume evidence
 """
-from typing import Dict, Any
-from ai.provider import AIProvider
+import os
+from bisect import bisect_right
+from typing import Dict, Any, List, Tuple, Optional
+from ai.provider import AIProvider, AsyncAIProvider
+from core.keyword_matcher import SkillMatcher, skill_key
+from core.schemas import EvidenceMap
 
-def build_evidence_map(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], ai_provider: AIProvider) -> Dict[str, Any]:
+# Send skills the local matcher could not place to the LLM (off by default: costs a call per analysis)
+EVIDENCE_LLM_FALLBACK = os.getenv("EVIDENCE_LLM_FALLBACK", "false").lower() in ("1", "true", "yes")
+
+def iter_resume_segments(resume_parse: Dict[str, Any]) -> List[Tuple[Dict[str, Any], str]]:
+    """
+    Flatten a ResumeParse into citable text segments
+
+    Returns:
+        List of (citation, text); citation matches EvidenceCitation
+        (bullet_index is None for headers such as project title + tech stack)
+    """
+    segments = []
+    for i, exp in enumerate(resume_parse.get("experience") or []):
+        if not isinstance(exp, dict):
+            continue
+        header = " ".join(str(exp.get(k) or "") for k in ("role", "company"))
+        segments.append(({"section": "experience", "index": i, "bullet_index": None}, header))
+        for j, bullet in enumerate(exp.get("bullets") or []):
+            segments.append(({"section": "experience", "index": i, "bullet_index": j}, str(bullet)))
+    for i, proj in enumerate(resume_parse.get("projects") or []):
+        if not isinstance(proj, dict):
+            continue
+        header = " ".join([str(proj.get("title") or "")] + [str(t) for t in proj.get("tech_stack") or []])
+        segments.append(({"section": "projects", "index": i, "bullet_index": None}, header))
+        for j, bullet in enumerate(proj.get("bullets") or []):
+            segments.append(({"section": "projects", "index": i, "bullet_index": j}, str(bullet)))
+    skills = resume_parse.get("skills") or {}
+    if isinstance(skills, dict):
+        for i, items in enumerate(skills.values()):
+            if isinstance(items, list):
+                segments.append(({"section": "skills", "index": i, "bullet_index": None}, ", ".join(str(s) for s in items)))
+    for section in ("certifications", "extracurriculars"):
+        for i, item in enumerate(resume_parse.get(section) or []):
+            segments.append(({"section": section, "index": i, "bullet_index": None}, str(item)))
+    for i, edu in enumerate(resume_parse.get("education") or []):
+        if isinstance(edu, dict):
+            segments.append(({"section": "education", "index": i, "bullet_index": None}, str(edu.get("degree") or "")))
+    return segments
+
+def _jd_keywords(jd_extract: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """(all keywords to map, must-have skills)"""
+    must = [str(s) for s in jd_extract.get("must_have_skills") or [] if str(s).strip()]
+    nice = [str(s) for s in jd_extract.get("nice_to_have_skills") or [] if str(s).strip()]
+    extra = [str(s) for s in jd_extract.get("keywords") or [] if str(s).strip()]
+    return must + nice + extra, must
+
+def build_local_evidence_map(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Deterministic evidence map: one Aho-Corasick pass over every resume segment
+
+    Args:
+        jd_extract: JDExtract dict
+        resume_parse: ResumeParse dict
+
+    Returns:
+        EvidenceMap dict (evidence keyed by the JD's own skill strings; sub-skills that only
+        imply a keyword are listed under "inferred", not cited)
+    """
+    keywords, _ = _jd_keywords(jd_extract)
+    matcher = SkillMatcher(keywords)
+    segments = iter_resume_segments(resume_parse)
+
+    # Join all segments so the automaton scans the resume once; map offsets back via bisect.
+    starts = []
+    parts = []
+    offset = 0
+    for _, text in segments:
+        starts.append(offset)
+        parts.append(text)
+        offset += len(text) + 1
+    corpus = "\n".join(parts)
+
+    hits: List[List[str]] = [[] for _ in segments]
+    inferred: Dict[str, List[str]] = {}
+    for start, _, keyword, sub_skill in matcher.iter_hits(corpus):
+        if sub_skill is not None:
+            add_inferred(inferred, keyword, sub_skill)
+            continue
+        seg_hits = hits[bisect_right(starts, start) - 1]
+        if keyword not in seg_hits:
+            seg_hits.append(keyword)
+    return evidence_from_hits(jd_extract, [(citation, seg_hits) for (citation, _), seg_hits in zip(segments, hits)],
+                              inferred)
+
+def add_inferred(inferred: Dict[str, List[str]], keyword: str, sub_skill: str):
+    """Record that sub_skill (found in the resume) implies keyword"""
+    subs = inferred.setdefault(keyword, [])
+    if sub_skill not in subs:
+        subs.append(sub_skill)
+
+def _inferred_only(evidence: Dict[str, Any], inferred: Optional[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """Hierarchy credit for keywords that have no citation of their own"""
+    found = {skill_key(k) for k, v in evidence.items() if v}
+    return {k: list(v) for k, v in (inferred or {}).items() if v and skill_key(k) not in found}
+
+def evidence_from_hits(jd_extract: Dict[str, Any], segment_hits: List[Tuple[Dict[str, Any], List[str]]],
+                       inferred: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Assemble an evidence map from per-segment keyword hits
+
+    Args:
+        jd_extract: JDExtract dict
+        segment_hits: (citation, JD keywords found in that segment) in resume order
+        inferred: JD keyword -> sub-skills found in the resume that imply it
+
+    Returns:
+        EvidenceMap dict; "missing" lists must-haves without a citation, including ones
+        that only have inferred credit
+    """
+    _, must = _jd_keywords(jd_extract)
+    evidence: Dict[str, List[Dict[str, Any]]] = {}
+    for citation, keywords in segment_hits:
+        for keyword in keywords:
+            evidence.setdefault(keyword, []).append(dict(citation))
+    found = {skill_key(k) for k in evidence}
+    missing = [s for s in must if skill_key(s) not in found]
+    return {"evidence": evidence, "missing": missing, "inferred": _inferred_only(evidence, inferred)}
+
+def _leftover_jd(jd_extract: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    """JD restricted to the keywords the local pass could not place"""
+    found = {skill_key(k) for k in local["evidence"]}
+    return {
+        "must_have_skills": [s for s in jd_extract.get("must_have_skills") or [] if skill_key(s) not in found],
+        "nice_to_have_skills": [s for s in jd_extract.get("nice_to_have_skills") or [] if skill_key(s) not in found],
+    }
+
+def _merge_fuzzy(jd_extract: Dict[str, Any], local: Dict[str, Any], fuzzy: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold LLM citations for leftover skills back into the local map"""
+    evidence = dict(local["evidence"])
+    leftover_jd = _leftover_jd(jd_extract, local)
+    leftovers = {skill_key(s): s for s in leftover_jd["must_have_skills"] + leftover_jd["nice_to_have_skills"]}
+    for keyword, citations in (fuzzy.get("evidence") or {}).items():
+        original = leftovers.get(skill_key(keyword))
+        if original and isinstance(citations, list) and citations:
+            evidence[original] = citations
+    found = {skill_key(k) for k in evidence}
+    missing = [s for s in jd_extract.get("must_have_skills") or [] if skill_key(s) not in found]
+    return _validate_evidence_map({"evidence": evidence, "missing": missing,
+                                   "inferred": _inferred_only(evidence, local.get("inferred"))})
+
+def _validate_evidence_map(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate against schema"""
+    try:
+        return EvidenceMap(**result).model_dump()
+    except Exception:
+        return result
+
+def build_evidence_map(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                       ai_provider: Optional[AIProvider] = None,
+                       fuzzy_fallback: bool = EVIDENCE_LLM_FALLBACK) -> Dict[str, Any]:
     """
     Build evidence map between JD and resume
-    
+
     Args:
         jd_extract: JDExtract dict
         resume_parse: ResumeParse dict
-        ai_provider: AI provider instance
-    
+        ai_provider: AI provider instance (only used when fuzzy_fallback is set)
+        fuzzy_fallback: Ask the LLM to place skills the exact/alias pass could not find
+
     Returns:
         EvidenceMap dict
     """
-    return ai_provider.build_evidence_map(jd_extract, resume_parse)
-
+    local = build_local_evidence_map(jd_extract, resume_parse)
+    leftovers = _leftover_jd(jd_extract, local)
+    if not fuzzy_fallback or ai_provider is None or not (leftovers["must_have_skills"] or leftovers["nice_to_have_skills"]):
+        return _validate_evidence_map(local)
+    return _merge_fuzzy(jd_extract, local, ai_provider.build_evidence_map(leftovers, resume_parse))
 
+async def build_evidence_map_async(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                                   ai_provider: Optional[AsyncAIProvider] = None,
+                                   fuzzy_fallback: bool = EVIDENCE_LLM_FALLBACK) -> Dict[str, Any]:
+    """Async variant of build_evidence_map"""
+    local = build_local_evidence_map(jd_extract, resume_parse)
+    leftovers = _leftover_jd(jd_extract, local)
+    if not fuzzy_fallback or ai_provider is None or not (leftovers["must_have_skills"] or leftovers["nice_to_have_skills"]):
+        return _validate_evidence_map(local)
+    return _merge_fuzzy(jd_extract, local, await ai_provider.build_evidence_map(leftovers, resume_parse))
@@ -0,0 +1,166 @@
+"""
+Incremental Rescoring - Re-score a resume edit by recomputing only the bullets that changed
+
+Every experience/project bullet is identified by a hash of its text. Its contribution to a
+job's score (lint feature row + JD keywords it evidences) depends only on that text and the
+job's JD, so contributions are cached per (job, bullet hash). A rescore looks up unchanged
+bullets, computes the new or edited ones in one batch, rescans the short non-bullet segments
+(headers, skills, education) and reassembles evidence and score locally - no LLM call.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from core.keyword_matcher import SkillMatcher, skill_key
+from core.evidence_mapper import (
+    iter_resume_segments, evidence_from_hits, add_inferred, _inferred_only, _jd_keywords, _validate_evidence_map,
+)
+from core.scorer import (
+    lint_bullets, jd_lint_keywords, score_from_bullet_features, rule_based_top_fixes, _validate_score_breakdown,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+# Bump when the matching rules change: cached contributions from another version are recomputed
+CONTRIBUTION_VERSION = 2
+
+def bullet_hash(text: str) -> str:
+    """Content hash of a bullet (whitespace-insensitive)"""
+    return hashlib.sha1(_WHITESPACE.sub(" ", str(text)).strip().encode("utf-8")).hexdigest()[:16]
+
+def resume_fingerprint(resume_parse: Dict[str, Any]) -> str:
+    """Hash of a whole ResumeParse; a stored score is current only while this matches"""
+    canonical = json.dumps(resume_parse or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def bullet_records(resume_parse: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-bullet records (section, entry_index, bullet_index, text, content_hash) in resume order"""
+    records = []
+    for citation, text in iter_resume_segments(resume_parse):
+        if citation["bullet_index"] is None:
+            continue
+        records.append({
+            "section": citation["section"],
+            "entry_index": citation["index"],
+            "bullet_index": citation["bullet_index"],
+            "text": text,
+            "content_hash": bullet_hash(text),
+        })
+    return records
+
+def bullet_contributions(jd_extract: Dict[str, Any], texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Score contributions of bullets against a JD
+
+    Returns:
+        One {"features": lint feature row, "skills": JD keywords evidenced,
+        "inferred": [keyword, sub-skill] pairs, "version"} per text
+    """
+    if not texts:
+        return []
+    keywords, _ = _jd_keywords(jd_extract)
+    matcher = SkillMatcher(keywords)
+    features, _ = lint_bullets(texts, jd_lint_keywords(jd_extract))
+    contributions = []
+    for text, row in zip(texts, features):
+        skills, inferred = [], []
+        for _, _, keyword, sub_skill in matcher.iter_hits(text):
+            if sub_skill is not None:
+                if [keyword, sub_skill] not in inferred:
+                    inferred.append([keyword, sub_skill])
+            elif keyword not in skills:
+                skills.append(keyword)
+        contributions.append({"features": [float(v) for v in row], "skills": skills, "inferred": inferred,
+                              "version": CONTRIBUTION_VERSION})
+    return contributions
+
+def _carry_over_citations(evidence_map: Dict[str, Any], stored_evidence_map: Optional[Dict[str, Any]],
+                          segments: List[Tuple[Dict[str, Any], str]], changed: set) -> Dict[str, Any]:
+    """Keep stored (e.g. LLM-placed) citations for skills the local pass misses, if they still point at unchanged text"""
+    stored = (stored_evidence_map or {}).get("evidence") or {}
+    if not stored:
+        return evidence_map
+    evidence = evidence_map["evidence"]
+    found = {skill_key(k) for k in evidence}
+    valid = {(c["section"], c["index"], c["bullet_index"]) for c, _ in segments}
+    for keyword, citations in stored.items():
+        if skill_key(keyword) in found or not isinstance(citations, list):
+            continue
+        kept = [
+            c for c in citations
+            if isinstance(c, dict)
+            and (c.get("section"), c.get("index"), c.get("bullet_index")) in valid
+            and (c.get("section"), c.get("index"), c.get("bullet_index")) not in changed
+        ]
+        if kept:
+            evidence[keyword] = kept
+            found.add(skill_key(keyword))
+    evidence_map["missing"] = [s for s in evidence_map["missing"] if skill_key(s) not in found]
+    evidence_map["inferred"] = _inferred_only(evidence, evidence_map.get("inferred"))
+    return evidence_map
+
+def rescore_incremental(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                        cached_contributions: Dict[str, Dict[str, Any]],
+                        stored_evidence_map: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Re-score a (possibly edited) resume against a job, reusing cached per-bullet contributions
+
+    Args:
+        jd_extract: JDExtract dict
+        resume_parse: ResumeParse dict as it is now
+        cached_contributions: content_hash -> contribution for this job (from earlier rescoring)
+        stored_evidence_map: Previously saved evidence map; citations it holds for skills the
+            local matcher cannot place are kept while they point at unchanged segments
+
+    Returns:
+        {"evidence_map", "score_breakdown", "new_contributions" (hash -> contribution to cache),
+         "rescored_bullets", "reused_bullets"}
+    """
+    segments = iter_resume_segments(resume_parse)
+    records = bullet_records(resume_parse)
+    cached_contributions = {h: c for h, c in cached_contributions.items() if c.get("version") == CONTRIBUTION_VERSION}
+    missing_texts: Dict[str, str] = {}
+    for record in records:
+        if record["content_hash"] not in cached_contributions:
+            missing_texts.setdefault(record["content_hash"], record["text"])
+    new_contributions = dict(zip(missing_texts, bullet_contributions(jd_extract, list(missing_texts.values()))))
+    contributions = {**cached_contributions, **new_contributions}
+
+    # Non-bullet segments (headers, skills, certifications, education) are short; rescan them
+    keywords, _ = _jd_keywords(jd_extract)
+    matcher = SkillMatcher(keywords)
+    by_position = {(r["section"], r["entry_index"], r["bullet_index"]): r["content_hash"] for r in records}
+    segment_hits = []
+    inferred: Dict[str, List[str]] = {}
+    for citation, text in segments:
+        position = (citation["section"], citation["index"], citation["bullet_index"])
+        if position in by_position:
+            contribution = contributions[by_position[position]]
+            segment_hits.append((citation, contribution["skills"]))
+            for keyword, sub_skill in contribution.get("inferred") or []:
+                add_inferred(inferred, keyword, sub_skill)
+        else:
+            hits = []
+            for _, _, keyword, sub_skill in matcher.iter_hits(text):
+                if sub_skill is not None:
+                    add_inferred(inferred, keyword, sub_skill)
+                elif keyword not in hits:
+                    hits.append(keyword)
+            segment_hits.append((citation, hits))
+    changed = {(r["section"], r["entry_index"], r["bullet_index"]) for r in records if r["content_hash"] in new_contributions}
+    evidence_map = _carry_over_citations(evidence_from_hits(jd_extract, segment_hits, inferred), stored_evidence_map,
+                                         segments, changed)
+
+    bullet_refs = [(r["section"], r["entry_index"], r["bullet_index"], r["text"]) for r in records]
+    features = np.array([contributions[r["content_hash"]]["features"] for r in records], dtype=float)
+    breakdown, bullet_refs, bullet_scores = score_from_bullet_features(jd_extract, resume_parse, evidence_map,
+                                                                       bullet_refs, features)
+    # Rule-based fixes keep the edit loop free of LLM calls; a full /score rephrases them
+    breakdown["top_fixes"] = rule_based_top_fixes(breakdown, bullet_refs, bullet_scores)
+    return {
+        "evidence_map": _validate_evidence_map(evidence_map),
+        "score_breakdown": _validate_score_breakdown(breakdown),
+        "new_contributions": new_contributions,
+        "rescored_bullets": len(missing_texts),
+        "reused_bullets": len(records) - sum(1 for r in records if r["content_hash"] in new_contributions),
+    }
@@ -2,7 +2,7 @@
 Interview Practice Engine
 """
 from typing import Dict, Any, List, Optional
-from ai.provider import AIProvider
+from ai.provider import AIProvider, AsyncAIProvider
 
 def generate_interview_question(jd_extract: Dict[str, Any], mode: str, 
                                previous_questions: List[str] = None, 
@@ -39,4 +39,17 @@ def score_star_response(question: str, response: str, jd_extract: Dict[str, Any]
     """
     return ai_provider.score_star_response(question, response, jd_extract)
 
+async def generate_interview_question_async(jd_extract: Dict[str, Any], mode: str,
+                                            previous_questions: List[str] = None,
+                                            ai_provider: AsyncAIProvider = None) -> Dict[str, Any]:
+    """Async variant of generate_interview_question"""
+    if ai_provider is None:
+        raise ValueError("AI provider is required")
+    return await ai_provider.generate_interview_question(jd_extract, mode, previous_questions)
+
+async def score_star_response_async(question: str, response: str, jd_extract: Dict[str, Any],
+                                    ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Async variant of score_star_response"""
+    return await ai_provider.score_star_response(question, response, jd_extract)
+
 
@@ -1,32 +1,335 @@
 """
 Job Description Parser
+
+A rule-based pre-pass runs first: benefits, EEO and company boilerplate are stripped,
+seniority is read from the title and experience requirements, and skills are matched
+against the skill taxonomy into the languages / frameworks / tools fields. The LLM is only
+called to fill what the pre-pass could not (no title, no requirement bullets, requirements
+the taxonomy does not cover), and only sees the title and the requirement sections.
 """
-from typing import Dict, Any
-from ai.provider import AIProvider
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set, Tuple
+from ai.provider import AIProvider, AsyncAIProvider
+from ai.prompt_budget import get_prompt_stats
 from core.schemas import JDExtract
+from core.keyword_matcher import skill_key
+from core.skill_taxonomy import get_skill_taxonomy
+
+# Heading kinds, tried in order (a heading belongs to the first pattern found in it)
+_SECTION_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("boilerplate", re.compile(r"benefits|perks|compensation|salary|pay range|what we offer|why join|why us|"
+                               r"equal (?:employment )?opportunity|\beeo\b|diversity|accommodations?|how to apply|"
+                               r"life at|working at|hiring process|privacy|our (?:mission|values|culture|story)", re.I)),
+    ("nice", re.compile(r"nice[ -]to[ -]haves?|preferred|bonus(?: points)?|\bplus(?:es)?\b|desired|good to have|extra credit", re.I)),
+    ("must", re.compile(r"requirements?|qualifications?|required|must[ -]haves?|what you(?:'ll)? (?:need|bring)|"
+                        r"who you are|you (?:have|bring|should have)|skills|about you|"
+                        r"what we(?:'re| are) looking for|experience", re.I)),
+    ("responsibilities", re.compile(r"responsibilities|what you(?:'ll| will)? (?:do|be doing)|the role|role overview|"
+                                    r"your role|duties|day[ -]to[ -]day|in this role|you will|the job", re.I)),
+    # Any other "About ..." heading is the company pitch
+    ("boilerplate", re.compile(r"about\b|who we are|the company|location", re.I)),
+]
+_MAX_HEADING_WORDS = 8
+
+# Sentences that are boilerplate wherever they appear
+_BOILERPLATE_LINE = re.compile(
+    r"equal (?:employment )?opportunity|without regard to|race, (?:color|religion)|sexual orientation|gender identity|"
+    r"protected (?:veteran|status|characteristic)|reasonable accommodation|e-verify|401\(?k\)?|health,? dental|"
+    r"dental,? (?:and )?vision|paid time off|\bpto\b|parental leave|stock options|equity package|"
+    r"salary range|base (?:salary|pay)|\$\d{2,3}(?:,\d{3}|k)|applicants? (?:with|who)|background check|"
+    r"we are proud to be|privacy (?:notice|policy)|by applying",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[•·▪◦●○■□►▸‣⁃∙*–—-]|\d{1,2}[.)])\s+")
+_TITLE_LINE = re.compile(r"^(?:job\s+)?(?:title|position|role)\s*:\s*(.+)$", re.IGNORECASE)
+_TITLE_WORDS = re.compile(
+    r"\b(?:engineer|developer|programmer|intern|analyst|scientist|designer|architect|manager|specialist|"
+    r"administrator|consultant|researcher|lead|sre|devops|technician|associate)\b",
+    re.IGNORECASE,
+)
+_YEARS = re.compile(r"(\d{1,2})\s*(?:\+|-\s*\d{1,2}|to\s+\d{1,2})?\s*\+?\s*years?", re.IGNORECASE)
+
+_SENIORITY_TITLE = [
+    ("intern", re.compile(r"\bintern(?:ship)?s?\b|\bco-?op\b|\bsummer (?:analyst|associate)\b", re.I)),
+    ("senior", re.compile(r"\b(?:senior|sr\.?|staff|principal|lead|head of|distinguished|architect)\b", re.I)),
+    ("junior", re.compile(r"\b(?:junior|jr\.?|entry[ -]level|new grad(?:uate)?|graduate|early career|associate)\b|\b(?:engineer|developer) i\b", re.I)),
+    ("mid", re.compile(r"\b(?:mid[ -]level|intermediate)\b|\b(?:engineer|developer) (?:ii|2)\b", re.I)),
+]
+
+# Domain -> indicative terms (first domain with the most hits wins)
+DOMAIN_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "fintech": ("fintech", "payments", "banking", "trading", "lending", "financial services", "insurance"),
+    "healthcare": ("healthcare", "health care", "clinical", "patients", "medical", "hipaa", "biotech"),
+    "e-commerce": ("e-commerce", "ecommerce", "retail", "marketplace", "checkout", "merchants"),
+    "telecom": ("telecom", "5g", "lte", "wireless", "network operators"),
+    "gaming": ("gaming", "game engine", "unity", "unreal", "players"),
+    "data": ("data pipelines", "analytics", "data warehouse", "etl", "business intelligence"),
+    "ml": ("machine learning", "deep learning", "llm", "computer vision", "nlp", "model training"),
+    "security": ("security", "cybersecurity", "threat", "vulnerability", "soc 2"),
+    "mobile": ("ios", "android", "mobile app", "react native", "flutter"),
+    "web": ("web application", "frontend", "front-end", "full-stack", "full stack", "web app", "websites"),
+}
+
+# Taxonomy categories that have their own JDExtract list field
+_CATEGORY_FIELDS = ("languages", "frameworks", "tools")
+
+# Words of a requirement, and capitalised words that are not technology names
+_WORD = re.compile(r"[A-Za-z][\w+#.'/-]*")
+_PLAIN_CAPITALISED = frozenset("""
+    bachelor bachelor's bachelors master master's masters phd ms bs ba ma mba degree computer science
+    engineering mathematics math physics statistics english i we you our us u.s. cs ee stem
+""".split())
+
+def match_skills(text: str) -> List[str]:
+    """Taxonomy skills mentioned in text, in order of first mention"""
+    found = get_skill_taxonomy().find(text)
+    # "Spring Boot" also matches "Spring"; keep the longer name only
+    return [s for s in found if not any(o != s and o.startswith(s + " ") for o in found)]
+
+def _unmatched_terms(item: str) -> List[str]:
+    """
+    Words of a requirement outside every taxonomy match that look like technology names: inner
+    capitals, digits or symbols ("PySpark", "S3", "C++"), or capitalised mid-sentence ("Flink")
+    """
+    covered = [(start, end) for start, end, _ in get_skill_taxonomy().mentions(item)]
+    terms = []
+    for m in _WORD.finditer(item):
+        if any(start < m.end() and m.start() < end for start, end in covered):
+            continue
+        word = m.group().rstrip(".'/-")
+        if len(word) < 2 or word.lower() in _PLAIN_CAPITALISED:
+            continue
+        sentence_start = not item[:m.start()].strip() or item[:m.start()].rstrip()[-1] in ".:;!?("
+        technical = (any(c.isdigit() or c in "+#." for c in word) or any(c.isupper() for c in word[1:])
+                     or (word[0].isupper() and not sentence_start))
+        if technical:
+            terms.append(word)
+    return terms
+
+@dataclass
+class JDPrepass:
+    """Local pre-extraction of a job description"""
+    extract: Dict[str, Any]
+    # JDExtract fields the pre-pass could not fill
+    gaps: Set[str] = field(default_factory=set)
+    # Title and requirement sections (boilerplate removed); what the LLM sees when gaps remain
+    llm_text: str = ""
+
+def _heading_kind(line: str) -> Optional[str]:
+    text = _BULLET.sub("", line).strip().rstrip(":").strip(" #*=-")
+    if not text or len(text.split()) > _MAX_HEADING_WORDS or text.endswith((".", ",", ";")):
+        return None
+    # Headings are ":"-terminated, Title Case or ALL CAPS lines
+    words = [w for w in re.findall(r"[A-Za-z][\w'-]*", text) if len(w) > 3]
+    titled = line.strip().endswith(":") or text.isupper() or all(w[0].isupper() for w in words)
+    if not titled:
+        return None
+    for kind, pattern in _SECTION_PATTERNS:
+        if pattern.search(text):
+            return kind
+    return None
+
+def _split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """[(kind, lines)]; text before the first recognized heading is "intro" """
+    sections: List[Tuple[str, List[str]]] = [("intro", [])]
+    for line in lines:
+        kind = _heading_kind(line) if line.strip() else None
+        if kind:
+            sections.append((kind, [line.strip()]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+def _items(lines: List[str]) -> List[str]:
+    """Bullet (or one-per-line) items of a section, headings and boilerplate sentences removed"""
+    items: List[str] = []
+    for line in lines[1:] if lines and _heading_kind(lines[0]) else lines:
+        text = _BULLET.sub("", line).strip()
+        if not text or _BOILERPLATE_LINE.search(text):
+            continue
+        if items and not _BULLET.match(line) and text[:1].islower():
+            items[-1] += " " + text
+        else:
+            items.append(text)
+    return items
+
+def _role_title(lines: List[str]) -> Optional[str]:
+    for line in lines:
+        match = _TITLE_LINE.match(line.strip())
+        if match:
+            return match.group(1).strip()
+    for line in lines[:5]:
+        text = line.strip().strip("#*").strip()
+        if text and len(text.split()) <= 10 and not text.endswith(".") and _TITLE_WORDS.search(text):
+            # "Backend Engineer - Payments | Acme" -> "Backend Engineer - Payments"
+            return re.split(r"\s+[|@]\s+|\s+at\s+", text)[0].strip()
+    return None
+
+def _seniority(title: Optional[str], requirement_text: str) -> Optional[str]:
+    for level, pattern in _SENIORITY_TITLE:
+        if title and pattern.search(title):
+            return level
+    years = [int(m.group(1)) for m in _YEARS.finditer(requirement_text) if int(m.group(1)) <= 20]
+    if years:
+        least = min(years)
+        return "junior" if least <= 1 else "mid" if least <= 4 else "senior"
+    if re.search(r"\b(?:internship|new grads?|entry[ -]level|recent graduates?)\b", requirement_text, re.I):
+        return "junior" if not re.search(r"\binternship\b", requirement_text, re.I) else "intern"
+    if title:
+        # A plain title ("Software Engineer") with no level or experience requirement
+        return "mid"
+    return None
+
+def _domain(text: str) -> Optional[str]:
+    lowered = text.lower()
+    best, hits = None, 0
+    for domain, terms in DOMAIN_KEYWORDS.items():
+        count = sum(1 for term in terms if re.search(rf"(?<![\w-]){re.escape(term)}(?![\w-])", lowered))
+        if count > hits:
+            best, hits = domain, count
+    return best
+
+def prepass_jd(jd_text: str) -> JDPrepass:
+    """
+    Extract JDExtract fields locally, noting which still need the LLM
+
+    Args:
+        jd_text: Raw job description text
+
+    Returns:
+        JDPrepass (partial JDExtract dict, gap fields, text for the gap-filling call)
+    """
+    lines = jd_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    sections = _split_sections(lines)
+    by_kind: Dict[str, List[str]] = {}
+    for kind, body in sections:
+        if kind != "boilerplate":
+            by_kind.setdefault(kind, []).extend(_items(body))
+
+    title = _role_title(lines)
+    must_items = by_kind.get("must", [])
+    nice_items = by_kind.get("nice", [])
+    responsibilities = by_kind.get("responsibilities", [])
+    intro_items = [i for i in by_kind.get("intro", []) if i != title and not _TITLE_LINE.match(i)]
+    if not must_items and not nice_items:
+        # No requirement headings: requirements are wherever the skills are mentioned
+        must_items = [i for i in intro_items + responsibilities if match_skills(i)]
+
+    must = match_skills("\n".join(must_items))
+    nice = [s for s in match_skills("\n".join(nice_items)) if s not in must]
+    mentioned = match_skills("\n".join(intro_items + responsibilities))
+    requirement_text = "\n".join(must_items + nice_items)
+    extract: Dict[str, Any] = {
+        "role_title": title or "",
+        "seniority": _seniority(title, requirement_text + "\n" + "\n".join(intro_items)),
+        "must_have_skills": must,
+        "nice_to_have_skills": nice,
+        "languages": [], "frameworks": [], "tools": [],
+        "responsibilities": responsibilities,
+        "keywords": [],
+        "domain": _domain("\n".join(intro_items + responsibilities + must_items)),
+    }
+    taxonomy = get_skill_taxonomy()
+    for skill in must + nice + [s for s in mentioned if s not in must and s not in nice]:
+        if taxonomy.category(skill) in _CATEGORY_FIELDS:
+            extract[taxonomy.category(skill)].append(skill)
+        extract["keywords"].append(skill)
+
+    gaps: Set[str] = set()
+    if not title:
+        gaps.add("role_title")
+    if extract["seniority"] is None:
+        gaps.add("seniority")
+    if not responsibilities:
+        gaps.add("responsibilities")
+    # Requirements the taxonomy does not cover ("distributed systems design", "stakeholder management"),
+    # or covers only in part ("Kafka and Flink" when only Kafka is known)
+    unmatched = [i for i in must_items if not match_skills(i)]
+    if not must or len(unmatched) * 2 > len(must_items) or any(_unmatched_terms(i) for i in must_items):
+        gaps.add("must_have_skills")
+
+    parts = [f"Title: {title}"] if title else []
+    if must_items:
+        parts.append("Requirements:\n" + "\n".join(f"- {i}" for i in must_items))
+    if nice_items:
+        parts.append("Nice to have:\n" + "\n".join(f"- {i}" for i in nice_items))
+    if "responsibilities" in gaps or not (must_items or nice_items):
+        # No structure found: send everything that is not boilerplate
+        rest = [i for i in intro_items + responsibilities if i not in must_items]
+        if rest:
+            parts.append("\n".join(rest))
+    return JDPrepass(extract=extract, gaps=gaps, llm_text="\n\n".join(parts))
+
+def merge_jd_extract(local: JDPrepass, llm_extract: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill the pre-pass gaps from the LLM's extraction
+
+    Scalars found locally are kept; list fields take the local matches followed by any new LLM items.
+    """
+    merged = dict(local.extract)
+    llm_extract = llm_extract if isinstance(llm_extract, dict) else {}
+    for name in ("role_title", "seniority", "domain"):
+        if not merged.get(name) and llm_extract.get(name):
+            merged[name] = llm_extract[name]
+    for name in ("must_have_skills", "nice_to_have_skills", "languages", "frameworks", "tools", "responsibilities", "keywords"):
+        items = list(merged.get(name) or [])
+        seen = {skill_key(i) for i in items}
+        for item in llm_extract.get(name) or []:
+            key = skill_key(item)
+            if key and key not in seen:
+                seen.add(key)
+                items.append(item)
+        merged[name] = items
+    if merged.get("seniority") is None:
+        merged["seniority"] = "mid"
+    return merged
+
+def _prepass(jd_text: str) -> JDPrepass:
+    """prepass_jd, recording how much of the JD still goes to the LLM (/api/metrics)"""
+    local = prepass_jd(jd_text)
+    get_prompt_stats().record("extract_jd", jd_text, local.llm_text if local.gaps else "", bool(local.gaps))
+    return local
 
 def extract_jd(jd_text: str, ai_provider: AIProvider) -> Dict[str, Any]:
     """
     Extract structured data from job description
-    
+
+    The local pre-pass fills what it can; the LLM is called (on the requirement sections
+    only) when fields are left over.
+
     Args:
         jd_text: Raw job description text
         ai_provider: AI provider instance
-    
+
     Returns:
         JDExtract dict
     """
     if not jd_text or not jd_text.strip():
         raise ValueError("Job description text is required")
-    
-    result = ai_provider.extract_jd(jd_text)
-    
-    # Validate against schema
+
+    local = _prepass(jd_text)
+    if not local.gaps:
+        return _validate_jd_extract(local.extract)
+    result = ai_provider.extract_jd(local.llm_text)
+    return _validate_jd_extract(merge_jd_extract(local, result))
+
+async def extract_jd_async(jd_text: str, ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Async variant of extract_jd for use inside the API event loop"""
+    if not jd_text or not jd_text.strip():
+        raise ValueError("Job description text is required")
+
+    local = _prepass(jd_text)
+    if not local.gaps:
+        return _validate_jd_extract(local.extract)
+    result = await ai_provider.extract_jd(local.llm_text)
+    return _validate_jd_extract(merge_jd_extract(local, result))
+
+def _validate_jd_extract(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate against schema"""
     try:
         validated = JDExtract(**result)
         return validated.model_dump()
     except Exception as e:
         # Return raw result if validation fails (for debugging)
         return result
-
-
@@ -0,0 +1,173 @@
+"""
+Keyword Matcher - Aho-Corasick multi-pattern matching with skill alias normalization
+
+Aliases and the skill hierarchy come from the shared skill taxonomy (core.skill_taxonomy):
+a keyword matches any spelling of itself; a sub-skill ("Postgres" for "SQL") is reported
+separately as inferred credit, never as a direct occurrence.
+Matching is case-insensitive, except that ambiguous names ("Go", "React", "Node", "C") must
+appear with their exact spelling and outside label contexts such as "plan C".
+"""
+import re
+from collections import deque
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Tuple, Set
+from core.skill_taxonomy import get_skill_taxonomy, normalize_term
+
+# Leading qualifiers stripped from JD phrases such as "Familiarity with version control (Git)"
+_FILLER_PREFIX = re.compile(
+    r"^(?:(?:strong|solid|good|excellent|proven|hands-on|working|deep|basic)\s+)*"
+    r"(?:experience|knowledge|familiarity|proficiency|understanding|expertise|exposure|skills?)"
+    r"(?:\s+(?:with|of|in|using))?\s+",
+    re.IGNORECASE,
+)
+_COMPONENT_SPLIT = re.compile(r"[,;/()]|\s+or\s+|\s+and\s+|\s+&\s+", re.IGNORECASE)
+_TRAILING_PREPOSITION = re.compile(r"^.*\s(?:in|with|of|using)\s+", re.IGNORECASE)
+_MAX_COMPONENT_WORDS = 3
+
+def canonical_skill(term: str) -> str:
+    """Map an alias to its canonical skill name (unknown terms are returned stripped)"""
+    return get_skill_taxonomy().canonical(term)
+
+def skill_key(term: str) -> str:
+    """Dedup key shared by every spelling of a skill ("JS" and "JavaScript" compare equal)"""
+    return get_skill_taxonomy().key(term)
+
+def surface_forms(keyword: str, include_children: bool = False) -> Set[str]:
+    """All normalized strings that count as an occurrence of keyword (optionally of its sub-skills too)"""
+    return get_skill_taxonomy().surface_forms(keyword, include_children=include_children)
+
+def keyword_components(keyword: str) -> Set[str]:
+    """
+    Short skill terms inside a JD phrase, e.g.
+    "Experience with web development (HTML, CSS, JavaScript)" -> {"html", "css", "javascript"}
+    """
+    components = set()
+    for part in _COMPONENT_SPLIT.split(keyword):
+        part = _FILLER_PREFIX.sub("", part.strip())
+        if len(part.split()) > _MAX_COMPONENT_WORDS:
+            part = _TRAILING_PREPOSITION.sub("", part)
+        part = normalize_term(part)
+        if part and len(part.split()) <= _MAX_COMPONENT_WORDS and part != normalize_term(keyword):
+            components.add(part)
+    return components
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+class AhoCorasick:
+    """Aho-Corasick automaton over lowercase text; reports whole-word matches only"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload: Any):
+        """Add a (normalized) pattern carrying payload"""
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (BFS)"""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, payload) for every whole-word match in text (text is lowercased here)"""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, payload in self._out[state]:
+                start = i - length + 1
+                end = i + 1
+                # Word boundaries: "java" must not match inside "javascript", "c" not inside "c++".
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if end < n and _is_word_char(text[end - 1]) and (_is_word_char(text[end]) or text[end] in "+#"):
+                    continue
+                yield start, end, payload
+
+class SkillMatcher:
+    """
+    Matches a fixed list of JD keywords (with aliases and phrase components) in free text
+
+    iter_matches reports direct occurrences only; iter_inferred reports sub-skills that imply a
+    keyword through the taxonomy hierarchy (React implies JavaScript) for callers that give
+    such hierarchy credit separately; iter_hits reports both in one pass.
+    """
+
+    def __init__(self, keywords: Iterable[str], include_components: bool = True):
+        self.keywords: List[str] = []
+        seen = set()
+        for kw in keywords:
+            kw = str(kw).strip()
+            if kw and normalize_term(kw) not in seen:
+                seen.add(normalize_term(kw))
+                self.keywords.append(kw)
+        taxonomy = get_skill_taxonomy()
+        # Payload (keyword index, sub-skill name or None for a direct form)
+        self._automaton = AhoCorasick()
+        for idx, kw in enumerate(self.keywords):
+            terms = [kw] + (sorted(keyword_components(kw)) if include_components else [])
+            direct: Set[str] = set()
+            for term in terms:
+                direct |= surface_forms(term)
+            for form in direct:
+                self._automaton.add(form, (idx, None))
+            for term in terms:
+                for child in taxonomy.descendants(term):
+                    for form in surface_forms(child) - direct:
+                        self._automaton.add(form, (idx, child))
+        self._automaton.build()
+
+    def iter_hits(self, text: str) -> Iterator[Tuple[int, int, str, Optional[str]]]:
+        """Yield (start, end, keyword, sub-skill) for every hit; sub-skill is None for a direct occurrence"""
+        taxonomy = get_skill_taxonomy()
+        for start, end, (idx, child) in self._automaton.iter_matches(text):
+            # Ambiguous forms ("Go", "React", "C") are checked against the original text
+            if taxonomy.is_mention(text, start, end):
+                yield start, end, self.keywords[idx], child
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, keyword) for each direct occurrence"""
+        for start, end, keyword, child in self.iter_hits(text):
+            if child is None:
+                yield start, end, keyword
+
+    def iter_inferred(self, text: str) -> Iterator[Tuple[int, int, str, str]]:
+        """Yield (start, end, keyword, sub-skill) for each occurrence of a sub-skill of a keyword"""
+        for start, end, keyword, child in self.iter_hits(text):
+            if child is not None:
+                yield start, end, keyword, child
+
+    def match(self, text: str) -> Set[str]:
+        """Keywords that occur in text"""
+        return {kw for _, _, kw in self.iter_matches(text)}
@@ -0,0 +1,245 @@
+"""
+PDF Text Extraction - pypdf extraction in a worker process pool, cached by file hash
+
+Extraction runs in separate processes so a pathological PDF can be abandoned at a
+deadline without stalling the API. A timeout only affects its own call: the pool it ran on
+is retired (new calls get a fresh pool) and terminated once the other extractions still
+running on it have finished. Large PDFs with many pages are split into page ranges
+extracted in parallel; small files are extracted in one round trip. Results are cached in
+memory by the SHA-256 of the file, so re-uploads and retries skip the work entirely.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# Seconds before an extraction is abandoned
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "20"))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Page count from which a PDF is split across workers, and the smallest range per worker
+PDF_PARALLEL_MIN_PAGES = 8
+# Files below this size are extracted whole without counting pages first (resumes are small)
+PDF_PARALLEL_MIN_BYTES = 1024 * 1024
+_MIN_PAGES_PER_TASK = 4
+PDF_TEXT_CACHE_ENTRIES = 64
+
+class PdfExtractionError(ValueError):
+    """The PDF could not be read (corrupt, encrypted, or over the time limit)"""
+
+def _open(file_path: str):
+    if pypdf is None:
+        raise ImportError("pypdf is required for PDF extraction. Install with: pip install pypdf")
+    return pypdf.PdfReader(file_path)
+
+def _count_pages(file_path: str) -> int:
+    """Worker: number of pages"""
+    return len(_open(file_path).pages)
+
+def _extract_range(file_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Worker: text of pages [start, end) (end None = to the last page)"""
+    reader = _open(file_path)
+    end = len(reader.pages) if end is None else end
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+def page_ranges(pages: int, workers: int) -> List[Tuple[int, int]]:
+    """Split pages into at most `workers` contiguous ranges (one range below PDF_PARALLEL_MIN_PAGES)"""
+    if pages < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+        return [(0, pages)] if pages else []
+    tasks = max(1, min(workers, pages // _MIN_PAGES_PER_TASK))
+    size, extra = divmod(pages, tasks)
+    ranges, start = [], 0
+    for i in range(tasks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+class PdfExtractStats:
+    """Thread-safe extraction counters for /api/metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "cache_hits": 0, "timeouts": 0, "failures": 0, "pages": 0, "parallel_calls": 0}
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def record(self, outcome: str, seconds: float = 0.0, pages: int = 0, parallel: bool = False):
+        with self._lock:
+            self._counts["calls"] += 1
+            if outcome != "ok":
+                self._counts[outcome] += 1
+            self._counts["pages"] += pages
+            self._counts["parallel_calls"] += int(parallel)
+            self._total_seconds += seconds
+            self._max_seconds = max(self._max_seconds, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            extracted = counts["calls"] - counts["cache_hits"]
+            return {
+                **counts,
+                "extract_ms_total": round(self._total_seconds * 1000, 1),
+                "extract_ms_avg": round(self._total_seconds * 1000 / extracted, 1) if extracted else 0.0,
+                "extract_ms_max": round(self._max_seconds * 1000, 1),
+            }
+
+class _PoolGeneration:
+    """One worker pool and the extractions running on it"""
+
+    def __init__(self, workers: int):
+        # spawn: forking a threaded server process is unsafe
+        self.pool = multiprocessing.get_context("spawn").Pool(workers)
+        self.inflight = 0
+        self.retired = False
+
+class PdfTextExtractor:
+    """Process-pool PDF text extraction with a per-file deadline and a hash-keyed LRU cache"""
+
+    def __init__(self, workers: int = PDF_EXTRACT_WORKERS, timeout: float = PDF_EXTRACT_TIMEOUT,
+                 cache_entries: int = PDF_TEXT_CACHE_ENTRIES):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.cache_entries = cache_entries
+        self.stats = PdfExtractStats()
+        self._generation: Optional[_PoolGeneration] = None
+        self._pool_lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _checkout(self) -> _PoolGeneration:
+        with self._pool_lock:
+            if self._generation is None:
+                self._generation = _PoolGeneration(self.workers)
+            self._generation.inflight += 1
+            return self._generation
+
+    def _checkin(self, generation: _PoolGeneration, timed_out: bool = False):
+        """
+        Finish one call on a pool; a timeout retires the pool (new calls get a fresh one),
+        and a retired pool is terminated when its last in-flight call is done
+        """
+        with self._pool_lock:
+            generation.inflight -= 1
+            if timed_out and not generation.retired:
+                generation.retired = True
+                if self._generation is generation:
+                    self._generation = None
+            terminate = generation.retired and generation.inflight == 0
+        if terminate:
+            # Kills the worker stuck on the pathological PDF
+            generation.pool.terminate()
+            generation.pool.join()
+
+    def close(self):
+        with self._pool_lock:
+            generation, self._generation = self._generation, None
+            if generation is not None:
+                generation.retired = True
+        if generation is not None:
+            generation.pool.close()
+            generation.pool.join()
+
+    def _cached(self, sha256: str) -> Optional[str]:
+        with self._cache_lock:
+            text = self._cache.get(sha256)
+            if text is not None:
+                self._cache.move_to_end(sha256)
+            return text
+
+    def _store(self, sha256: str, text: str):
+        with self._cache_lock:
+            self._cache[sha256] = text
+            self._cache.move_to_end(sha256)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def extract(self, file_path: str, sha256: Optional[str] = None) -> str:
+        """
+        Text of a PDF, one page per line block
+
+        Blocking; call from a worker thread (asyncio.to_thread) inside the API.
+
+        Args:
+            file_path: PDF path
+            sha256: File hash when already known (e.g. computed while streaming the upload)
+
+        Returns:
+            Extracted text
+
+        Raises:
+            PdfExtractionError: Unreadable PDF or extraction over the timeout
+        """
+        if sha256 is None:
+            sha256 = _file_sha256(file_path)
+        cached = self._cached(sha256)
+        if cached is not None:
+            self.stats.record("cache_hits")
+            return cached
+
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        generation = self._checkout()
+        pool = generation.pool
+        pages = 0
+        ranges = [(0, None)]
+        timed_out = False
+        try:
+            if os.path.getsize(file_path) >= PDF_PARALLEL_MIN_BYTES:
+                pages = pool.apply_async(_count_pages, (file_path,)).get(timeout=self.timeout)
+                ranges = page_ranges(pages, self.workers)
+            pending = [pool.apply_async(_extract_range, (file_path, start, end)) for start, end in ranges]
+            texts: List[str] = []
+            for result in pending:
+                texts.extend(result.get(timeout=max(0.0, deadline - time.perf_counter())))
+            pages = len(texts)
+        except multiprocessing.TimeoutError:
+            timed_out = True
+            self.stats.record("timeouts", time.perf_counter() - started, pages)
+            raise PdfExtractionError(f"PDF text extraction timed out after {self.timeout:g}s")
+        except ImportError:
+            raise
+        except Exception as e:
+            self.stats.record("failures", time.perf_counter() - started, pages)
+            raise PdfExtractionError(f"Failed to extract text from PDF: {str(e)}")
+        finally:
+            self._checkin(generation, timed_out)
+
+        text = "\n".join(texts) + ("\n" if texts else "")
+        self.stats.record("ok", time.perf_counter() - started, pages, parallel=len(ranges) > 1)
+        self._store(sha256, text)
+        return text
+
+def _file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+_extractor: Optional[PdfTextExtractor] = None
+_extractor_lock = threading.Lock()
+
+def get_pdf_extractor() -> PdfTextExtractor:
+    """Process-wide extractor (its worker pool starts on first use)"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = PdfTextExtractor()
+        return _extractor
+
+def close_pdf_extractor():
+    """Shut down the worker pool (app shutdown)"""
+    global _extractor
+    with _extractor_lock:
+        extractor, _extractor = _extractor, None
+    if extractor is not None:
+        extractor.close()
@@ -0,0 +1,234 @@
+"""
+Job Pipeline - Dependency-graph executor for the full job workup
+
+Each stage declares the stages it needs. Stages start as soon as their dependencies
+finish, independent stages run concurrently under one shared limit on in-flight work,
+and a failed stage only skips the stages that depend on it. The job workup below runs
+in roughly the time of its longest chain instead of the sum of every LLM call.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable
+from ai.provider import AsyncAIProvider
+from core.jd_parser import extract_jd_async
+from core.resume_parser import parse_resume_async
+from core.evidence_mapper import build_evidence_map_async
+from core.scorer import compute_score_breakdown_async
+from core.cover_letter import generate_cover_letter_async, format_cover_letter_with_links
+from core.roadmap_builder import generate_roadmap_async
+from core.interview_engine import generate_interview_question_async
+
+# Stage callable: receives the outputs of finished stages (by name), returns this stage's output
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+@dataclass
+class Stage:
+    """One node of the pipeline graph"""
+    name: str
+    run: StageFn
+    deps: List[str] = field(default_factory=list)
+
+@dataclass
+class PipelineResult:
+    """Outputs and per-stage outcome of one pipeline run"""
+    results: Dict[str, Any]
+    # Stage name -> "done", "cached", "failed" or "skipped"
+    status: Dict[str, str]
+    errors: Dict[str, str]
+    timings: Dict[str, float]
+    elapsed: float
+
+class PipelineError(ValueError):
+    """Raised for an invalid graph (unknown dependency, cycle) or stage selection"""
+
+class Pipeline:
+    """Validated stage graph that can run all of itself or any subset (plus prerequisites)"""
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise PipelineError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            unknown = [d for d in stage.deps if d not in self.stages]
+            if unknown:
+                raise PipelineError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(unknown)}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; also rejects cycles"""
+        pending = {name: len(stage.deps) for name, stage in self.stages.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                dependents[dep].append(stage.name)
+        ready = [name for name, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in dependents[name]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.stages):
+            cyclic = sorted(name for name in self.stages if name not in order)
+            raise PipelineError(f"Stage graph has a cycle through: {', '.join(cyclic)}")
+        return order
+
+    def closure(self, targets: Optional[Iterable[str]], known: Iterable[str] = ()) -> List[str]:
+        """
+        Targets plus everything they transitively depend on, in dependency order
+
+        Prerequisites of stages in known (outputs already available) are not pulled in.
+        """
+        known = set(known)
+        needed = set()
+        stack = list(self.order if targets is None else targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise PipelineError(f"Unknown stage '{name}'. Expected one of: {', '.join(self.order)}")
+            if name not in needed:
+                needed.add(name)
+                if name not in known:
+                    stack.extend(self.stages[name].deps)
+        return [name for name in self.order if name in needed]
+
+    async def run(self, targets: Optional[Iterable[str]] = None, cached: Optional[Dict[str, Any]] = None,
+                  concurrency: int = 4,
+                  on_stage_start: Optional[Callable[[str], Awaitable[None]]] = None,
+                  on_stage_done: Optional[Callable[[str, Any], Awaitable[None]]] = None) -> PipelineResult:
+        """
+        Execute the selected stages
+
+        Args:
+            targets: Stages to produce (None for all); their prerequisites are added
+            cached: Stage name -> already-known output; those stages are not re-run
+            concurrency: Maximum stages running at once
+            on_stage_start: Awaited before a stage runs (e.g. task progress)
+            on_stage_done: Awaited with each stage's output as soon as it finishes (e.g. persistence)
+
+        Returns:
+            PipelineResult
+        """
+        cached = cached or {}
+        names = self.closure(targets, known=cached)
+        results: Dict[str, Any] = {}
+        status: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+        limit = asyncio.Semaphore(max(1, concurrency))
+        futures: Dict[str, asyncio.Future] = {}
+        started = time.perf_counter()
+
+        async def execute(name: str) -> bool:
+            stage = self.stages[name]
+            if name in cached:
+                results[name] = cached[name]
+                status[name] = "cached"
+                return True
+            # Wait for prerequisites outside the semaphore so waiting never holds a slot
+            deps_ok = await asyncio.gather(*(futures[d] for d in stage.deps)) if stage.deps else []
+            if not all(deps_ok):
+                status[name] = "skipped"
+                errors[name] = "Skipped: " + ", ".join(d for d in stage.deps if status.get(d) in ("failed", "skipped")) + " did not complete"
+                return False
+            async with limit:
+                if on_stage_start is not None:
+                    await on_stage_start(name)
+                stage_started = time.perf_counter()
+                try:
+                    output = await stage.run({d: results[d] for d in self.closure(stage.deps, known=cached) if d in results})
+                    if on_stage_done is not None:
+                        await on_stage_done(name, output)
+                except Exception as e:
+                    print(f"Pipeline stage '{name}' failed: {e}")
+                    status[name] = "failed"
+                    errors[name] = str(e)
+                    return False
+                finally:
+                    timings[name] = round(time.perf_counter() - stage_started, 3)
+            results[name] = output
+            status[name] = "done"
+            return True
+
+        # Dependency order guarantees every future a stage awaits exists before it starts
+        for name in names:
+            futures[name] = asyncio.ensure_future(execute(name))
+        await asyncio.gather(*futures.values())
+        return PipelineResult(results=results, status=status, errors=errors, timings=timings,
+                              elapsed=round(time.perf_counter() - started, 3))
+
+# Question modes generated for the interview pack
+INTERVIEW_PACK_MODES = ("behavioural", "technical")
+
+def build_job_pipeline(ai_provider: AsyncAIProvider, jd_text: Optional[str] = None, resume_text: Optional[str] = None,
+                       tone: str = "professional", timeline_weeks: int = 4,
+                       parse_resume: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None) -> Pipeline:
+    """
+    Stage graph for a complete job workup
+
+    jd_extract and resume_parse are the roots; evidence_map -> score -> optimize is the
+    longest chain, while cover_letter, roadmap and interview_pack only need the roots.
+
+    Args:
+        ai_provider: Async AI provider
+        jd_text: Raw JD (needed unless jd_extract is passed as cached)
+        resume_text: Raw resume text (needed unless resume_parse is passed as cached)
+        tone: Cover letter tone
+        timeline_weeks: Roadmap length
+        parse_resume: Replaces the direct LLM parse of resume_text (e.g. a persistent parse cache)
+
+    Returns:
+        Pipeline
+    """
+    async def jd_extract(_):
+        if not jd_text:
+            raise ValueError("Job description not found. Please add a job description first.")
+        return await extract_jd_async(jd_text, ai_provider)
+
+    async def resume_parse(_):
+        if not (resume_text or "").strip():
+            raise ValueError("Resume text missing")
+        if parse_resume is not None:
+            return await parse_resume(resume_text)
+        return await parse_resume_async(resume_text, ai_provider)
+
+    async def evidence_map(r):
+        return await build_evidence_map_async(r["jd_extract"], r["resume_parse"], ai_provider)
+
+    async def score(r):
+        return await compute_score_breakdown_async(r["jd_extract"], r["resume_parse"], r["evidence_map"], ai_provider)
+
+    async def optimize(r):
+        return await ai_provider.optimize_resume_parse(r["jd_extract"], r["resume_parse"], r["score"], r["evidence_map"])
+
+    async def cover_letter(r):
+        text = await generate_cover_letter_async(r["jd_extract"], r["resume_parse"], ai_provider, tone)
+        return format_cover_letter_with_links(text, r["resume_parse"])
+
+    async def roadmap(r):
+        return await generate_roadmap_async(r["jd_extract"], r["resume_parse"], ai_provider, timeline_weeks)
+
+    async def interview_pack(r):
+        # Sequential so each question can avoid repeating the previous ones
+        questions = []
+        for mode in INTERVIEW_PACK_MODES:
+            asked = [q.get("question", "") for q in questions]
+            question = await generate_interview_question_async(r["jd_extract"], mode, asked, ai_provider)
+            questions.append({**question, "mode": mode})
+        return {"questions": questions}
+
+    return Pipeline([
+        Stage("jd_extract", jd_extract),
+        Stage("resume_parse", resume_parse),
+        Stage("evidence_map", evidence_map, ["jd_extract", "resume_parse"]),
+        Stage("score", score, ["jd_extract", "resume_parse", "evidence_map"]),
+        Stage("optimize", optimize, ["jd_extract", "resume_parse", "evidence_map", "score"]),
+        Stage("cover_letter", cover_letter, ["jd_extract", "resume_parse"]),
+        Stage("roadmap", roadmap, ["jd_extract", "resume_parse"]),
+        Stage("interview_pack", interview_pack, ["jd_extract"]),
+    ])
@@ -1,32 +1,363 @@
 """
 Resume Parser
+
+A rule-based sectionizer runs first: headings, contact details, platform URLs, dates,
+skill lines and bullet lists are read locally into ResumeParse fields. Only the spans it
+cannot structure with confidence (an entry header it cannot split into role and company,
+an unrecognized section, a missing name or email) are sent to the LLM, and well-formatted
+resumes parse without any LLM call.
 """
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
-from typing import Dict, Any, Optional
-from ai.provider import AIProvider
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set, Tuple
+from ai.provider import AIProvider, AsyncAIProvider
+from ai.prompt_budget import get_prompt_stats
 from core.schemas import ResumeParse
+from core.pdf_text import get_pdf_extractor
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file"""
-    if PyPDF2 is None:
-        raise ImportError("PyPDF2 is required for PDF extraction. Install with: pip install PyPDF2")
-    try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-    except Exception as e:
-        raise Exception(f"Failed to extract text from PDF: {str(e)}")
+def extract_text_from_pdf(file_path: str, sha256: Optional[str] = None) -> str:
+    """Extract text from PDF file (pypdf in the shared worker pool, cached by file hash)"""
+    return get_pdf_extractor().extract(file_path, sha256)
+
+# Heading text (lowercase, "&" -> "and") -> ResumeParse field; None marks sections the schema has no field for
+SECTION_HEADINGS: Dict[str, Optional[str]] = {}
+for _field, _headings in {
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "internships", "internship experience", "relevant experience", "industry experience"),
+    "projects": ("projects", "personal projects", "academic projects", "selected projects", "technical projects",
+                 "side projects", "project experience", "key projects"),
+    "education": ("education", "academic background", "education and training", "academics"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "skills and tools",
+               "technical proficiencies", "tools and technologies", "skills and technologies", "core skills"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "certifications and licenses",
+                       "certification"),
+    "extracurriculars": ("extracurricular", "extracurriculars", "extracurricular activities", "activities",
+                         "leadership", "leadership and activities", "volunteer", "volunteering", "volunteer experience",
+                         "awards", "honors", "honors and awards", "awards and honors", "achievements", "involvement"),
+    None: ("summary", "professional summary", "profile", "objective", "career objective", "about", "about me",
+           "interests", "hobbies", "references", "coursework", "relevant coursework"),
+}.items():
+    for _heading in _headings:
+        SECTION_HEADINGS[_heading] = _field
+
+# Fields the sectionizer fills; any of them may be handed to the LLM when ambiguous
+RESUME_FIELDS = ("identity", "skills", "experience", "projects", "certifications", "extracurriculars", "education")
+
+_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_URL = re.compile(r"(?:https?://)?(?:www\.)?(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}(?:/[^\s|,;]*)?")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_CITY = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*(?:[A-Z]{2}|[A-Z][a-z]+(?: [A-Z][a-z]+)*)$")
+_BULLET = re.compile(r"^\s*(?:[•·▪◦●○■□►▸‣⁃∙*–—-]|\d{1,2}[.)])\s+")
+_MONTH = r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+_DATE_POINT = rf"(?:(?:{_MONTH}|Spring|Summer|Fall|Autumn|Winter)\.?,?\s+(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)?\d{{2}}|(?:19|20)\d{{2}})"
+_DATES = re.compile(
+    rf"(?:Expected\s+)?{_DATE_POINT}(?:\s*(?:-|–|—|to)\s*(?:{_DATE_POINT}|Present|Current|Now|Ongoing))?",
+    re.IGNORECASE,
+)
+_HEADER_SEPARATORS = re.compile(r"\s+[|•·–—]\s+|\s*\|\s*|\s{3,}|\t+|\s+-\s+|,\s+|\s+at\s+|\s+@\s+")
+_ROLE_WORDS = re.compile(
+    r"\b(?:intern(?:ship)?|engineer(?:ing)?|developer|programmer|manager|analyst|scientist|designer|lead|assistant|"
+    r"consultant|architect|specialist|researcher|associate|director|officer|coordinator|administrator|technician|"
+    r"fellow|tutor|teaching|founder|co-founder|contractor|freelancer?|head|president|member|representative|sre|devops)\b",
+    re.IGNORECASE,
+)
+_INSTITUTION_WORDS = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic|conservatory)\b|\bU(?:C|T)\b", re.IGNORECASE)
+_DEGREE_WORDS = re.compile(
+    r"\b(?:bachelor(?:'s)?|master(?:'s)?|ph\.?d|doctor(?:ate)?|associate(?:'s)? degree|diploma|certificate|mba|"
+    r"b\.?\s?s\.?c?|b\.?\s?a|b\.?\s?eng|b\.?\s?tech|m\.?\s?s\.?c?|m\.?\s?eng|m\.?\s?tech|m\.?\s?a|high school)\b",
+    re.IGNORECASE,
+)
+_TECH_LINE = re.compile(r"^(?:tech(?:nolog(?:y|ies))?(?:\s*stack)?|stack|built with|tools)\s*:\s*(.+)$", re.IGNORECASE)
+_SKILL_LINE = re.compile(r"^([A-Za-z][A-Za-z /&+-]{1,40}):\s*(.+)$")
+_LIST_SPLIT = re.compile(r"\s*[,;|•·]\s*")
+
+@dataclass
+class Sectionized:
+    """Local pre-parse of a resume"""
+    parse: Dict[str, Any]
+    # Fields with at least one span left to the LLM (entries from those spans are not kept locally)
+    ambiguous: Set[str] = field(default_factory=set)
+    # Raw text spans (with their headings) to send to the LLM
+    spans: List[str] = field(default_factory=list)
+
+    @property
+    def llm_text(self) -> str:
+        return "\n\n".join(self.spans)
+
+def _heading_field(line: str) -> Tuple[bool, Optional[str]]:
+    """(is_heading, field) for a line; unknown headings are short ALL-CAPS lines (not acronyms like "MIT")"""
+    text = line.strip().rstrip(":").strip(" -=_*#")
+    key = re.sub(r"\s+", " ", text.lower().replace("&", "and"))
+    if key in SECTION_HEADINGS:
+        return True, SECTION_HEADINGS[key]
+    letters = [c for c in text if c.isalpha()]
+    if (len(letters) >= 5 and text.upper() == text and len(text.split()) <= 4 and not any(c.isdigit() for c in text)
+            and not _EMAIL.search(text) and "|" not in text):
+        return True, "unknown"
+    return False, None
+
+def _strip_bullet(line: str) -> str:
+    return _BULLET.sub("", line, count=1).strip()
+
+def _pop_dates(text: str) -> Tuple[str, Optional[str]]:
+    """Remove the first date range from text; returns (rest, dates)"""
+    match = _DATES.search(text)
+    if not match:
+        return text, None
+    rest = (text[:match.start()] + " " + text[match.end():]).strip(" ,|–—-()\t")
+    return re.sub(r"\s{2,}", "  ", rest), match.group(0).strip()
+
+def _header_parts(lines: List[str]) -> Tuple[List[str], Optional[str]]:
+    """Split entry header lines into name parts, with the date range taken out"""
+    dates = None
+    parts = []
+    for line in lines:
+        rest, found = _pop_dates(line)
+        dates = dates or found
+        for part in _HEADER_SEPARATORS.split(rest):
+            part = part.strip(" ,|–—-()")
+            if part and not _CITY.match(part):
+                parts.append(part)
+    return parts, dates
+
+def _split_role_company(parts: List[str]) -> Optional[Tuple[str, str]]:
+    """(role, company) when exactly one part reads as a job title"""
+    if len(parts) < 2:
+        return None
+    roles = [p for p in parts if _ROLE_WORDS.search(p)]
+    if len(roles) != 1:
+        return None
+    others = [p for p in parts if p is not roles[0]]
+    return roles[0], others[0]
+
+def _group_entries(lines: List[str]) -> List[Tuple[List[str], List[str]]]:
+    """Group section lines into (header lines, bullets); wrapped bullet lines are re-joined"""
+    entries: List[Tuple[List[str], List[str]]] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        if _BULLET.match(line):
+            if not entries:
+                entries.append(([], []))
+            entries[-1][1].append(_strip_bullet(line))
+        elif entries and entries[-1][1] and line.strip()[:1].islower():
+            entries[-1][1][-1] += " " + line.strip()
+        elif entries and not entries[-1][1]:
+            entries[-1][0].append(line.strip())
+        else:
+            entries.append(([line.strip()], []))
+    return entries
+
+def _parse_identity(lines: List[str]) -> Tuple[Dict[str, Any], bool]:
+    identity: Dict[str, Any] = {"name": "", "email": "", "city": None, "platforms": {}}
+    for line in lines:
+        email = _EMAIL.search(line)
+        if email and not identity["email"]:
+            identity["email"] = email.group(0)
+        for segment in re.split(r"\s*[|•·]\s*|\s{3,}", line):
+            segment = segment.strip()
+            if not segment:
+                continue
+            if _CITY.match(segment) and not identity["city"]:
+                identity["city"] = segment
+            without_email = _EMAIL.sub(" ", segment)
+            for url in _URL.findall(without_email):
+                lower = url.lower()
+                key = "linkedin" if "linkedin." in lower else "github" if "github." in lower else "portfolio"
+                identity["platforms"].setdefault(key, url.rstrip("/."))
+        if not identity["name"]:
+            text = line.strip()
+            words = text.split()
+            if (2 <= len(words) <= 5 and not _EMAIL.search(text) and not _URL.search(text) and not any(c.isdigit() for c in text)
+                    and all(w[:1].isupper() for w in words) and not _ROLE_WORDS.search(text)):
+                identity["name"] = text.title() if text.isupper() else text
+    return identity, not (identity["name"] and identity["email"])
+
+def _parse_experience(lines: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+    entries, ambiguous = [], False
+    for header, bullets in _group_entries(lines):
+        parts, dates = _header_parts(header)
+        split = _split_role_company(parts)
+        if split is None:
+            ambiguous = True
+            continue
+        entries.append({"company": split[1], "role": split[0], "dates": dates, "bullets": bullets})
+    return entries, ambiguous
+
+def _parse_projects(lines: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+    entries, ambiguous = [], False
+    for header, bullets in _group_entries(lines):
+        tech_stack: List[str] = []
+        title_lines = []
+        for line in header:
+            tech = _TECH_LINE.match(line)
+            if tech:
+                tech_stack.extend(t for t in _LIST_SPLIT.split(tech.group(1)) if t)
+            else:
+                title_lines.append(line)
+        if not title_lines:
+            ambiguous = True
+            continue
+        title, _ = _pop_dates(title_lines[0])
+        # "Title | React, Node.js" / "Title (Python, Flask)"
+        inline = re.match(r"^(.+?)\s*(?:\||–|—|\s-\s)\s*(.+)$|^(.+?)\s*\((.+)\)$", title)
+        if inline and not tech_stack:
+            title = inline.group(1) or inline.group(3)
+            tech_stack = [t for t in _LIST_SPLIT.split(inline.group(2) or inline.group(4)) if t]
+        if len(title_lines) > 1 or len(title) > 80:
+            ambiguous = True
+            continue
+        entries.append({"title": title.strip(), "tech_stack": tech_stack, "bullets": bullets})
+    return entries, ambiguous
+
+def _parse_education(lines: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+    entries: List[Dict[str, Any]] = []
+    current: Dict[str, Any] = {}
+    for line in lines:
+        text = _strip_bullet(line)
+        if not text or re.match(r"^(?:relevant\s+)?coursework|^gpa|^honou?rs|^minor", text, re.IGNORECASE):
+            continue
+        rest, dates = _pop_dates(text)
+        parts = [p.strip(" ,|–—-()") for p in _HEADER_SEPARATORS.split(rest) if p.strip(" ,|–—-()")]
+        for part in parts or [""]:
+            key = "degree" if _DEGREE_WORDS.search(part) else "institution" if _INSTITUTION_WORDS.search(part) else None
+            if key and current.get(key):
+                entries.append(current)
+                current = {}
+            if key:
+                current[key] = part
+        if dates:
+            current["dates"] = dates
+    if current:
+        entries.append(current)
+    complete = [e for e in entries if e.get("institution") and e.get("degree")]
+    return ([{"institution": e["institution"], "degree": e["degree"], "dates": e.get("dates")} for e in complete],
+            len(complete) != len(entries) or not entries)
+
+def _parse_skills(lines: List[str]) -> Dict[str, List[str]]:
+    skills: Dict[str, List[str]] = {}
+    category = None
+    for line in lines:
+        text = _strip_bullet(line)
+        if not text:
+            continue
+        match = _SKILL_LINE.match(text)
+        if match:
+            category = re.sub(r"[^a-z0-9]+", "_", match.group(1).lower()).strip("_")
+            items = match.group(2)
+        else:
+            category = category or "other"
+            items = text
+        skills.setdefault(category, []).extend(i.strip() for i in _LIST_SPLIT.split(items) if i.strip())
+    return skills
+
+def _parse_items(lines: List[str]) -> List[str]:
+    items: List[str] = []
+    for line in lines:
+        text = _strip_bullet(line)
+        if not text:
+            continue
+        if items and not _BULLET.match(line) and text[:1].islower():
+            items[-1] += " " + text
+        else:
+            items.append(text)
+    return items
+
+_ENTRY_PARSERS = {"experience": _parse_experience, "projects": _parse_projects, "education": _parse_education}
+
+def sectionize_resume(resume_text: str) -> Sectionized:
+    """
+    Structure a resume locally, marking what the LLM still has to parse
+
+    Args:
+        resume_text: Raw resume text
+
+    Returns:
+        Sectionized (a partial ResumeParse plus the ambiguous fields and their text spans)
+    """
+    lines = resume_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    header: List[str] = []
+    sections: List[Tuple[str, Optional[str], List[str]]] = []
+    for line in lines:
+        is_heading, section_field = _heading_field(line) if line.strip() else (False, None)
+        if is_heading and (sections or header):
+            sections.append((line.strip(), section_field, []))
+        elif sections:
+            sections[-1][2].append(line)
+        else:
+            header.append(line)
+
+    parse: Dict[str, Any] = {"identity": {}, "skills": {}, "experience": [], "projects": [],
+                             "certifications": [], "extracurriculars": [], "education": []}
+    result = Sectionized(parse=parse)
+    if not any(f in RESUME_FIELDS for _, f, _ in sections):
+        # No recognizable structure: the LLM parses everything
+        result.ambiguous = set(RESUME_FIELDS)
+        result.spans = [resume_text]
+        return result
+
+    parse["identity"], identity_ambiguous = _parse_identity([l for l in header if l.strip()])
+    if identity_ambiguous:
+        result.ambiguous.add("identity")
+        result.spans.append("\n".join(l for l in header if l.strip()))
+    for heading, section_field, body in sections:
+        span = heading + "\n" + "\n".join(l for l in body if l.strip())
+        if section_field in _ENTRY_PARSERS:
+            entries, ambiguous = _ENTRY_PARSERS[section_field](body)
+            if ambiguous:
+                # The LLM re-reads the whole span, so its entries replace this section's partial parse
+                result.ambiguous.add(section_field)
+                result.spans.append(span)
+            else:
+                parse[section_field].extend(entries)
+        elif section_field == "skills":
+            for category, items in _parse_skills(body).items():
+                parse["skills"].setdefault(category, []).extend(items)
+        elif section_field in ("certifications", "extracurriculars"):
+            parse[section_field].extend(_parse_items(body))
+        elif section_field == "unknown" and any(l.strip() for l in body):
+            # Unrecognized section: the LLM decides where its content belongs (appended below)
+            result.spans.append(span)
+    return result
+
+def merge_llm_parse(local: Sectionized, llm_parse: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine the local pre-parse with the LLM's parse of the ambiguous spans
+
+    The LLM only saw the ambiguous and unrecognized spans, and the local parse holds nothing
+    from those spans, so list entries it returned are appended to the entries parsed locally from
+    clean sections (an ambiguous INTERNSHIPS section never drops a clean EXPERIENCE one).
+    Skills are unioned; an ambiguous identity is filled in from the LLM where the header left gaps.
+    """
+    merged = dict(local.parse)
+    llm_parse = llm_parse if isinstance(llm_parse, dict) else {}
+    for name in RESUME_FIELDS:
+        theirs = llm_parse.get(name)
+        if name == "identity":
+            theirs = theirs if isinstance(theirs, dict) else {}
+            if name in local.ambiguous:
+                ours = merged.get("identity") or {}
+                platforms = {**(theirs.get("platforms") or {}), **(ours.get("platforms") or {})}
+                merged["identity"] = {**theirs, **{k: v for k, v in ours.items() if v}, "platforms": platforms}
+        elif name == "skills":
+            theirs = theirs if isinstance(theirs, dict) else {}
+            skills = {k: list(v) for k, v in (merged.get("skills") or {}).items()}
+            for category, items in theirs.items():
+                known = {str(i).lower() for i in skills.get(category, [])}
+                skills.setdefault(category, []).extend(i for i in items or [] if str(i).lower() not in known)
+            merged["skills"] = skills
+        else:
+            theirs = theirs if isinstance(theirs, list) else []
+            merged[name] = list(merged.get(name) or []) + theirs
+    return merged
 
 def parse_resume(resume_text: str, ai_provider: AIProvider) -> Dict[str, Any]:
     """
     Parse resume into structured format
     
+    Sections the local sectionizer structures are used as-is; only ambiguous spans are
+    sent to the LLM (no call at all when nothing is ambiguous).
+    
     Args:
         resume_text: Raw resume text
         ai_provider: AI provider instance
@@ -37,9 +368,31 @@ def parse_resume(resume_text: str, ai_provider: AIProvider) -> Dict[str, Any]:
     if not resume_text or not resume_text.strip():
         raise ValueError("Resume text is required")
     
-    result = ai_provider.parse_resume(resume_text)
+    local = _sectionize(resume_text)
+    if not local.spans:
+        return _validate_resume_parse(local.parse)
+    result = ai_provider.parse_resume(local.llm_text)
+    return _validate_resume_parse(merge_llm_parse(local, result))
+
+async def parse_resume_async(resume_text: str, ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """Async variant of parse_resume for use inside the API event loop"""
+    if not resume_text or not resume_text.strip():
+        raise ValueError("Resume text is required")
     
-    # Validate against schema
+    local = _sectionize(resume_text)
+    if not local.spans:
+        return _validate_resume_parse(local.parse)
+    result = await ai_provider.parse_resume(local.llm_text)
+    return _validate_resume_parse(merge_llm_parse(local, result))
+
+def _sectionize(resume_text: str) -> Sectionized:
+    """sectionize_resume, recording how much of the text still goes to the LLM (/api/metrics)"""
+    local = sectionize_resume(resume_text)
+    get_prompt_stats().record("parse_resume", resume_text, local.llm_text, bool(local.spans) and local.llm_text != resume_text)
+    return local
+
+def _validate_resume_parse(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate against schema"""
     try:
         validated = ResumeParse(**result)
         return validated.model_dump()
@@ -1,8 +1,11 @@
 """
 Rewriter - Applies constrained rewrites to resume bullets
 """
-from typing import Dict, Any
-from ai.provider import AIProvider
+from typing import Dict, Any, List
+from ai.provider import AIProvider, AsyncAIProvider
+from core.constraints import (
+    compile_constraints, repair_bullets, repair_bullets_async, DEFAULT_REPAIR_ATTEMPTS, DEFAULT_REPAIR_BUDGET,
+)
 
 def rewrite_bullet(bullet: str, constraints: Dict[str, Any], context: Dict[str, Any], 
                   ai_provider: AIProvider) -> str:
@@ -20,4 +23,100 @@ def rewrite_bullet(bullet: str, constraints: Dict[str, Any], context: Dict[str,
     """
     return ai_provider.rewrite_bullet(bullet, constraints, context)
 
+def _normalize_items(bullets: List[Dict[str, Any]], constraints: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """id -> {"bullet", "constraints" (per-bullet extras), "rules" (merged)}; ids are strings so they survive the JSON round trip"""
+    items = {}
+    for i, item in enumerate(bullets):
+        item_id = str(item.get("id", i))
+        if item_id in items:
+            raise ValueError(f"Duplicate bullet id '{item_id}'")
+        extra = item.get("constraints") or {}
+        items[item_id] = {"bullet": item.get("bullet") or "", "constraints": extra, "rules": {**constraints, **extra}}
+    return items
 
+def _batch_request(items: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    request = []
+    for item_id, item in items.items():
+        entry = {"id": item_id, "bullet": item["bullet"]}
+        if item["constraints"]:
+            entry["constraints"] = item["constraints"]
+        request.append(entry)
+    return request
+
+def _verify_batch(items: Dict[str, Dict[str, Any]], rewrites: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Check the batch reply; returns id -> {"bullet", "is_valid", "violations", "attempts"}"""
+    results = {}
+    for item_id, item in items.items():
+        text = rewrites.get(item_id)
+        if text is None:
+            # Not returned by the model: repair starts from the original
+            text = item["bullet"]
+            violations = compile_constraints(item["rules"]).check(text) or ["No rewrite returned"]
+        else:
+            violations = compile_constraints(item["rules"]).check(text)
+        results[item_id] = {"bullet": text, "is_valid": not violations, "violations": violations, "attempts": 1}
+    return results
+
+def _failing(items: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        item_id: {"bullet": r["bullet"], "violations": r["violations"], "constraints": items[item_id]["rules"],
+                  "extra": items[item_id]["constraints"]}
+        for item_id, r in results.items() if not r["is_valid"]
+    }
+
+def _merge_repairs(results: Dict[str, Dict[str, Any]], repaired: Dict[str, Dict[str, Any]]):
+    for item_id, repair in repaired.items():
+        results[item_id] = {**repair, "attempts": results[item_id]["attempts"] + repair["attempts"]}
+
+def _batch_result(items: Dict[str, Dict[str, Any]], results: Dict[str, Dict[str, Any]], calls: int) -> Dict[str, Any]:
+    return {
+        "bullets": [{"id": item_id, "original": items[item_id]["bullet"], **results[item_id]} for item_id in items],
+        "calls": calls,
+        "invalid": sum(1 for r in results.values() if not r["is_valid"]),
+    }
+
+def rewrite_bullets(bullets: List[Dict[str, Any]], constraints: Dict[str, Any], context: Dict[str, Any],
+                    ai_provider: AIProvider, max_attempts: int = DEFAULT_REPAIR_ATTEMPTS,
+                    repair_budget: int = DEFAULT_REPAIR_BUDGET) -> Dict[str, Any]:
+    """
+    Rewrite many bullets in one batch call, then repair only those that fail verification
+
+    Failing bullets are re-sent together, one batch call per repair round, each with its violations.
+
+    Args:
+        bullets: [{"id", "bullet", "constraints" (optional per-bullet extras)}]
+        constraints: Constraint rules shared by every bullet
+        context: Shared context, sent once per call
+        ai_provider: AI provider instance
+        max_attempts: Repair rounds per failing bullet
+        repair_budget: Bullet repairs across the whole batch
+
+    Returns:
+        {"bullets": [{"id", "original", "bullet", "is_valid", "violations", "attempts"}] in input order,
+         "calls", "invalid"}
+    """
+    items = _normalize_items(bullets, constraints)
+    results = _verify_batch(items, ai_provider.rewrite_bullets_batch(_batch_request(items), constraints, context) or {})
+    failing = _failing(items, results)
+    calls = 1
+    if failing:
+        repaired, repair_calls = repair_bullets(failing, ai_provider, context, constraints,
+                                                max_attempts=max_attempts, budget=repair_budget)
+        _merge_repairs(results, repaired)
+        calls += repair_calls
+    return _batch_result(items, results, calls)
+
+async def rewrite_bullets_async(bullets: List[Dict[str, Any]], constraints: Dict[str, Any], context: Dict[str, Any],
+                                ai_provider: AsyncAIProvider, max_attempts: int = DEFAULT_REPAIR_ATTEMPTS,
+                                repair_budget: int = DEFAULT_REPAIR_BUDGET) -> Dict[str, Any]:
+    """Async variant of rewrite_bullets"""
+    items = _normalize_items(bullets, constraints)
+    results = _verify_batch(items, await ai_provider.rewrite_bullets_batch(_batch_request(items), constraints, context) or {})
+    failing = _failing(items, results)
+    calls = 1
+    if failing:
+        repaired, repair_calls = await repair_bullets_async(failing, ai_provider, context, constraints,
+                                                            max_attempts=max_attempts, budget=repair_budget)
+        _merge_repairs(results, repaired)
+        calls += repair_calls
+    return _batch_result(items, results, calls)
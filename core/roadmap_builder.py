@@ -2,7 +2,7 @@
 Roadmap Builder - Generates learning roadmaps
 """
 from typing import Dict, Any
-from ai.provider import AIProvider
+from ai.provider import AIProvider, AsyncAIProvider
 
 def generate_roadmap(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], 
                     ai_provider: AIProvider, timeline_weeks: int = 4) -> Dict[str, Any]:
@@ -20,3 +20,8 @@ def generate_roadmap(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
     """
     return ai_provider.generate_roadmap(jd_extract, resume_parse, timeline_weeks)
 
+async def generate_roadmap_async(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                                 ai_provider: AsyncAIProvider, timeline_weeks: int = 4) -> Dict[str, Any]:
+    """Async variant of generate_roadmap"""
+    return await ai_provider.generate_roadmap(jd_extract, resume_parse, timeline_weeks)
+
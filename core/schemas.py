@@ -63,6 +63,8 @@ class EvidenceMap(BaseModel):
     """Evidence Mapping Schema"""
     evidence: Dict[str, List[EvidenceCitation]] = {}
     missing: List[str] = []
+    # Keywords with no citation that sub-skills in the resume imply (e.g. "SQL": ["PostgreSQL"])
+    inferred: Dict[str, List[str]] = {}
 
 class ScoreDetails(BaseModel):
     """Score Details Schema"""
@@ -93,4 +95,13 @@ class RewritePlan(BaseModel):
     prioritized_edits: List[Dict[str, Any]] = []
     expected_impact: str = "medium"
 
+class BulletRewrite(BaseModel):
+    """One rewritten bullet, matched to its request by id"""
+    id: str
+    bullet: str
+
+class BulletRewriteBatch(BaseModel):
+    """Bullet Rewrite Batch Schema"""
+    rewrites: List[BulletRewrite] = []
+
 
@@ -1,23 +1,380 @@
 """
 ATS Scorer - Computes score breakdown
+
+Sub-scores are computed locally and deterministically: keyword coverage and evidence
+strength from the evidence map, bullet quality from a lint feature matrix over all
+bullets at once, alignment from term overlap plus hashed n-gram similarity, and formatting
+from structural checks. The LLM is only asked to phrase top_fixes.
 """
-from typing import Dict, Any
-from ai.provider import AIProvider
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from ai.provider import AIProvider, AsyncAIProvider
+from core.keyword_matcher import SkillMatcher, skill_key
+from core.vector_index import text_similarity
+from core.schemas import ScoreBreakdown
+
+# Weights of the sub-scores in final_score
+SCORE_WEIGHTS = {
+    "keyword_coverage": 0.35,
+    "alignment": 0.15,
+    "evidence_strength": 0.20,
+    "bullet_quality": 0.20,
+    "formatting": 0.10,
+}
+
+# Relative importance of JD term groups for keyword coverage
+_MUST_WEIGHT, _NICE_WEIGHT, _KEYWORD_WEIGHT = 3.0, 1.0, 0.5
+# Credit for a keyword only implied by a sub-skill (React for JavaScript) instead of cited
+_INFERRED_CREDIT = 0.5
+
+ACTION_VERBS = frozenset("""
+    accelerated achieved added analyzed architected automated built collaborated combined completed
+    configured contributed converted coordinated created cut debugged decreased defined delivered
+    deployed designed developed directed drove eliminated enabled engineered enhanced established
+    evaluated expanded extended facilitated founded generated grew handled identified implemented
+    improved increased integrated introduced launched led maintained managed mentored migrated
+    modeled monitored optimized orchestrated organized owned partnered performed pioneered planned
+    presented produced programmed prototyped published reduced refactored released replaced
+    researched resolved restructured revamped scaled secured shipped simplified solved spearheaded
+    standardized streamlined supported taught tested trained transformed tuned upgraded wrote
+""".split())
+
+_WEAK_PHRASES = re.compile(r"\b(?:responsible for|helped|worked on|assisted|involved in|duties included|tasked with)\b",
+                           re.IGNORECASE)
+_METRIC = re.compile(r"\d|%|\$")
+_WORD = re.compile(r"[a-z][a-z0-9+#.]*")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from in into is it of on or our the to we will with you your
+    this that their they team work working using use across including ability strong experience
+""".split())
+
+# Share of the alignment score from vector similarity, and the similarity treated as full alignment
+_SIMILARITY_WEIGHT, _SIMILARITY_FULL = 0.25, 0.35
+
+# Bullet length window (characters) considered scannable by ATS and recruiters
+_MIN_BULLET_CHARS, _MAX_BULLET_CHARS = 40, 220
+
+# Lint feature columns and their weights in the per-bullet quality score
+_LINT_FEATURES = ("action_verb", "metric", "length_ok", "no_weak_phrase", "keyword")
+_LINT_WEIGHTS = np.array([0.25, 0.25, 0.2, 0.15, 0.15])
+
+def _collect_bullets(resume_parse: Dict[str, Any]) -> List[Tuple[str, int, int, str]]:
+    """(section, index, bullet_index, text) for every experience and project bullet"""
+    bullets = []
+    for section in ("experience", "projects"):
+        for i, entry in enumerate(resume_parse.get(section) or []):
+            if not isinstance(entry, dict):
+                continue
+            for j, bullet in enumerate(entry.get("bullets") or []):
+                bullets.append((section, i, j, str(bullet)))
+    return bullets
+
+def _location(section: str, index: int, bullet_index: Optional[int] = None) -> str:
+    name = "Experience" if section == "experience" else "Project"
+    location = f"{name} {index + 1}"
+    return f"{location}, bullet {bullet_index + 1}" if bullet_index is not None else location
+
+def _terms(text: str) -> set:
+    return {w.strip(".") for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 2}
+
+def _pct(value: float) -> int:
+    return int(round(float(np.clip(value, 0.0, 1.0)) * 100))
+
+def lint_bullets(bullets: List[str], jd_keywords: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lint all bullets at once
+
+    Args:
+        bullets: Bullet texts
+        jd_keywords: JD skills/keywords a strong bullet should mention
+
+    Returns:
+        (feature matrix of shape (n_bullets, len(_LINT_FEATURES)), per-bullet scores in [0, 1])
+    """
+    if not bullets:
+        return np.zeros((0, len(_LINT_FEATURES))), np.zeros(0)
+    matcher = SkillMatcher(jd_keywords)
+    first_words = [b.split()[0].lower().strip(",.;:") if b.split() else "" for b in bullets]
+    lengths = np.fromiter((len(b.strip()) for b in bullets), dtype=float, count=len(bullets))
+    features = np.column_stack([
+        np.fromiter((w in ACTION_VERBS for w in first_words), dtype=float, count=len(bullets)),
+        np.fromiter((bool(_METRIC.search(b)) for b in bullets), dtype=float, count=len(bullets)),
+        (lengths >= _MIN_BULLET_CHARS) & (lengths <= _MAX_BULLET_CHARS),
+        np.fromiter((not _WEAK_PHRASES.search(b) for b in bullets), dtype=float, count=len(bullets)),
+        np.fromiter((bool(matcher.match(b)) for b in bullets), dtype=float, count=len(bullets)),
+    ]).astype(float)
+    return features, features @ _LINT_WEIGHTS
+
+def _bullet_lint_results(bullets: List[str], features: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+    issue_text = {
+        "action_verb": ("Does not start with a strong action verb", "Start with a past-tense action verb (e.g. Built, Reduced, Led)"),
+        "metric": ("No quantified result", "Add a number: scale, percentage, time saved or users affected"),
+        "length_ok": ("Length outside the 40-220 character range", "Keep the bullet to one or two concise lines"),
+        "no_weak_phrase": ("Uses a passive phrase such as 'responsible for'", "Describe what you did and its outcome instead of duties"),
+        "keyword": ("Mentions none of the job's keywords", "Name the relevant technology or skill from the job description"),
+    }
+    results = []
+    for bullet, row, score in zip(bullets, features, scores):
+        failed = [name for name, ok in zip(_LINT_FEATURES, row) if not ok]
+        status = "Strong" if score >= 0.75 else "Needs improvement" if score >= 0.45 else "Weak"
+        results.append({
+            "bullet": bullet,
+            "status": status,
+            "issues": [issue_text[name][0] for name in failed],
+            "suggestions": [issue_text[name][1] for name in failed],
+        })
+    return results
+
+def _keyword_coverage(jd_extract: Dict[str, Any], evidence: Dict[str, Any],
+                      inferred: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    found = {skill_key(k) for k, v in evidence.items() if v}
+    implied = {skill_key(k): v for k, v in (inferred or {}).items() if v and skill_key(k) not in found}
+    groups = [
+        ("must_have", jd_extract.get("must_have_skills") or [], _MUST_WEIGHT),
+        ("nice_to_have", jd_extract.get("nice_to_have_skills") or [], _NICE_WEIGHT),
+        ("keywords", jd_extract.get("keywords") or [], _KEYWORD_WEIGHT),
+    ]
+    terms, weights, hits = [], [], []
+    details = {}
+    seen = set()
+    for name, items, weight in groups:
+        matched, inferred_items = [], {}
+        for item in items:
+            key = skill_key(item)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            terms.append(item)
+            weights.append(weight)
+            hits.append(1.0 if key in found else _INFERRED_CREDIT if key in implied else 0.0)
+            if key in found:
+                matched.append(item)
+            elif key in implied:
+                inferred_items[item] = implied[key]
+        details[f"{name}_matched"] = matched
+        details[f"{name}_inferred"] = inferred_items
+        details[f"{name}_missing"] = [i for i in items if skill_key(i) not in found]
+    weights_arr = np.asarray(weights, dtype=float)
+    hits_arr = np.asarray(hits, dtype=float)
+    ratio = float(weights_arr @ hits_arr / weights_arr.sum()) if weights_arr.size else 1.0
+    explanation = f"{int((hits_arr == 1.0).sum())} of {len(terms)} job keywords found (must-haves weighted {_MUST_WEIGHT:g}x)"
+    if implied:
+        explanation += f"; {int(((hits_arr > 0) & (hits_arr < 1)).sum())} more implied by related skills (partial credit)"
+    return {"score": _pct(ratio), "explanation": explanation, "details": details}
 
-def compute_score_breakdown(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], 
-                           evidence_map: Dict[str, Any], ai_provider: AIProvider) -> Dict[str, Any]:
+def _evidence_strength(jd_extract: Dict[str, Any], evidence: Dict[str, Any]) -> Dict[str, Any]:
+    must = [s for s in jd_extract.get("must_have_skills") or [] if str(s).strip()]
+    by_key = {skill_key(k): v for k, v in evidence.items()}
+    if not must:
+        return {"score": 100, "explanation": "No must-have skills listed", "details": {}}
+    # Bullet citations show the skill in use; skills-list / header mentions only claim it.
+    counts = np.zeros((len(must), 2))
+    for row, skill in enumerate(must):
+        for citation in by_key.get(skill_key(skill)) or []:
+            in_bullet = isinstance(citation, dict) and citation.get("bullet_index") is not None \
+                and citation.get("section") in ("experience", "projects")
+            counts[row, 0 if in_bullet else 1] += 1
+    per_skill = np.where(counts[:, 0] > 0, np.minimum(counts[:, 0], 2) / 2 * 0.5 + 0.5,
+                         np.where(counts[:, 1] > 0, 0.3, 0.0))
+    demonstrated = [s for s, c in zip(must, counts[:, 0]) if c > 0]
+    listed_only = [s for s, c in zip(must, counts) if c[0] == 0 and c[1] > 0]
+    return {
+        "score": _pct(per_skill.mean()),
+        "explanation": f"{len(demonstrated)} of {len(must)} must-have skills are backed by experience or project bullets",
+        "details": {"demonstrated": demonstrated, "listed_only": listed_only},
+    }
+
+def _alignment(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], bullets: List[str]) -> Dict[str, Any]:
+    jd_terms = set()
+    for field in ("responsibilities", "languages", "frameworks", "tools"):
+        for item in jd_extract.get(field) or []:
+            jd_terms |= _terms(str(item))
+    jd_terms |= _terms(str(jd_extract.get("role_title") or ""))
+    jd_terms |= _terms(str(jd_extract.get("domain") or ""))
+    resume_text = " ".join(bullets)
+    for section in ("experience", "projects"):
+        for entry in resume_parse.get(section) or []:
+            if isinstance(entry, dict):
+                resume_text += " " + " ".join(str(entry.get(k) or "") for k in ("role", "title"))
+                resume_text += " " + " ".join(str(t) for t in entry.get("tech_stack") or [])
+    for items in (resume_parse.get("skills") or {}).values():
+        if isinstance(items, list):
+            resume_text += " " + " ".join(str(i) for i in items)
+    resume_terms = _terms(resume_text)
+    if not jd_terms:
+        return {"score": 50, "explanation": "Job description has no responsibilities to align with", "details": {}}
+    vocab = sorted(jd_terms)
+    present = np.fromiter((t in resume_terms for t in vocab), dtype=float, count=len(vocab))
+    # Full overlap is unrealistic for free text; 60% shared vocabulary already reads as well aligned.
+    overlap = min(1.0, present.mean() / 0.6)
+    # Pre-signal: hashed n-gram similarity also credits shared phrases and skill aliases
+    jd_text = " ".join(str(jd_extract.get(k) or "") for k in ("role_title", "domain")) + " " + " ".join(
+        str(i) for f in ("responsibilities", "languages", "frameworks", "tools") for i in jd_extract.get(f) or [])
+    similarity = text_similarity(jd_text, resume_text)
+    ratio = (1 - _SIMILARITY_WEIGHT) * overlap + _SIMILARITY_WEIGHT * min(1.0, similarity / _SIMILARITY_FULL)
+    return {
+        "score": _pct(ratio),
+        "explanation": f"{int(present.sum())} of {len(vocab)} role and responsibility terms appear in the resume",
+        "details": {"unmatched_terms": [t for t, p in zip(vocab, present) if not p][:25],
+                    "vector_similarity": round(similarity, 3)},
+    }
+
+def _formatting(resume_parse: Dict[str, Any], bullets: List[str]) -> Dict[str, Any]:
+    identity = resume_parse.get("identity") or {}
+    entries = [e for s in ("experience", "projects") for e in resume_parse.get(s) or [] if isinstance(e, dict)]
+    bullet_counts = np.asarray([len(e.get("bullets") or []) for e in entries], dtype=float)
+    lengths = np.asarray([len(b) for b in bullets], dtype=float)
+    checks = {
+        "has_contact_email": bool(identity.get("email")),
+        "has_skills_section": bool(resume_parse.get("skills")),
+        "has_experience_or_projects": bool(entries),
+        "has_education": bool(resume_parse.get("education")),
+        "entries_have_2_to_6_bullets": bool(bullet_counts.size) and bool(((bullet_counts >= 2) & (bullet_counts <= 6)).all()),
+        "no_overlong_bullets": bool((lengths <= _MAX_BULLET_CHARS * 1.5).all()) if lengths.size else True,
+    }
+    passed = np.fromiter(checks.values(), dtype=float, count=len(checks))
+    failed = [name for name, ok in checks.items() if not ok]
+    return {
+        "score": _pct(passed.mean()),
+        "explanation": "All structure checks passed" if not failed else f"Failed checks: {', '.join(failed)}",
+        "details": checks,
+    }
+
+def rule_based_top_fixes(breakdown: Dict[str, Any], bullet_refs: List[Tuple[str, int, int, str]],
+                         bullet_scores: np.ndarray, limit: int = 5) -> List[Dict[str, Any]]:
+    """Prioritized fixes derived directly from the computed sub-scores"""
+    fixes = []
+    keyword_details = breakdown["keyword_coverage"]["details"]
+    must_total = len(keyword_details.get("must_have_matched", [])) + len(keyword_details.get("must_have_missing", []))
+    per_skill_impact = max(1, round(SCORE_WEIGHTS["keyword_coverage"] * 100 / max(1, must_total)))
+    for skill in keyword_details.get("must_have_missing", [])[:3]:
+        fixes.append({
+            "target_location": "Skills / Experience",
+            "constraint_rules": f"Show where you used {skill}: add it to a relevant bullet and the skills section if you have it",
+            "expected_score_impact": per_skill_impact,
+        })
+    for skill in breakdown["evidence_strength"]["details"].get("listed_only", [])[:2]:
+        fixes.append({
+            "target_location": "Experience / Projects",
+            "constraint_rules": f"{skill} is only listed in skills; add a bullet that shows it in use with a result",
+            "expected_score_impact": 3,
+        })
+    lint = breakdown.get("lint_results") or []
+    for idx in np.argsort(bullet_scores, kind="stable")[:3]:
+        if bullet_scores[idx] >= 0.75:
+            break
+        section, i, j, _ = bullet_refs[idx]
+        fixes.append({
+            "target_location": _location(section, i, j),
+            "constraint_rules": "; ".join(lint[idx]["suggestions"]),
+            "expected_score_impact": 2,
+        })
+    return fixes[:limit]
+
+def compute_local_score_breakdown(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                                  evidence_map: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, int, int, str]], np.ndarray]:
+    """
+    Deterministic score breakdown (top_fixes left empty)
+
+    Returns:
+        (ScoreBreakdown dict, bullet references, per-bullet quality scores)
+    """
+    bullet_refs = _collect_bullets(resume_parse)
+    features, _ = lint_bullets([b[3] for b in bullet_refs], jd_lint_keywords(jd_extract))
+    return score_from_bullet_features(jd_extract, resume_parse, evidence_map, bullet_refs, features)
+
+def jd_lint_keywords(jd_extract: Dict[str, Any]) -> List[str]:
+    """JD skills/keywords checked by the per-bullet 'keyword' lint feature"""
+    return [str(s) for f in ("must_have_skills", "nice_to_have_skills", "keywords") for s in jd_extract.get(f) or []]
+
+def score_from_bullet_features(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any], evidence_map: Dict[str, Any],
+                               bullet_refs: List[Tuple[str, int, int, str]],
+                               features: np.ndarray) -> Tuple[Dict[str, Any], List[Tuple[str, int, int, str]], np.ndarray]:
+    """
+    Assemble the breakdown from already-linted bullets (rows of features align with bullet_refs)
+
+    Lets callers that cache per-bullet lint rows (see core.incremental) skip re-linting unchanged bullets.
+    """
+    evidence = (evidence_map or {}).get("evidence") or {}
+    bullets = [b[3] for b in bullet_refs]
+    features = np.asarray(features, dtype=float).reshape(len(bullets), len(_LINT_FEATURES))
+    bullet_scores = features @ _LINT_WEIGHTS
+    lint_results = _bullet_lint_results(bullets, features, bullet_scores)
+
+    feature_rates = features.mean(axis=0) if len(bullets) else np.zeros(len(_LINT_FEATURES))
+    breakdown = {
+        "keyword_coverage": _keyword_coverage(jd_extract, evidence, (evidence_map or {}).get("inferred")),
+        "alignment": _alignment(jd_extract, resume_parse, bullets),
+        "evidence_strength": _evidence_strength(jd_extract, evidence),
+        "bullet_quality": {
+            "score": _pct(bullet_scores.mean()) if len(bullets) else 0,
+            "explanation": f"{sum(r['status'] == 'Strong' for r in lint_results)} of {len(bullets)} bullets are strong",
+            "details": {"feature_rates": {name: round(float(rate), 2) for name, rate in zip(_LINT_FEATURES, feature_rates)}},
+        },
+        "formatting": _formatting(resume_parse, bullets),
+    }
+    scores = np.array([breakdown[k]["score"] for k in SCORE_WEIGHTS], dtype=float)
+    weights = np.array(list(SCORE_WEIGHTS.values()))
+    breakdown["final_score"] = int(round(float(scores @ weights / weights.sum())))
+    breakdown["top_fixes"] = []
+    breakdown["lint_results"] = lint_results
+    return breakdown, bullet_refs, bullet_scores
+
+def _fix_summary(breakdown: Dict[str, Any]) -> Dict[str, Any]:
+    """Scores without the bulky per-bullet lint, for the top_fixes prompt"""
+    summary = {k: {"score": breakdown[k]["score"], "explanation": breakdown[k]["explanation"]} for k in SCORE_WEIGHTS}
+    summary["final_score"] = breakdown["final_score"]
+    summary["missing_must_haves"] = breakdown["keyword_coverage"]["details"].get("must_have_missing", [])
+    summary["weak_bullets"] = [r for r in breakdown["lint_results"] if r["status"] != "Strong"][:8]
+    return summary
+
+def _normalize_fixes(fixes: Any) -> List[Dict[str, Any]]:
+    if isinstance(fixes, dict):
+        fixes = fixes.get("top_fixes") or fixes.get("fixes") or []
+    return [f for f in fixes if isinstance(f, dict)] if isinstance(fixes, list) else []
+
+def _validate_score_breakdown(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate against schema"""
+    try:
+        return ScoreBreakdown(**result).model_dump()
+    except Exception:
+        return result
+
+def compute_score_breakdown(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                           evidence_map: Dict[str, Any], ai_provider: Optional[AIProvider] = None) -> Dict[str, Any]:
     """
     Compute ATS score breakdown
-    
+
     Args:
         jd_extract: JDExtract dict
         resume_parse: ResumeParse dict
         evidence_map: EvidenceMap dict
-        ai_provider: AI provider instance
-    
+        ai_provider: AI provider instance used to phrase top_fixes (None = rule-based fixes, no LLM call)
+
     Returns:
         ScoreBreakdown dict
     """
-    return ai_provider.compute_score_breakdown(jd_extract, resume_parse, evidence_map)
-
+    breakdown, bullet_refs, bullet_scores = compute_local_score_breakdown(jd_extract, resume_parse, evidence_map)
+    fixes = []
+    if ai_provider is not None:
+        try:
+            fixes = _normalize_fixes(ai_provider.suggest_top_fixes(jd_extract, resume_parse, _fix_summary(breakdown)))
+        except Exception as e:
+            print(f"Top fixes generation failed, using rule-based fixes: {e}")
+    breakdown["top_fixes"] = fixes or rule_based_top_fixes(breakdown, bullet_refs, bullet_scores)
+    return _validate_score_breakdown(breakdown)
 
+async def compute_score_breakdown_async(jd_extract: Dict[str, Any], resume_parse: Dict[str, Any],
+                                        evidence_map: Dict[str, Any],
+                                        ai_provider: Optional[AsyncAIProvider] = None) -> Dict[str, Any]:
+    """Async variant of compute_score_breakdown"""
+    breakdown, bullet_refs, bullet_scores = compute_local_score_breakdown(jd_extract, resume_parse, evidence_map)
+    fixes = []
+    if ai_provider is not None:
+        try:
+            fixes = _normalize_fixes(await ai_provider.suggest_top_fixes(jd_extract, resume_parse, _fix_summary(breakdown)))
+        except Exception as e:
+            print(f"Top fixes generation failed, using rule-based fixes: {e}")
+    breakdown["top_fixes"] = fixes or rule_based_top_fixes(breakdown, bullet_refs, bullet_scores)
+    return _validate_score_breakdown(breakdown)
@@ -0,0 +1,366 @@
+"""
+Skill Taxonomy - canonical skills with aliases and a parent/child hierarchy
+
+Every skill has a canonical id. Aliases and synonyms ("k8s", "postgres") resolve to that id
+with one dict lookup, and each id knows its ancestors, so "PostgreSQL" satisfies "SQL" and
+"Databases". The taxonomy is edited as JSON (core/data/skill_taxonomy.json), the only file
+under version control. It is compiled to a compact binary that is loaded once per process;
+the binary is a build artifact kept in the untracked .cache/ directory and is rebuilt
+automatically when it is missing or compiled from a different JSON.
+
+    python -m core.skill_taxonomy    # compile ahead of time (e.g. in a deploy build step)
+"""
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Set, Tuple, FrozenSet
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SKILL_TAXONOMY_SOURCE = os.getenv("SKILL_TAXONOMY_SOURCE", os.path.join(_DATA_DIR, "skill_taxonomy.json"))
+_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+SKILL_TAXONOMY_BINARY = os.getenv("SKILL_TAXONOMY_BINARY", os.path.join(_CACHE_DIR, "skill_taxonomy.bin"))
+
+# Binary layout: magic, format version, SHA-256 of the JSON it was compiled from, zlib payload
+_MAGIC = b"SKTX"
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sB32s")
+
+# Words that make a following lone letter a label ("plan C", "grade R") rather than a language
+_LETTER_LABELS = frozenset("""
+    appendix building class exhibit figure form grade group level model option part phase plan
+    room round schedule section series stage step team tier type vitamin
+""".split())
+_PREVIOUS_WORD = re.compile(r"([A-Za-z]+)[^A-Za-z\n]*$")
+
+def normalize_term(term: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join(str(term).lower().split())
+
+class SkillTaxonomy:
+    """In-memory taxonomy: ids, alias table, category and transitive ancestors per skill"""
+
+    def __init__(self, names: List[str], categories: List[str], parents: List[Tuple[int, ...]],
+                 aliases: Dict[str, int], case_sensitive: Set[int], exact_aliases: Iterable[str] = ()):
+        self.names = names
+        self.categories = categories
+        self.parents = parents
+        self.case_sensitive = frozenset(case_sensitive)
+        self._ids: Dict[str, int] = dict(aliases)
+        for skill_id, name in enumerate(names):
+            self._ids[normalize_term(name)] = skill_id
+        # Normalized form -> the only spelling that counts ("go" must be written "Go")
+        self._exact: Dict[str, str] = {normalize_term(a): " ".join(str(a).split()) for a in exact_aliases}
+        for skill_id in self.case_sensitive:
+            self._exact[normalize_term(names[skill_id])] = names[skill_id]
+        self._forms: List[Set[str]] = [set() for _ in names]
+        for form, skill_id in self._ids.items():
+            self._forms[skill_id].add(form)
+        self._ancestors = [self._closure(i, parents) for i in range(len(names))]
+        children: List[List[int]] = [[] for _ in names]
+        for child, ids in enumerate(parents):
+            for parent in ids:
+                children[parent].append(child)
+        self._descendants = [self._closure(i, children) for i in range(len(names))]
+        self._automaton = None
+        self._automaton_lock = threading.Lock()
+
+    @staticmethod
+    def _closure(start: int, edges) -> FrozenSet[int]:
+        seen: Set[int] = set()
+        stack = list(edges[start])
+        while stack:
+            node = stack.pop()
+            if node not in seen and node != start:
+                seen.add(node)
+                stack.extend(edges[node])
+        return frozenset(seen)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def skill_id(self, term: str) -> Optional[int]:
+        """Canonical id of a skill name, alias or synonym (None when unknown)"""
+        return self._ids.get(normalize_term(term))
+
+    def canonical(self, term: str) -> str:
+        """Canonical name (unknown terms are returned stripped)"""
+        skill_id = self.skill_id(term)
+        return self.names[skill_id] if skill_id is not None else str(term).strip()
+
+    def category(self, term: str) -> Optional[str]:
+        skill_id = self.skill_id(term)
+        return self.categories[skill_id] if skill_id is not None else None
+
+    def key(self, term: str) -> str:
+        """Dedup key: equal for every spelling of the same skill"""
+        skill_id = self.skill_id(term)
+        return f"#{skill_id}" if skill_id is not None else normalize_term(term)
+
+    def surface_forms(self, term: str, include_children: bool = False) -> Set[str]:
+        """Normalized strings that count as an occurrence of term (optionally of its sub-skills too)"""
+        forms = {normalize_term(term)}
+        skill_id = self.skill_id(term)
+        if skill_id is not None:
+            forms |= self._forms[skill_id]
+            if include_children:
+                for child in self._descendants[skill_id]:
+                    forms |= self._forms[child]
+        return {f for f in forms if f}
+
+    def descendants(self, term: str) -> List[str]:
+        """Canonical names of every sub-skill of term ("SQL" -> ["MySQL", "PostgreSQL", ...])"""
+        skill_id = self.skill_id(term)
+        return sorted(self.names[i] for i in self._descendants[skill_id]) if skill_id is not None else []
+
+    def ancestors(self, term: str) -> List[str]:
+        skill_id = self.skill_id(term)
+        return sorted(self.names[i] for i in self._ancestors[skill_id]) if skill_id is not None else []
+
+    def satisfies(self, have: str, need: str) -> bool:
+        """True when having skill `have` meets requirement `need` (same skill or a sub-skill of it)"""
+        have_id, need_id = self.skill_id(have), self.skill_id(need)
+        if have_id is None or need_id is None:
+            return normalize_term(have) == normalize_term(need)
+        return have_id == need_id or need_id in self._ancestors[have_id]
+
+    def covered(self, have: Iterable[str], need: str) -> bool:
+        """True when any skill in `have` satisfies `need`"""
+        need_id = self.skill_id(need)
+        if need_id is None:
+            key = normalize_term(need)
+            return any(normalize_term(h) == key for h in have)
+        for term in have:
+            have_id = self.skill_id(term)
+            if have_id is not None and (have_id == need_id or need_id in self._ancestors[have_id]):
+                return True
+        return False
+
+    def group(self, skills: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Group skills under their top-level parent (e.g. Kubernetes and Terraform under DevOps)
+
+        Skills without a parent group under their category; unknown skills under "other".
+        """
+        groups: Dict[str, List[str]] = {}
+        for term in skills:
+            skill_id = self.skill_id(term)
+            if skill_id is None:
+                label = "other"
+            else:
+                # Prefer concept roots ("Web Development") over language roots ("JavaScript")
+                roots = sorted((i for i in self._ancestors[skill_id] if not self.parents[i]),
+                               key=lambda i: (self.categories[i] != "concepts", self.names[i]))
+                label = self.names[roots[0]] if roots else self.categories[skill_id]
+            name = self.canonical(term)
+            if name not in groups.setdefault(label, []):
+                groups[label].append(name)
+        return groups
+
+    def is_mention(self, text: str, start: int, end: int) -> bool:
+        """
+        Whether a case-insensitive match of a surface form at text[start:end] really names the skill
+
+        Ambiguous forms ("Go", "React", "Node") only count with their exact spelling, and a lone
+        letter ("C", "R") does not count as a label ("plan C") or inside "C-suite" / "R&D".
+        """
+        span = text[start:end]
+        exact = self._exact.get(normalize_term(span))
+        if exact is not None and span != exact:
+            return False
+        if end - start == 1:
+            if (start > 0 and text[start - 1] in "-&'") or (end < len(text) and text[end] in "-&'"):
+                return False
+            previous = _PREVIOUS_WORD.search(text, max(0, start - 24), start)
+            if previous and previous.group(1).lower() in _LETTER_LABELS:
+                return False
+        return True
+
+    def mentions(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, canonical name) of every skill mention in free text"""
+        for start, end, skill_id in self._text_automaton().iter_matches(text):
+            if self.is_mention(text, start, end):
+                yield start, end, self.names[skill_id]
+
+    def find(self, text: str) -> List[str]:
+        """Canonical skills mentioned in free text, in order of first mention"""
+        found: List[str] = []
+        for _, _, name in self.mentions(text):
+            if name not in found:
+                found.append(name)
+        return found
+
+    def _text_automaton(self):
+        """Aho-Corasick trie over every surface form, payload = canonical id (built on first use)"""
+        with self._automaton_lock:
+            if self._automaton is None:
+                from core.keyword_matcher import AhoCorasick
+                automaton = AhoCorasick()
+                for form, skill_id in self._ids.items():
+                    automaton.add(form, skill_id)
+                automaton.build()
+                self._automaton = automaton
+            return self._automaton
+
+    @classmethod
+    def from_source(cls, source: Dict[str, Any]) -> "SkillTaxonomy":
+        """Build from the JSON source structure"""
+        entries = source.get("skills") or []
+        names = [str(e["name"]) for e in entries]
+        index = {normalize_term(n): i for i, n in enumerate(names)}
+        if len(index) != len(names):
+            raise ValueError("Duplicate skill names in taxonomy")
+        parents = []
+        for entry in entries:
+            unknown = [p for p in entry.get("parents") or [] if normalize_term(p) not in index]
+            if unknown:
+                raise ValueError(f"Unknown parent skill(s) {unknown} for '{entry['name']}'")
+            parents.append(tuple(index[normalize_term(p)] for p in entry.get("parents") or []))
+        aliases: Dict[str, int] = {}
+        exact_aliases: List[str] = []
+        for i, entry in enumerate(entries):
+            exact = [str(a) for a in entry.get("exact_aliases") or []]
+            exact_aliases.extend(exact)
+            for alias in list(entry.get("aliases") or []) + list(entry.get("synonyms") or []) + exact:
+                key = normalize_term(alias)
+                if key in index and index[key] != i:
+                    raise ValueError(f"Alias '{alias}' of '{entry['name']}' is the name of another skill")
+                aliases[key] = i
+        return cls(names, [str(e.get("category") or "concepts") for e in entries], parents, aliases,
+                   {i for i, e in enumerate(entries) if e.get("case_sensitive")}, exact_aliases)
+
+    def to_bytes(self, source_digest: bytes) -> bytes:
+        """Compact binary form: string table, then per-skill (name, category, parents), then alias table"""
+        strings: List[str] = []
+        string_ids: Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            if value not in string_ids:
+                string_ids[value] = len(strings)
+                strings.append(value)
+            return string_ids[value]
+
+        skills = b"".join(
+            struct.pack(f"<IIB?{len(parents)}H", intern(name), intern(category), len(parents), i in self.case_sensitive, *parents)
+            for i, (name, category, parents) in enumerate(zip(self.names, self.categories, self.parents))
+        )
+        alias_items = [(form, i) for form, i in self._ids.items() if form != normalize_term(self.names[i])]
+        # Exact aliases are stored with their required spelling and flagged
+        alias_table = b"".join(struct.pack("<IH?", intern(self._exact.get(form, form)), i, form in self._exact)
+                               for form, i in alias_items)
+        string_table = b"".join(struct.pack("<H", len(s.encode("utf-8"))) + s.encode("utf-8") for s in strings)
+        payload = (struct.pack("<I", len(strings)) + string_table + struct.pack("<H", len(self.names)) + skills
+                   + struct.pack("<I", len(alias_items)) + alias_table)
+        return _HEADER.pack(_MAGIC, _FORMAT_VERSION, source_digest) + zlib.compress(payload, 9)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["SkillTaxonomy", bytes]:
+        """Parse the binary form; returns (taxonomy, digest of the JSON it was compiled from)"""
+        magic, version, digest = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError("Not a skill taxonomy binary (or an unsupported format version)")
+        payload = memoryview(zlib.decompress(data[_HEADER.size:]))
+        offset = 0
+
+        def read(fmt: str):
+            nonlocal offset
+            values = struct.unpack_from(fmt, payload, offset)
+            offset += struct.calcsize(fmt)
+            return values
+
+        (string_count,) = read("<I")
+        strings = []
+        for _ in range(string_count):
+            (length,) = read("<H")
+            strings.append(bytes(payload[offset:offset + length]).decode("utf-8"))
+            offset += length
+        (skill_count,) = read("<H")
+        names, categories, parents, case_sensitive = [], [], [], set()
+        for i in range(skill_count):
+            name_id, category_id, parent_count, exact = read("<IIB?")
+            names.append(strings[name_id])
+            categories.append(strings[category_id])
+            parents.append(read(f"<{parent_count}H") if parent_count else ())
+            if exact:
+                case_sensitive.add(i)
+        (alias_count,) = read("<I")
+        aliases, exact_aliases = {}, []
+        for _ in range(alias_count):
+            string_id, skill_id, exact = read("<IH?")
+            aliases[normalize_term(strings[string_id])] = skill_id
+            if exact:
+                exact_aliases.append(strings[string_id])
+        return cls(names, categories, parents, aliases, case_sensitive, exact_aliases), digest
+
+def _source_digest(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).digest()
+    except OSError:
+        return None
+
+def compile_taxonomy(source_path: str = SKILL_TAXONOMY_SOURCE, binary_path: str = SKILL_TAXONOMY_BINARY) -> SkillTaxonomy:
+    """
+    Compile the JSON taxonomy to its binary form
+
+    Args:
+        source_path: JSON source
+        binary_path: Output path
+
+    Returns:
+        The compiled taxonomy
+    """
+    with open(source_path, "rb") as f:
+        raw = f.read()
+    taxonomy = SkillTaxonomy.from_source(json.loads(raw))
+    os.makedirs(os.path.dirname(os.path.abspath(binary_path)), exist_ok=True)
+    # Per-process temp file: several workers may compile at once; os.replace keeps the last one
+    tmp_path = f"{binary_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(taxonomy.to_bytes(hashlib.sha256(raw).digest()))
+    os.replace(tmp_path, binary_path)
+    return taxonomy
+
+def load_taxonomy(source_path: str = SKILL_TAXONOMY_SOURCE, binary_path: str = SKILL_TAXONOMY_BINARY) -> SkillTaxonomy:
+    """
+    Load the binary taxonomy, recompiling it from JSON when missing or stale
+
+    Returns:
+        SkillTaxonomy
+    """
+    source_digest = _source_digest(source_path)
+    try:
+        with open(binary_path, "rb") as f:
+            taxonomy, digest = SkillTaxonomy.from_bytes(f.read())
+        if source_digest is None or digest == source_digest:
+            return taxonomy
+    except (OSError, ValueError, struct.error, zlib.error):
+        pass
+    if source_digest is None:
+        raise FileNotFoundError(f"Skill taxonomy not found: {source_path}")
+    try:
+        return compile_taxonomy(source_path, binary_path)
+    except OSError:
+        # Read-only cache location: use the JSON directly
+        with open(source_path, "rb") as f:
+            return SkillTaxonomy.from_source(json.loads(f.read()))
+
+_taxonomy: Optional[SkillTaxonomy] = None
+_taxonomy_lock = threading.Lock()
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy (loaded on first use; the API loads it at startup)"""
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = load_taxonomy()
+    return _taxonomy
+
+if __name__ == "__main__":
+    compiled = compile_taxonomy(*sys.argv[1:3])
+    print(f"Compiled {len(compiled)} skills to {sys.argv[2] if len(sys.argv) > 2 else SKILL_TAXONOMY_BINARY}")
@@ -0,0 +1,324 @@
+"""
+Vector Index - hashed n-gram text vectors and a memory-mapped cosine-similarity index
+
+Texts are embedded locally (no model download, no network): word unigrams and bigrams,
+skill aliases folded to their canonical name, sublinear term frequency, signed feature
+hashing into a fixed number of dimensions, then L2 normalization. Rows of the index are
+unit vectors in one float32 matrix, so ranking a query is a single matrix-vector product.
+The matrix lives in a memory-mapped file next to a small JSON manifest and is updated
+row by row as texts are added, changed or removed. Several processes (uvicorn workers) can
+share one index: writes hold an exclusive lock on <name>.lock, reads a shared one, and each
+process reloads the manifest when another one has replaced it.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+from core.skill_taxonomy import get_skill_taxonomy, normalize_term
+
+VECTOR_DIM = int(os.getenv("VECTOR_INDEX_DIM", "4096"))
+_INDEX_FORMAT_VERSION = 1
+_MIN_CAPACITY = 64
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_STOPWORDS = frozenset("""
+    a about above after all also an and any are as at be been being both but by can could do does
+    each etc for from has have having how if in into is it its may more most must no not of on one
+    or other our ours out over per should so such than that the their them then there these they
+    this those through to under up us using use very via was we well were what when where which
+    while who will with within would you your
+""".split())
+
+@lru_cache(maxsize=100_000)
+def _token(word: str) -> str:
+    """Canonical token ("k8s" -> "kubernetes", "js" -> "javascript")"""
+    return normalize_term(get_skill_taxonomy().canonical(word))
+
+@lru_cache(maxsize=200_000)
+def _feature(gram: str, dim: int) -> Tuple[int, float]:
+    """(column, sign) of an n-gram; a stable hash, unlike hash(), so vectors survive restarts"""
+    value = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+def text_vector(text: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """
+    Unit-length hashed n-gram vector of text (all zeros when it has no content words)
+
+    Args:
+        text: Any text (JD, resume bullets)
+        dim: Vector dimensions
+
+    Returns:
+        float32 array of shape (dim,)
+    """
+    words = [_token(w.rstrip(".")) for w in _TOKEN.findall(str(text or "").lower())]
+    words = [w for w in words if w and w not in _STOPWORDS and len(w) > 1]
+    grams = Counter(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    vector = np.zeros(dim, dtype=np.float32)
+    if not grams:
+        return vector
+    columns = np.empty(len(grams), dtype=np.int64)
+    weights = np.empty(len(grams), dtype=np.float32)
+    for i, (gram, count) in enumerate(grams.items()):
+        column, sign = _feature(gram, dim)
+        columns[i] = column
+        weights[i] = sign * (1.0 + math.log(count))
+    np.add.at(vector, columns, weights)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+def text_similarity(a: str, b: str, dim: int = VECTOR_DIM) -> float:
+    """Cosine similarity of two texts' hashed vectors (0 when either is empty)"""
+    return max(0.0, float(text_vector(a, dim) @ text_vector(b, dim)))
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(str(text or "").encode("utf-8")).hexdigest()[:16]
+
+class VectorIndex:
+    """
+    Persistent cosine-similarity index keyed by string ids
+
+    Files: <directory>/<name>.f32 (float32 matrix, capacity x dim, memory-mapped) and
+    <name>.json (dim, row keys, per-row stamp and text hash). Rows are written in place;
+    removal moves the last row into the gap. Thread-safe, and process-safe where fcntl exists.
+    """
+
+    def __init__(self, directory: str, name: str, dim: int = VECTOR_DIM):
+        self.directory = directory
+        self.name = name
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.memmap] = None
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._stamps: List[Optional[str]] = []
+        self._hashes: List[str] = []
+        # (inode, mtime, size) of the manifest as last loaded or written here; rows load on first use
+        self._loaded: Optional[Tuple[int, int, int]] = None
+        self._ever_loaded = False
+        self._depth = 0
+
+    @property
+    def _data_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.f32")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.json")
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.lock")
+
+    def _manifest_version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self._meta_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the thread lock and the cross-process file lock, reloading if another process wrote"""
+        with self._lock:
+            if self._depth:
+                # Nested call (upsert -> upsert_many): the outer call holds the file lock
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            handle = None
+            if fcntl is not None:
+                os.makedirs(self.directory, exist_ok=True)
+                handle = open(self._lock_path, "a+b")
+                fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._depth = 1
+            try:
+                version = self._manifest_version()
+                if version != self._loaded or not self._ever_loaded:
+                    self._load()
+                    self._loaded = version
+                    self._ever_loaded = True
+                yield
+            finally:
+                self._depth = 0
+                if handle is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                    handle.close()
+
+    def _load(self):
+        self._matrix = None
+        self._keys, self._rows, self._stamps, self._hashes = [], {}, [], []
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != _INDEX_FORMAT_VERSION or meta.get("dim") != self.dim:
+                return  # Different layout: start empty and let the caller re-index
+            capacity = int(meta["capacity"])
+            if capacity and os.path.getsize(self._data_path) == capacity * self.dim * 4:
+                self._matrix = np.memmap(self._data_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+                self._keys = [str(k) for k in meta["keys"]]
+                self._stamps = list(meta["stamps"])
+                self._hashes = list(meta["hashes"])
+                self._rows = {key: row for row, key in enumerate(self._keys)}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_meta(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+        meta = {"version": _INDEX_FORMAT_VERSION, "dim": self.dim, "capacity": self.capacity,
+                "keys": self._keys, "stamps": self._stamps, "hashes": self._hashes}
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, separators=(",", ":"))
+        os.replace(tmp_path, self._meta_path)
+        self._loaded = self._manifest_version()
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        with self._locked(exclusive=False):
+            return str(key) in self._rows
+
+    def stamps(self) -> Dict[str, Optional[str]]:
+        """key -> stamp recorded when the row was written (e.g. the source row's updated_at)"""
+        with self._locked(exclusive=False):
+            return dict(zip(self._keys, self._stamps))
+
+    def _grow(self, rows: int):
+        """Reallocate the memory-mapped matrix to hold at least `rows` rows (doubling)"""
+        capacity = max(_MIN_CAPACITY, self.capacity)
+        while capacity < rows:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._data_path}.tmp"
+        grown = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        if self._keys:
+            grown[:len(self._keys)] = self._matrix[:len(self._keys)]
+        grown.flush()
+        del grown
+        self._matrix = None
+        os.replace(tmp_path, self._data_path)
+        self._matrix = np.memmap(self._data_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def upsert_many(self, items: List[Tuple[str, str, Optional[str]]]) -> int:
+        """
+        Add or refresh rows
+
+        Args:
+            items: (key, text, stamp); rows whose text is unchanged only get the new stamp
+
+        Returns:
+            Number of rows (re)embedded
+        """
+        with self._locked(exclusive=True):
+            embedded = 0
+            changed = False
+            for key, text, stamp in items:
+                key = str(key)
+                digest = content_hash(text)
+                row = self._rows.get(key)
+                if row is not None and self._hashes[row] == digest:
+                    if self._stamps[row] != stamp:
+                        self._stamps[row] = stamp
+                        changed = True
+                    continue
+                if row is None:
+                    row = len(self._keys)
+                    self._grow(row + 1)
+                    self._keys.append(key)
+                    self._stamps.append(stamp)
+                    self._hashes.append(digest)
+                    self._rows[key] = row
+                else:
+                    self._stamps[row] = stamp
+                    self._hashes[row] = digest
+                self._matrix[row] = text_vector(text, self.dim)
+                embedded += 1
+                changed = True
+            if changed:
+                self._save_meta()
+            return embedded
+
+    def upsert(self, key: str, text: str, stamp: Optional[str] = None) -> bool:
+        return self.upsert_many([(key, text, stamp)]) > 0
+
+    def remove_many(self, keys: List[str]) -> int:
+        """Drop rows (the last row moves into each gap)"""
+        with self._locked(exclusive=True):
+            removed = 0
+            for key in keys:
+                row = self._rows.pop(str(key), None)
+                if row is None:
+                    continue
+                last = len(self._keys) - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._keys[row] = self._keys[last]
+                    self._stamps[row] = self._stamps[last]
+                    self._hashes[row] = self._hashes[last]
+                    self._rows[self._keys[row]] = row
+                self._keys.pop()
+                self._stamps.pop()
+                self._hashes.pop()
+                removed += 1
+            if removed:
+                self._save_meta()
+            return removed
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        with self._locked(exclusive=False):
+            row = self._rows.get(str(key))
+            return None if row is None else np.array(self._matrix[row])
+
+    def vectors(self, keys: List[str]) -> Tuple[List[str], np.ndarray]:
+        """(keys found, their rows stacked in that order); missing keys are skipped"""
+        with self._locked(exclusive=False):
+            found = [str(k) for k in keys if str(k) in self._rows]
+            if not found:
+                return [], np.zeros((0, self.dim), dtype=np.float32)
+            return found, np.array(self._matrix[[self._rows[k] for k in found]])
+
+    def search(self, query: np.ndarray, limit: int = 10, exclude: Tuple[str, ...] = ()) -> List[Tuple[str, float]]:
+        """
+        Rows most similar to a unit query vector
+
+        Returns:
+            [(key, cosine similarity)] best first
+        """
+        with self._locked(exclusive=False):
+            count = len(self._keys)
+            if not count or limit <= 0:
+                return []
+            scores = np.asarray(self._matrix[:count] @ query.astype(np.float32, copy=False))
+            for key in exclude:
+                row = self._rows.get(str(key))
+                if row is not None:
+                    scores[row] = -np.inf
+            take = min(limit, count)
+            top = np.argpartition(-scores, take - 1)[:take]
+            top = top[np.argsort(-scores[top])]
+            return [(self._keys[i], round(float(scores[i]), 4)) for i in top if np.isfinite(scores[i])]
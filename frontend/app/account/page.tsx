@@ -168,10 +168,14 @@ export default function AccountPage() {
                 if (!ok) return
                 setActionBusy('jobs_clear')
                 try {
-                  const res = await jobsApi.getAll()
-                  const jobs = res.data.jobs || []
-                  for (const j of jobs) {
-                    await jobsApi.delete(j.id)
+                  // Deleting shrinks the list, so keep taking the first page until it is empty
+                  for (;;) {
+                    const res = await jobsApi.getAll({ limit: 200, fields: 'id' })
+                    const jobs = res.data.jobs || []
+                    if (jobs.length === 0) break
+                    for (const j of jobs) {
+                      await jobsApi.delete(j.id)
+                    }
                   }
                   pushToast({ type: 'success', title: 'Jobs cleared', message: 'All jobs were deleted.' })
                 } catch (e: any) {
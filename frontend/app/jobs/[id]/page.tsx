@@ -429,9 +429,10 @@ function ResumeTab({ jobId, isDemo, analysis, setActiveTab }: { jobId: number; i
       await resumeApi.upload(file)
       setShowExisting(true) // Show the uploaded resume
       setHasExistingResume(true)
-    } catch (error) {
+    } catch (error: any) {
       console.error('Upload failed:', error)
-      pushToast({ type: 'error', title: 'Upload failed', message: 'Could not upload your resume. Please try again.' })
+      // 413 (too large) and 415 (not a PDF / text file) carry a message worth showing
+      pushToast({ type: 'error', title: 'Upload failed', message: error?.response?.data?.detail || 'Could not upload your resume. Please try again.' })
     } finally {
       setUploading(false)
     }
@@ -956,19 +957,24 @@ function GapsTab({ jobId, analysis, setActiveTab }: { jobId: number; analysis: a
           <div className="space-y-3">
             {mustHaveSkills.map((skill: string, i: number) => {
               const hasEvidence = evidenceMap?.evidence?.[skill]?.length > 0
+              const impliedBy: string[] = hasEvidence ? [] : evidenceMap?.inferred?.[skill] || []
               return (
                 <div
                   key={i}
                   className={`p-3 rounded-lg border ${
                     hasEvidence
                       ? 'bg-green-50 border-green-200'
-                      : 'bg-red-50 border-red-200'
+                      : impliedBy.length > 0
+                        ? 'bg-yellow-50 border-yellow-200'
+                        : 'bg-red-50 border-red-200'
                   }`}
                 >
                   <div className="flex items-center justify-between">
                     <span className="font-medium text-gray-900">{skill}</span>
                     {hasEvidence ? (
                       <span className="text-sm text-green-700 font-medium">✓ Found</span>
+                    ) : impliedBy.length > 0 ? (
+                      <span className="text-sm text-yellow-700 font-medium">~ Inferred</span>
                     ) : (
                       <span className="text-sm text-red-700 font-medium">✗ Missing</span>
                     )}
@@ -978,6 +984,11 @@ function GapsTab({ jobId, analysis, setActiveTab }: { jobId: number; analysis: a
                       Found in: {evidenceMap.evidence[skill].map((e: any) => e.section).join(', ')}
                     </p>
                   )}
+                  {impliedBy.length > 0 && (
+                    <p className="text-xs text-gray-600 mt-1">
+                      Not named in your resume; implied by {impliedBy.join(', ')}
+                    </p>
+                  )}
                 </div>
               )
             })}
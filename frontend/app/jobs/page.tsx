@@ -6,6 +6,8 @@ import { Plus, Search, ExternalLink, Trash2 } from 'lucide-react'
 import { jobsApi } from '@/lib/api'
 import { useToast } from '@/components/ui/ToastProvider'
 
+const PAGE_SIZE = 50
+
 interface Job {
   id: number
   title: string
@@ -13,6 +15,17 @@ interface Job {
   status: string
   created_at: string
   tags?: string[]
+  snippet?: string
+}
+
+// Render an FTS snippet, turning <mark> spans into highlights without injecting HTML
+function Snippet({ text }: { text: string }) {
+  const parts = text.split(/<mark>|<\/mark>/)
+  return (
+    <p className="text-sm text-gray-500 mb-3">
+      {parts.map((part, i) => (i % 2 === 1 ? <mark key={i}>{part}</mark> : <span key={i}>{part}</span>))}
+    </p>
+  )
 }
 
 export default function JobsPage() {
@@ -20,6 +33,9 @@ export default function JobsPage() {
   const [jobs, setJobs] = useState<Job[]>([])
   const [loading, setLoading] = useState(true)
   const [searchTerm, setSearchTerm] = useState('')
+  const [searchResults, setSearchResults] = useState<Job[] | null>(null)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [errorMsg, setErrorMsg] = useState<string | null>(null)
   const [deleteConfirm, setDeleteConfirm] = useState<{ show: boolean; jobId: number | null; jobTitle: string }>({
     show: false,
@@ -34,8 +50,9 @@ export default function JobsPage() {
   const loadJobs = async () => {
     try {
       setErrorMsg(null)
-      const response = await jobsApi.getAll()
+      const response = await jobsApi.getAll({ limit: PAGE_SIZE })
       setJobs(response.data.jobs || [])
+      setNextCursor(response.data.next_cursor || null)
     } catch (error) {
       console.error('Failed to load jobs:', error)
       setErrorMsg('Failed to load jobs. If you just clicked Score/AI actions, give it a few seconds and retry.')
@@ -44,10 +61,44 @@ export default function JobsPage() {
     }
   }
 
-  const filteredJobs = jobs.filter(job =>
-    job.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    job.company?.toLowerCase().includes(searchTerm.toLowerCase())
-  )
+  const loadMore = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await jobsApi.getAll({ limit: PAGE_SIZE, cursor: nextCursor })
+      setJobs(prev => [...prev, ...(response.data.jobs || [])])
+      setNextCursor(response.data.next_cursor || null)
+    } catch (error) {
+      console.error('Failed to load more jobs:', error)
+      pushToast({ type: 'error', title: 'Load failed', message: 'Could not load more jobs. Please try again.' })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  // Search server-side (FTS index) after a short pause in typing
+  useEffect(() => {
+    const q = searchTerm.trim()
+    if (!q) {
+      setSearchResults(null)
+      return
+    }
+    let cancelled = false
+    const timer = setTimeout(async () => {
+      try {
+        const response = await jobsApi.search(q, undefined, 50)
+        if (!cancelled) setSearchResults(response.data.jobs || [])
+      } catch (error) {
+        console.error('Job search failed:', error)
+      }
+    }, 200)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [searchTerm])
+
+  const filteredJobs = searchTerm.trim() ? (searchResults ?? []) : jobs
 
   const handleDeleteJob = async (jobId: number, e: React.MouseEvent) => {
     e.preventDefault()
@@ -67,6 +118,7 @@ export default function JobsPage() {
     try {
       await jobsApi.delete(deleteConfirm.jobId)
       await loadJobs() // Reload the list
+      setSearchResults(prev => prev && prev.filter(j => j.id !== deleteConfirm.jobId))
       setDeleteConfirm({ show: false, jobId: null, jobTitle: '' })
     } catch (error) {
       console.error('Failed to delete job:', error)
@@ -159,6 +211,7 @@ export default function JobsPage() {
                       {job.company && (
                         <p className="text-gray-600 mb-3">{job.company}</p>
                       )}
+                      {job.snippet && <Snippet text={job.snippet} />}
                       <div className="flex items-center gap-2 flex-wrap">
                         <span className="px-3 py-1 bg-primary-100 text-primary-700 text-sm font-medium rounded-full">
                           {job.status}
@@ -184,6 +237,11 @@ export default function JobsPage() {
                 </Link>
               </div>
             ))}
+            {!searchTerm.trim() && nextCursor && (
+              <button onClick={loadMore} disabled={loadingMore} className="btn-secondary justify-self-center">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         )}
       </div>
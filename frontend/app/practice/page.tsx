@@ -49,7 +49,7 @@ export default function PracticePage() {
   const loadJobs = async () => {
     try {
       setJobsLoading(true)
-      const response = await jobsApi.getAll()
+      const response = await jobsApi.getAll({ limit: 200, fields: 'id,title,company' })
       const jobList = response.data.jobs || []
       setJobs(jobList)
       if (jobList.length > 0 && !selectedJobId) {
@@ -43,9 +43,29 @@ api.interceptors.response.use(
 
 export default api
 
+export interface JobListParams {
+  limit?: number
+  cursor?: string
+  status?: string
+  tag?: string
+  fields?: string // comma-separated, e.g. 'id,title,company'
+}
+
 // Jobs API
 export const jobsApi = {
-  getAll: () => api.get('/jobs'),
+  // One page, most recently updated first; pass `next_cursor` back as `cursor` for the next page
+  getAll: (params?: JobListParams) => api.get('/jobs', { params }),
+  count: (params?: { status?: string; tag?: string }) => api.get('/jobs/count', { params }),
+  // Full workup (analysis, score, optimized resume, cover letter, roadmap, interview pack) in one call;
+  // independent stages run in parallel and saved outputs are reused unless `force` is set
+  prepare: (id: number, options?: { stages?: string[]; force?: boolean; tone?: string; timeline_weeks?: number }) =>
+    aiApi.post(`/jobs/${id}/prepare`, options || {}),
+  // Full-text search (BM25-ranked); pass back `next_cursor` to fetch the next page
+  search: (q: string, cursor?: string, limit: number = 20) =>
+    api.get('/jobs/search', { params: { q, cursor, limit } }),
+  // Saved jobs ranked by local vector similarity to the latest resume (with its closest bullets per job) or to another job (near-duplicates flagged)
+  similar: (to: 'resume' | number, limit: number = 10) =>
+    api.get('/jobs/similar', { params: { to, limit } }),
   get: (id: number) => api.get(`/jobs/${id}`),
   create: (data: any) => api.post('/jobs', data),
   update: (id: number, data: any) => api.put(`/jobs/${id}`, data),
@@ -69,6 +89,11 @@ export const resumeApi = {
   clearAll: () => api.post('/resume/clear'),
   getVersions: (jobId: number) => api.get(`/resume/versions/${jobId}`),
   optimize: (jobId: number, label?: string) => aiApi.post('/resume/optimize', { job_id: jobId, label }),
+  // One LLM round trip for many bullets; results come back matched by id with constraint violations
+  rewriteBullets: (
+    bullets: { id: string; bullet: string; constraints?: Record<string, any> }[],
+    options?: { constraints?: Record<string, any>; context?: Record<string, any>; job_id?: number; max_attempts?: number },
+  ) => aiApi.post('/resume/rewrite-bullets', { bullets, ...options }),
 }
 
 // Analysis API
@@ -76,9 +101,25 @@ export const analysisApi = {
   analyzeJD: (jobId: number, jdText: string) =>
     aiApi.post('/analysis/jd', { job_id: jobId, jd_text: jdText }),
   score: (jobId: number) => aiApi.post('/analysis/score', { job_id: jobId }),
+  // Local rescore after resume edits: only changed bullets are recomputed, no LLM call
+  rescore: (jobId: number, resumeParse?: any, persist: boolean = true) =>
+    api.post('/analysis/rescore', { job_id: jobId, resume_parse: resumeParse, persist }),
+  // Rank many jobs by fit for the current resume; per-job failures come back as rows with `error`
+  scoreBatch: (jobIds: number[], options?: { concurrency?: number; rescore?: boolean }) =>
+    aiApi.post('/analysis/score-batch', { job_ids: jobIds, ...options }),
   get: (jobId: number) => api.get(`/analysis/${jobId}`),
 }
 
+// Background Tasks API (long-running AI work; follow progress via SSE)
+export const tasksApi = {
+  submit: (kind: 'analysis' | 'optimize' | 'roadmap' | 'cover_letter' | 'prepare', jobId: number, params?: Record<string, any>) =>
+    api.post('/tasks', { kind, job_id: jobId, params }),
+  get: (taskId: string) => api.get(`/tasks/${taskId}`),
+  getForJob: (jobId: number) => api.get(`/tasks/job/${jobId}`),
+  // Use with EventSource: events are "progress", then "done", "failed" or "timeout" (reconnect to keep following)
+  getEventsUrl: (taskId: string) => `${API_BASE_URL}/tasks/${taskId}/events`,
+}
+
 // Cover Letter API
 export const coverLetterApi = {
   generate: (jobId: number, tone: string = 'professional') =>
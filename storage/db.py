@@ -1,30 +1,191 @@
 """
 Database initialization and connection management
+
+Connections come from a process-wide pool: one shared writer plus several query_only
+readers (see ConnectionPool). The pool is synchronous. An async route that writes directly
+holds the event loop while it waits for, and then holds, the single writer, so one long
+write transaction (BEGIN IMMEDIATE, a migration, a bulk import) stalls every request in
+that worker. Long or contended writes from async code belong in asyncio.to_thread, as the
+task queue, single-flight leases and vector index syncs already do.
 """
 import sqlite3
 import os
-from typing import Optional
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any
 from contextlib import contextmanager
+from storage.migrations import run_migrations
+
+DB_PATH = os.getenv("DATABASE_PATH") or os.path.join(os.path.dirname(__file__), "..", "path_to_offer.db")
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "path_to_offer.db")
+# Applied once per pooled connection
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",          # readers no longer block on (or block) the writer
+    "synchronous": "NORMAL",        # durable in WAL mode except across power loss
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
 
 def get_db_path() -> str:
     """Get the database file path"""
     return DB_PATH
 
-@contextmanager
-def get_db_connection():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DB_PATH)
+def _connect(db_path: str, readonly: bool) -> sqlite3.Connection:
+    # Pooled connections move between threads (FastAPI threadpool, asyncio.to_thread);
+    # the pool guarantees only one thread uses a connection at a time.
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=CONNECTION_PRAGMAS["busy_timeout"] / 1000)
     conn.row_factory = sqlite3.Row
-    try:
+    for pragma, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma}={value}")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+class ConnectionPool:
+    """
+    Thread-safe SQLite pool: one shared writer connection (SQLite allows a single writer,
+    so writes are serialized in-process instead of spinning on SQLITE_BUSY) plus up to
+    max_readers query_only connections that read concurrently under WAL.
+    """
+
+    def __init__(self, db_path: str, max_readers: int = 8):
+        self.db_path = db_path
+        self.max_readers = max(1, max_readers)
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_owner: Optional[int] = None
+        self._stats = {
+            "reader_acquires": 0, "writer_acquires": 0, "connections_opened": 0,
+            "reader_waits": 0, "reader_wait_ms": 0.0, "writer_wait_ms": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **increments):
+        """Add to the stats counters (updated from many threads)"""
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    @contextmanager
+    def reader(self):
+        conn = None
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                if self._reader_count < self.max_readers:
+                    self._reader_count += 1
+                    opened = True
+                else:
+                    opened = False
+            if opened:
+                try:
+                    conn = _connect(self.db_path, readonly=True)
+                except Exception:
+                    with self._reader_lock:
+                        self._reader_count -= 1
+                    raise
+                self._count(connections_opened=1)
+            else:
+                started = time.perf_counter()
+                conn = self._readers.get()
+                self._count(reader_waits=1, reader_wait_ms=(time.perf_counter() - started) * 1000)
+        self._count(reader_acquires=1)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Writer connection; re-entrant within a thread (nested blocks share the outer transaction)"""
+        started = time.perf_counter()
+        with self._writer_lock:
+            nested = self._writer_owner == threading.get_ident()
+            if not nested:
+                self._count(writer_acquires=1, writer_wait_ms=(time.perf_counter() - started) * 1000)
+                if self._writer is None:
+                    self._writer = _connect(self.db_path, readonly=False)
+                    self._count(connections_opened=1)
+                self._writer_owner = threading.get_ident()
+            conn = self._writer
+            try:
+                yield conn
+                if not nested:
+                    conn.commit()
+            except Exception:
+                if not nested:
+                    conn.rollback()
+                raise
+            finally:
+                if not nested:
+                    self._writer_owner = None
+
+    def close(self):
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._reader_lock:
+            self._reader_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["reader_wait_ms"] = round(stats["reader_wait_ms"], 1)
+        stats["writer_wait_ms"] = round(stats["writer_wait_ms"], 1)
+        stats.update({
+            "max_readers": self.max_readers,
+            "readers_open": self._reader_count,
+            "readers_idle": self._readers.qsize(),
+            "writer_busy": self._writer_owner is not None,
+        })
+        return stats
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool() -> ConnectionPool:
+    """Process-wide pool for DB_PATH (reader count from SQLITE_MAX_READERS)"""
+    global _pool
+    if _pool is None or _pool.db_path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.db_path != DB_PATH:
+                _pool = ConnectionPool(DB_PATH, max_readers=int(os.getenv("SQLITE_MAX_READERS", "8")))
+    return _pool
+
+def close_connection_pool():
+    """Close every pooled connection (app shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+@contextmanager
+def get_db_connection(readonly: bool = False):
+    """
+    Context manager for pooled database connections
+
+    Args:
+        readonly: Use a query_only reader connection (never blocks on, or blocks, writes)
+    """
+    pool = get_connection_pool()
+    with (pool.reader() if readonly else pool.writer()) as conn:
         yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
 
 def init_database():
     """Initialize database schema"""
@@ -62,9 +223,9 @@ def init_database():
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        # Add index for faster sorting
+        # Add index for faster sorting (scanned backwards for newest-first keyset pages)
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at DESC)
+            CREATE INDEX IF NOT EXISTS idx_jobs_updated_at_id ON jobs(updated_at, id)
         """)
         
         # Resume sources table
@@ -106,6 +267,34 @@ def init_database():
             )
         """)
         
+        # Append-only version history (one row per saved version; replaces the JSON arrays in job_assets)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resume_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                label TEXT,
+                version_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_resume_versions_job_created ON resume_versions(job_id, created_at)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS cover_letter_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                tone TEXT,
+                text TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cover_letter_versions_job_created ON cover_letter_versions(job_id, created_at)
+        """)
+        
         # Practice sessions table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS practice_sessions (
@@ -141,6 +330,43 @@ def init_database():
             )
         """)
         
+        # Background task queue (analysis / optimize / roadmap / cover letter work)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                job_id INTEGER,
+                params_json TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                stage TEXT,
+                progress_json TEXT,
+                result_json TEXT,
+                error TEXT,
+                attempts INTEGER DEFAULT 0,
+                worker TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at ON tasks(status, created_at)
+        """)
+        
+        # Single-flight leases (coalesce identical in-flight work across workers)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS request_leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                token TEXT,
+                expires_at REAL NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                result TEXT
+            )
+        """)
+        
+        run_migrations(cursor)
+        
         conn.commit()
 
 def ensure_default_profile():
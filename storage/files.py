@@ -1,8 +1,13 @@
 """
 File handling utilities
 """
+import asyncio
+import hashlib
+import json
 import os
+import re
 import tempfile
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
@@ -14,18 +19,196 @@ def ensure_directories():
     os.makedirs(UPLOAD_DIR, exist_ok=True)
     os.makedirs(EXPORT_DIR, exist_ok=True)
 
+# Largest file accepted; UploadSizeLimit refuses bigger request bodies before they are received
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Room in a multipart body for boundaries, part headers and other form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Bytes inspected to decide what an upload really is (the client's content type is not trusted)
+_SNIFF_BYTES = 8192
+
+class UploadRejected(ValueError):
+    """Upload refused (too large or unsupported content); status is the HTTP code to answer with"""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+@dataclass
+class StoredUpload:
+    """An upload written to UPLOAD_DIR"""
+    path: str
+    sha256: str
+    size: int
+    kind: str  # "pdf" or "text"
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+def _safe_filename(filename: Optional[str]) -> str:
+    """Basename only, restricted to a portable character set (no path traversal)"""
+    name = _UNSAFE_NAME.sub("_", os.path.basename(filename or "").strip()).strip("._")
+    return name[:100] or "upload"
+
+def sniff_upload_kind(head: bytes) -> Optional[str]:
+    """
+    Content type from the first bytes of a file
+
+    Returns:
+        "pdf", "text" (UTF-8 without NUL bytes), or None for anything else
+    """
+    if head.lstrip(b"\r\n\t ").startswith(b"%PDF-"):
+        return "pdf"
+    if b"\x00" in head:
+        return None
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character may straddle the sniff boundary
+        if e.start < len(head) - 4:
+            return None
+    return "text"
+
+class _BodyTooLarge(Exception):
+    pass
+
+class UploadSizeLimit:
+    """
+    ASGI middleware capping request bodies on upload routes while they are received
+
+    FastAPI spools a multipart body to memory/disk before the route runs, so a size check
+    in the route only runs after the whole upload has arrived. This refuses it up front: a
+    Content-Length over the cap gets 413 without reading the body, and a body without one
+    (chunked) is cut off with 413 as soon as it passes the cap.
+    """
+
+    def __init__(self, app, paths=(), max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = frozenset(p.rstrip("/") for p in paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        try:
+            declared = int(headers.get(b"content-length", b"-1"))
+        except ValueError:
+            declared = -1
+        if declared > self.max_bytes:
+            await self._reject(send)
+            return
+        received = 0
+        tripped = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, tripped
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    tripped = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if tripped:
+                return  # The app's answer to the aborted body (e.g. a parse error) is replaced
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            pass
+        if tripped and not started:
+            await self._reject(send)
+
+    async def _reject(self, send):
+        limit = (self.max_bytes - MULTIPART_OVERHEAD_BYTES) / (1024 * 1024)
+        body = json.dumps({"detail": f"File too large (limit {limit:g} MB)"}).encode("utf-8")
+        await send({"type": "http.response.start", "status": 413,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                                (b"connection", b"close")]})
+        await send({"type": "http.response.body", "body": body})
+
+async def save_upload_stream(upload, filename: Optional[str] = None,
+                             max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """
+    Stream a FastAPI UploadFile to disk in chunks, hashing and sniffing it on the way
+
+    Memory stays at one chunk regardless of upload size. The body has already been received
+    when this runs (UploadSizeLimit refuses oversized bodies before that); files over
+    max_bytes are rejected here without being stored. Files are stored content-addressed, so
+    re-uploading the same bytes reuses the stored copy.
+
+    Args:
+        upload: FastAPI UploadFile
+        filename: Original name (kept as a readable suffix)
+        max_bytes: Size cap
+
+    Returns:
+        StoredUpload
+
+    Raises:
+        UploadRejected: 413 over the cap, 415 for content that is neither PDF nor UTF-8 text
+    """
+    ensure_directories()
+    digest = hashlib.sha256()
+    size = 0
+    kind = None
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if kind is None:
+                    kind = sniff_upload_kind(chunk[:_SNIFF_BYTES])
+                    if kind is None:
+                        raise UploadRejected("Unsupported file type. Upload a PDF or a plain-text resume.", 415)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"File too large (limit {max_bytes / (1024 * 1024):g} MB)", 413)
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        if kind is None:
+            raise UploadRejected("Uploaded file is empty", 415)
+        sha256 = digest.hexdigest()
+        path = os.path.join(UPLOAD_DIR, f"{sha256[:16]}-{_safe_filename(filename or getattr(upload, 'filename', None))}")
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return StoredUpload(path=path, sha256=sha256, size=size, kind=kind)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def read_text_file(file_path: str) -> str:
+    """Read an uploaded plain-text file (invalid UTF-8 sequences are replaced)"""
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
 def save_uploaded_file(uploaded_file, filename: str = None) -> str:
     """Save an uploaded file and return the path"""
     ensure_directories()
     if filename is None:
         filename = uploaded_file.filename if hasattr(uploaded_file, 'filename') else uploaded_file.name
-    file_path = os.path.join(UPLOAD_DIR, filename)
+    file_path = os.path.join(UPLOAD_DIR, _safe_filename(filename))
     # Handle both Streamlit UploadedFile and FastAPI UploadFile
     if hasattr(uploaded_file, 'read'):
-        # FastAPI UploadFile
+        # FastAPI UploadFile: copy in chunks rather than reading it whole
         with open(file_path, "wb") as f:
-            content = uploaded_file.file.read()
-            f.write(content)
+            while True:
+                chunk = uploaded_file.file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                f.write(chunk)
     else:
         # Streamlit UploadedFile
         with open(file_path, "wb") as f:
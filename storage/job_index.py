@@ -0,0 +1,247 @@
+"""
+Job similarity index - JD and resume bullet vectors kept in step with the database
+
+Each job's title and JD text is embedded into a VectorIndex (core.vector_index) stored next
+to the database, and so is every resume bullet (the resume_bullets table). The indexes sync
+incrementally: rows whose stamp (updated_at, bullet content hash) changed are re-embedded,
+deleted rows are dropped, everything else is left as is. A cheap fingerprint of the jobs
+table skips the sync entirely when nothing changed since this process last synced, and the
+job routes also update the index directly on create/update/delete.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from storage import queries
+from storage.db import get_db_connection, get_db_path
+from core.vector_index import VectorIndex, text_vector
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR") or os.path.join(os.path.dirname(os.path.abspath(get_db_path())), "vector_index")
+# Similarity from which two JDs are reported as near-duplicates
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.9"))
+# Resume bullets reported per job when ranking against the resume
+MATCHING_BULLETS = 3
+
+_indexes: Dict[str, VectorIndex] = {}
+_index_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+# jobs table fingerprint at this process's last sync
+_jobs_synced: Optional[Tuple] = None
+
+def _get_index(name: str) -> VectorIndex:
+    with _index_lock:
+        if name not in _indexes:
+            _indexes[name] = VectorIndex(VECTOR_INDEX_DIR, name)
+        return _indexes[name]
+
+def get_job_index() -> VectorIndex:
+    """Process-wide JD index (opened on first use)"""
+    return _get_index("jobs")
+
+def get_bullet_index() -> VectorIndex:
+    """Process-wide resume bullet index (keys from bullet_key)"""
+    return _get_index("resume_bullets")
+
+def bullet_key(resume_id: int, bullet: Dict[str, Any]) -> str:
+    """Bullet index key (resume_id:section:entry_index:bullet_index)"""
+    return f"{resume_id}:{bullet['section']}:{bullet['entry_index']}:{bullet['bullet_index']}"
+
+def job_text(job: Dict[str, Any]) -> str:
+    """Text a job is embedded from"""
+    return "\n".join(str(job.get(k) or "") for k in ("title", "jd_text"))
+
+def resume_text(resume: Dict[str, Any]) -> str:
+    """Text a resume is embedded from: bullets, roles, tech stacks and skills when parsed, else the raw text"""
+    parsed = resume.get("parsed")
+    if not isinstance(parsed, dict) or not parsed:
+        return resume.get("raw_text") or ""
+    parts: List[str] = []
+    for section in ("experience", "projects"):
+        for entry in parsed.get(section) or []:
+            if isinstance(entry, dict):
+                parts.extend(str(entry.get(k) or "") for k in ("role", "title"))
+                parts.extend(str(t) for t in entry.get("tech_stack") or [])
+                parts.extend(str(b) for b in entry.get("bullets") or [])
+    skills = parsed.get("skills") or {}
+    if isinstance(skills, dict):
+        parts.extend(str(s) for items in skills.values() if isinstance(items, list) for s in items)
+    return "\n".join(p for p in parts if p) or (resume.get("raw_text") or "")
+
+def sync_job_index() -> Dict[str, int]:
+    """
+    Bring the index in line with the jobs table (re-embeds only new or changed jobs)
+
+    Returns:
+        {"embedded", "removed", "size"}
+    """
+    global _jobs_synced
+    index = get_job_index()
+    with get_db_connection(readonly=True) as conn:
+        fingerprint = _jobs_fingerprint(conn)
+        current = {str(row["id"]): row["updated_at"] for row in conn.execute("SELECT id, updated_at FROM jobs")}
+    stamps = index.stamps()
+    stale = [key for key, stamp in current.items() if stamps.get(key, object()) != stamp]
+    items = []
+    for start in range(0, len(stale), 500):
+        chunk = stale[start:start + 500]
+        with get_db_connection(readonly=True) as conn:
+            rows = conn.execute(
+                f"SELECT id, title, jd_text, updated_at FROM jobs WHERE id IN ({','.join('?' * len(chunk))})",
+                [int(k) for k in chunk],
+            ).fetchall()
+        items.extend((str(row["id"]), job_text(dict(row)), row["updated_at"]) for row in rows)
+    embedded = index.upsert_many(items)
+    removed = index.remove_many([key for key in stamps if key not in current])
+    _jobs_synced = fingerprint
+    return {"embedded": embedded, "removed": removed, "size": len(index)}
+
+def _jobs_fingerprint(conn) -> Tuple:
+    """Changes whenever a job is added, deleted or updated (one aggregate, no rows read into Python)"""
+    return tuple(conn.execute("SELECT COUNT(*), MAX(updated_at), TOTAL(id) FROM jobs").fetchone())
+
+def ensure_job_index() -> bool:
+    """
+    Sync the JD index only if the jobs table changed since this process last synced
+
+    Returns:
+        True when a sync ran
+    """
+    with get_db_connection(readonly=True) as conn:
+        fingerprint = _jobs_fingerprint(conn)
+    if fingerprint == _jobs_synced:
+        return False
+    sync_job_index()
+    return True
+
+def _sync_resume_rows(resume_id: int, index: VectorIndex, stamps: Dict[str, Optional[str]]) -> Tuple[List[Dict[str, Any]], int]:
+    bullets = [{**b, "key": bullet_key(resume_id, b)} for b in queries.get_resume_bullets(resume_id)]
+    embedded = index.upsert_many([(b["key"], b["text"], b["content_hash"]) for b in bullets
+                                  if stamps.get(b["key"]) != b["content_hash"]])
+    return bullets, embedded
+
+def sync_resume_bullets(resume_id: int) -> List[Dict[str, Any]]:
+    """
+    Bring one resume's rows of the bullet index in line with its bullet records
+
+    Returns:
+        The resume's bullet records (queries.get_resume_bullets) with their index "key"
+    """
+    index = get_bullet_index()
+    stamps = index.stamps()
+    bullets, _ = _sync_resume_rows(resume_id, index, stamps)
+    current = {b["key"] for b in bullets}
+    prefix = f"{resume_id}:"
+    index.remove_many([key for key in stamps if key.startswith(prefix) and key not in current])
+    return bullets
+
+def sync_bullet_index() -> Dict[str, int]:
+    """
+    Bring the bullet index in line with the resume_bullets table (drops bullets of deleted resumes)
+
+    Returns:
+        {"embedded", "removed", "size"}
+    """
+    index = get_bullet_index()
+    with get_db_connection(readonly=True) as conn:
+        resume_ids = [row[0] for row in conn.execute("SELECT DISTINCT resume_id FROM resume_bullets")]
+    stamps = index.stamps()
+    current = set()
+    embedded = 0
+    for resume_id in resume_ids:
+        bullets, count = _sync_resume_rows(resume_id, index, stamps)
+        current.update(b["key"] for b in bullets)
+        embedded += count
+    removed = index.remove_many([key for key in stamps if key not in current])
+    return {"embedded": embedded, "removed": removed, "size": len(index)}
+
+def sync_vector_indexes() -> Dict[str, Dict[str, int]]:
+    """Full incremental sync of both indexes"""
+    return {"jobs": sync_job_index(), "resume_bullets": sync_bullet_index()}
+
+async def sync_vector_indexes_in_background():
+    """sync_vector_indexes in a worker thread (run at startup); a failure only defers it to the first request"""
+    try:
+        stats = await asyncio.to_thread(sync_vector_indexes)
+        logger.info("Vector indexes synced: %s", stats)
+    except Exception:
+        logger.exception("Vector index sync failed")
+
+def index_job(job_id: int):
+    """Embed one job now (after a create or update through the API)"""
+    job = queries.get_job(job_id)
+    if job:
+        get_job_index().upsert(str(job_id), job_text(job), job.get("updated_at"))
+
+def unindex_job(job_id: int):
+    get_job_index().remove_many([str(job_id)])
+
+def _matching_bullets(job_keys: List[str], bullets: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """job key -> the resume bullets closest to that JD, best first"""
+    keys, job_vectors = get_job_index().vectors(job_keys)
+    bullet_keys, bullet_vectors = get_bullet_index().vectors([b["key"] for b in bullets])
+    if not keys or not bullet_keys:
+        return {}
+    by_key = {b["key"]: b for b in bullets}
+    scores = job_vectors @ bullet_vectors.T
+    take = min(MATCHING_BULLETS, len(bullet_keys))
+    matches = {}
+    for key, row in zip(keys, scores):
+        top = np.argsort(-row)[:take]
+        matches[key] = [
+            {**{k: by_key[bullet_keys[i]][k] for k in ("section", "entry_index", "bullet_index", "text")},
+             "similarity": round(float(row[i]), 4)}
+            for i in top if row[i] > 0
+        ]
+    return matches
+
+def similar_jobs(query_text: Optional[str] = None, job_id: Optional[int] = None, limit: int = 10,
+                 resume_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Saved jobs ranked by similarity to a text (e.g. the resume) or to another job
+
+    Blocking (may embed changed jobs); call from a worker thread in async code.
+
+    Args:
+        query_text: Text to rank against (ignored when job_id is given)
+        job_id: Rank against this job's JD (the job itself is excluded)
+        limit: Max results
+        resume_id: Resume whose bullets closest to each JD are reported
+
+    Returns:
+        [{"id", "title", "company", "status", "similarity", "near_duplicate",
+          "matching_bullets" (with resume_id)}] best first
+    """
+    ensure_job_index()
+    index = get_job_index()
+    exclude = ()
+    if job_id is not None:
+        query = index.vector(str(job_id))
+        if query is None:
+            raise KeyError(job_id)
+        exclude = (str(job_id),)
+    else:
+        query = text_vector(query_text or "")
+    hits = index.search(query, limit=limit, exclude=exclude)
+    if not hits:
+        return []
+    ids = [int(key) for key, _ in hits]
+    with get_db_connection(readonly=True) as conn:
+        rows = conn.execute(
+            f"SELECT id, title, company, status FROM jobs WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+    jobs = {row["id"]: dict(row) for row in rows}
+    matches = None
+    if resume_id is not None:
+        matches = _matching_bullets([key for key, _ in hits], sync_resume_bullets(resume_id))
+    results = []
+    for key, score in hits:
+        job = jobs.get(int(key))
+        if job:
+            near_duplicate = job_id is not None and score >= NEAR_DUPLICATE_SIMILARITY
+            result = {**job, "similarity": score, "near_duplicate": near_duplicate}
+            if matches is not None:
+                result["matching_bullets"] = matches.get(key, [])
+            results.append(result)
+    return results
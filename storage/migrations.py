@@ -0,0 +1,314 @@
+"""
+Schema migrations - ordered, versioned changes on top of init_database's base tables
+
+The applied version is kept in SQLite's PRAGMA user_version. Each migration runs once, in
+its own explicit transaction together with its user_version bump, so a failed migration
+leaves no partial DDL behind and is retried whole on the next start. Migrations must
+tolerate being the first thing applied to an old database (tables created with CREATE
+TABLE IF NOT EXISTS may already hold data), and must not import application code that
+can change after they ship: they work on frozen copies of whatever logic they need.
+"""
+import hashlib
+import json
+import re
+from typing import Callable, List, Tuple
+
+def _migrate_version_blobs(cursor):
+    """Move job_assets.resume_versions_json / cover_letter_versions_json arrays into the version tables"""
+    cursor.execute("""
+        SELECT job_id, resume_versions_json, cover_letter_versions_json FROM job_assets
+        WHERE resume_versions_json IS NOT NULL OR cover_letter_versions_json IS NOT NULL
+    """)
+    for job_id, resume_blob, cover_letter_blob in cursor.fetchall():
+        try:
+            resume_versions = json.loads(resume_blob) if resume_blob else []
+            cover_letter_versions = json.loads(cover_letter_blob) if cover_letter_blob else []
+        except (json.JSONDecodeError, TypeError):
+            print(f"Skipping version migration for job {job_id}: unreadable JSON")
+            continue
+        # Blob order is chronological; rows keep it through AUTOINCREMENT ids (ties on created_at).
+        for version in resume_versions if isinstance(resume_versions, list) else []:
+            if isinstance(version, dict):
+                cursor.execute(
+                    "INSERT INTO resume_versions (job_id, label, version_json) VALUES (?, ?, ?)",
+                    (job_id, version.get("label"), json.dumps(version)),
+                )
+        for version in cover_letter_versions if isinstance(cover_letter_versions, list) else []:
+            if isinstance(version, dict) and version.get("text"):
+                cursor.execute(
+                    "INSERT INTO cover_letter_versions (job_id, tone, text) VALUES (?, ?, ?)",
+                    (job_id, version.get("tone"), version["text"]),
+                )
+        cursor.execute("""
+            UPDATE job_assets SET resume_versions_json = NULL, cover_letter_versions_json = NULL WHERE job_id = ?
+        """, (job_id,))
+
+def _merge_duplicate_rows(cursor, table: str, columns: List[str]):
+    """Collapse rows sharing a job_id into the newest one, keeping older non-null values it lacks"""
+    cursor.execute(f"SELECT job_id FROM {table} GROUP BY job_id HAVING COUNT(*) > 1")
+    for (job_id,) in cursor.fetchall():
+        cursor.execute(f"SELECT id, {', '.join(columns)} FROM {table} WHERE job_id = ? ORDER BY id", (job_id,))
+        rows = cursor.fetchall()
+        merged = {}
+        for row in rows:
+            for i, column in enumerate(columns, start=1):
+                if row[i] is not None:
+                    merged[column] = row[i]
+        keep_id = rows[-1][0]
+        if merged:
+            assignments = ", ".join(f"{c} = ?" for c in merged)
+            cursor.execute(f"UPDATE {table} SET {assignments} WHERE id = ?", (*merged.values(), keep_id))
+        cursor.execute(f"DELETE FROM {table} WHERE job_id = ? AND id != ?", (job_id, keep_id))
+
+def _add_job_id_indexes(cursor):
+    """UNIQUE(job_id) on the 1:1 per-job tables (after merging duplicates) and job_id indexes on the 1:N ones"""
+    _merge_duplicate_rows(cursor, "job_analysis",
+                          ["jd_extract_json", "evidence_map_json", "score_breakdown_json", "rewrite_plan_json"])
+    _merge_duplicate_rows(cursor, "job_assets",
+                          ["resume_versions_json", "cover_letter_versions_json", "roadmap_json", "interview_pack_json"])
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_job_analysis_job_id ON job_analysis(job_id)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_job_assets_job_id ON job_assets(job_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_practice_sessions_job_id ON practice_sessions(job_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_coding_sessions_job_id ON coding_sessions(job_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_job_id ON tasks(job_id)")
+
+def _add_jobs_fts(cursor):
+    """FTS5 index over job title/company/JD/tags, kept in sync with jobs by triggers"""
+    # External-content table: the text lives only in jobs, the index stores just the postings.
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, jd_text, tags_json,
+            content='jobs', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, company, jd_text, tags_json)
+            VALUES (new.id, new.title, new.company, new.jd_text, new.tags_json);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, jd_text, tags_json)
+            VALUES ('delete', old.id, old.title, old.company, old.jd_text, old.tags_json);
+        END
+    """)
+    # Only indexed columns: status changes and updated_at bumps do not touch the index
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, jd_text, tags_json ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, jd_text, tags_json)
+            VALUES ('delete', old.id, old.title, old.company, old.jd_text, old.tags_json);
+            INSERT INTO jobs_fts(rowid, title, company, jd_text, tags_json)
+            VALUES (new.id, new.title, new.company, new.jd_text, new.tags_json);
+        END
+    """)
+    cursor.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+def _add_job_list_indexes(cursor):
+    """(updated_at, id) keyset indexes for job listing and a job_tags side table mirroring jobs.tags_json"""
+    # A DESC index still needs a temp sort for the id tie-break; ascending (updated_at, id) is
+    # scanned backwards instead (idx_jobs_updated_at_id is created by init_database).
+    cursor.execute("DROP INDEX IF EXISTS idx_jobs_updated_at")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_updated_at_id ON jobs(status, updated_at, id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_tags (
+            tag TEXT NOT NULL,
+            job_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, job_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_tags_job_id ON job_tags(job_id)")
+    # Malformed tags_json indexes no tags rather than failing the write
+    tags_of_new = "json_each(CASE WHEN json_valid(new.tags_json) THEN new.tags_json ELSE '[]' END)"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS job_tags_ai AFTER INSERT ON jobs BEGIN
+            INSERT OR IGNORE INTO job_tags (tag, job_id)
+            SELECT value, new.id FROM {tags_of_new} WHERE type = 'text';
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS job_tags_au AFTER UPDATE OF tags_json ON jobs BEGIN
+            DELETE FROM job_tags WHERE job_id = old.id;
+            INSERT OR IGNORE INTO job_tags (tag, job_id)
+            SELECT value, new.id FROM {tags_of_new} WHERE type = 'text';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_tags_ad AFTER DELETE ON jobs BEGIN
+            DELETE FROM job_tags WHERE job_id = old.id;
+        END
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO job_tags (tag, job_id)
+        SELECT t.value, j.id
+        FROM jobs j, json_each(CASE WHEN json_valid(j.tags_json) THEN j.tags_json ELSE '[]' END) t
+        WHERE j.tags_json IS NOT NULL AND t.type = 'text'
+    """)
+
+def _add_column(cursor, table: str, column: str, declaration: str):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+_BULLET_WHITESPACE = re.compile(r"\s+")
+
+def _bullet_rows(resume_id: int, parsed) -> List[Tuple]:
+    """
+    resume_bullets rows for a parsed resume
+
+    Frozen copy of core.incremental.bullet_records as of migration 5 (experience and project
+    bullets, whitespace-insensitive SHA-1 content hash).
+    """
+    rows = []
+    for section in ("experience", "projects"):
+        for entry_index, entry in enumerate(parsed.get(section) or []):
+            if not isinstance(entry, dict):
+                continue
+            for bullet_index, bullet in enumerate(entry.get("bullets") or []):
+                text = str(bullet)
+                content_hash = hashlib.sha1(_BULLET_WHITESPACE.sub(" ", text).strip().encode("utf-8")).hexdigest()[:16]
+                rows.append((resume_id, section, entry_index, bullet_index, text, content_hash))
+    return rows
+
+def _insert_bullet_records(cursor, resume_id: int, parsed):
+    if isinstance(parsed, dict):
+        cursor.executemany(
+            "INSERT OR REPLACE INTO resume_bullets (resume_id, section, entry_index, bullet_index, text, content_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            _bullet_rows(resume_id, parsed),
+        )
+
+def _add_bullet_records(cursor):
+    """Per-bullet resume records, per-job bullet contribution cache and the scored-resume fingerprint"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resume_bullets (
+            resume_id INTEGER NOT NULL,
+            section TEXT NOT NULL,
+            entry_index INTEGER NOT NULL,
+            bullet_index INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            PRIMARY KEY (resume_id, section, entry_index, bullet_index)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS resume_bullets_ad AFTER DELETE ON resume_sources BEGIN
+            DELETE FROM resume_bullets WHERE resume_id = old.id;
+        END
+    """)
+    # Contribution (lint features + evidenced skills) of one bullet text to one job's score
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_bullet_scores (
+            job_id INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            contribution_json TEXT NOT NULL,
+            PRIMARY KEY (job_id, content_hash)
+        ) WITHOUT ROWID
+    """)
+    _add_column(cursor, "job_analysis", "resume_fingerprint", "TEXT")
+    # Backfill bullet records for resumes that are already parsed
+    cursor.execute("SELECT id, parsed_json FROM resume_sources WHERE parsed_json IS NOT NULL")
+    for resume_id, parsed_json in cursor.fetchall():
+        try:
+            parsed = json.loads(parsed_json)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        _insert_bullet_records(cursor, resume_id, parsed)
+
+def _add_resume_content_hash(cursor):
+    """resume_sources.content_hash (SHA-256 of raw_text) with duplicates merged and a UNIQUE index"""
+    _add_column(cursor, "resume_sources", "content_hash", "TEXT")
+    cursor.execute("SELECT id, raw_text FROM resume_sources WHERE raw_text IS NOT NULL")
+    by_hash = {}
+    for resume_id, raw_text in cursor.fetchall():
+        by_hash.setdefault(hashlib.sha256(raw_text.encode("utf-8")).hexdigest(), []).append(resume_id)
+    for content_hash, ids in by_hash.items():
+        # Keep the newest row (it is what "latest resume" returned), borrowing a parse from an older copy
+        cursor.execute(f"""
+            SELECT id, file_path, parsed_json FROM resume_sources WHERE id IN ({",".join("?" * len(ids))})
+            ORDER BY created_at DESC, id DESC
+        """, ids)
+        rows = cursor.fetchall()
+        keep_id, file_path, parsed_json = rows[0]
+        if not parsed_json:
+            parsed_json = next((r[2] for r in rows if r[2]), None)
+        if not file_path:
+            file_path = next((r[1] for r in rows if r[1]), None)
+        for duplicate_id, _, _ in rows[1:]:
+            cursor.execute("DELETE FROM resume_sources WHERE id = ?", (duplicate_id,))
+        cursor.execute("UPDATE resume_sources SET content_hash = ?, parsed_json = ?, file_path = ? WHERE id = ?",
+                       (content_hash, parsed_json, file_path, keep_id))
+        if parsed_json and parsed_json != rows[0][2]:
+            # Adopted parse: rebuild the kept row's bullet records
+            try:
+                parsed = json.loads(parsed_json)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            cursor.execute("DELETE FROM resume_bullets WHERE resume_id = ?", (keep_id,))
+            _insert_bullet_records(cursor, keep_id, parsed)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_resume_sources_content_hash ON resume_sources(content_hash)")
+
+# (version, description, migration); append only, never renumber
+def _add_lease_results(cursor):
+    """request_leases.token / done / result (leases are transient: the table is recreated)"""
+    cursor.execute("DROP TABLE IF EXISTS request_leases")
+    cursor.execute("""
+        CREATE TABLE request_leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            token TEXT,
+            expires_at REAL NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            result TEXT
+        )
+    """)
+
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "move resume/cover letter version arrays into version tables", _migrate_version_blobs),
+    (2, "job_id indexes and UNIQUE(job_id) on job_analysis / job_assets", _add_job_id_indexes),
+    (3, "jobs_fts full-text index with sync triggers", _add_jobs_fts),
+    (4, "job listing keyset indexes and job_tags table", _add_job_list_indexes),
+    (5, "resume_bullets records, job_bullet_scores cache, job_analysis.resume_fingerprint", _add_bullet_records),
+    (6, "resume_sources.content_hash with duplicates merged and a unique index", _add_resume_content_hash),
+    (7, "request_leases token and shared result columns", _add_lease_results),
+]
+
+def get_schema_version(cursor) -> int:
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+def run_migrations(cursor) -> int:
+    """
+    Apply pending migrations in order, each in its own transaction
+
+    Args:
+        cursor: Cursor on the writer connection; pending work on it is committed first
+
+    Returns:
+        Schema version after migrating
+    """
+    conn = cursor.connection
+    if conn.in_transaction:
+        conn.commit()
+    version = get_schema_version(cursor)
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        # Explicit BEGIN: in legacy transaction mode sqlite3 would otherwise autocommit each
+        # DDL statement. IMMEDIATE takes the write lock, so concurrent workers apply it once.
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_schema_version(cursor)
+            if target > version:
+                print(f"Applying schema migration {target}: {description}")
+                migrate(cursor)
+                # PRAGMA does not accept bound parameters; target is an int from MIGRATIONS.
+                cursor.execute(f"PRAGMA user_version = {int(target)}")
+                version = target
+            cursor.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+    return version
@@ -1,14 +1,17 @@
 """
 Database query functions
 """
+import base64
+import hashlib
 import json
-from typing import Optional, List, Dict, Any
+import re
+from typing import Optional, List, Dict, Any, Tuple
 from storage.db import get_db_connection
 
 # User Profile Queries
 def get_user_profile() -> Optional[Dict[str, Any]]:
     """Get the user profile"""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users_profile LIMIT 1")
         row = cursor.fetchone()
@@ -40,7 +43,7 @@ def create_job(title: str, company: str = None, link: str = None, jd_text: str =
 
 def get_job(job_id: int) -> Optional[Dict[str, Any]]:
     """Get a job by ID"""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
         row = cursor.fetchone()
@@ -51,30 +54,173 @@ def get_job(job_id: int) -> Optional[Dict[str, Any]]:
             return job
         return None
 
-def get_all_jobs() -> List[Dict[str, Any]]:
-    """Get all jobs (without jd_text for performance)"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        # Exclude jd_text from list view - it can be very large
-        cursor.execute("""
-            SELECT id, title, company, link, status, tags_json, created_at, updated_at 
-            FROM jobs 
-            ORDER BY updated_at DESC
-        """)
-        rows = cursor.fetchall()
-        jobs = [dict(row) for row in rows]
-        for job in jobs:
-            tags_json = job.get("tags_json")
-            if tags_json:
-                try:
-                    job["tags"] = json.loads(tags_json)
-                except (json.JSONDecodeError, TypeError):
-                    job["tags"] = []
-            else:
-                job["tags"] = []
-            # Remove tags_json from response (we have tags now)
-            job.pop("tags_json", None)
-        return jobs
+# Columns the job list can return (jd_text is excluded - it can be very large); "tags" maps to tags_json
+JOB_LIST_FIELDS = ("id", "title", "company", "link", "status", "tags", "created_at", "updated_at")
+
+def list_jobs(limit: Optional[int] = 50, cursor: Optional[str] = None, status: Optional[str] = None,
+              tag: Optional[str] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    One page of jobs, most recently updated first
+
+    Args:
+        limit: Page size (None for everything)
+        cursor: next_cursor from the previous page
+        status: Only jobs with this status
+        tag: Only jobs carrying this tag
+        fields: Subset of JOB_LIST_FIELDS to return (id is always included)
+
+    Returns:
+        {"jobs": [...], "next_cursor": str or None}
+    """
+    fields = list(fields or JOB_LIST_FIELDS)
+    unknown = [f for f in fields if f not in JOB_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(unknown)}")
+    # id and updated_at are always selected: together they are the keyset
+    columns = ["id", "updated_at"] + [("tags_json" if f == "tags" else f) for f in fields if f not in ("id", "updated_at")]
+    where, params = _job_filters(status, tag)
+    if cursor:
+        last_updated_at, last_id = decode_cursor(cursor, 2)
+        # Row-value comparison seeks idx_jobs_updated_at_id / idx_jobs_status_updated_at_id to the cursor
+        where.append("(updated_at, id) < (?, ?)")
+        params += [last_updated_at, last_id]
+    sql = f"SELECT {', '.join(columns)} FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY updated_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    with get_db_connection(readonly=True) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    jobs = [dict(row) for row in (rows[:limit] if limit is not None else rows)]
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        next_cursor = encode_cursor(jobs[-1]["updated_at"], jobs[-1]["id"])
+    for job in jobs:
+        if "tags" in fields:
+            _with_tags(job)
+        if "updated_at" not in fields:
+            job.pop("updated_at")
+    return {"jobs": jobs, "next_cursor": next_cursor}
+
+def _job_filters(status: Optional[str], tag: Optional[str]) -> Tuple[List[str], List[Any]]:
+    where: List[str] = []
+    params: List[Any] = []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if tag:
+        where.append("id IN (SELECT job_id FROM job_tags WHERE tag = ?)")
+        params.append(tag)
+    return where, params
+
+def count_jobs(status: Optional[str] = None, tag: Optional[str] = None) -> int:
+    """Number of jobs matching the list filters (counted on an index, no rows read)"""
+    where, params = _job_filters(status, tag)
+    sql = "SELECT COUNT(*) FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+def get_all_jobs(limit: Optional[int] = None, status: Optional[str] = None, tag: Optional[str] = None,
+                 fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Get jobs, most recently updated first (without jd_text for performance)"""
+    return list_jobs(limit=limit, status=status, tag=tag, fields=fields)["jobs"]
+
+def _with_tags(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a list row's tags_json with a decoded tags list"""
+    tags_json = job.pop("tags_json", None)
+    try:
+        job["tags"] = json.loads(tags_json) if tags_json else []
+    except (json.JSONDecodeError, TypeError):
+        job["tags"] = []
+    return job
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset-pagination cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, size: int) -> Tuple:
+    """Inverse of encode_cursor; raises ValueError on a malformed or foreign cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return tuple(values)
+
+def build_fts_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression
+
+    Every word must match (implicit AND); the last word is a prefix so results update as
+    the user types. Words are quoted, so FTS5 operators in the input are treated as text.
+
+    Returns:
+        MATCH expression, or None if the text has no searchable words
+    """
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+# bm25() column weights, in jobs_fts column order (title, company, jd_text, tags_json)
+SEARCH_WEIGHTS = (8.0, 4.0, 1.0, 2.0)
+
+def search_jobs(text: str, limit: int = 20, cursor: Optional[str] = None,
+                mark: Tuple[str, str] = ("<mark>", "</mark>")) -> Dict[str, Any]:
+    """
+    Full-text search over job title, company, JD and tags, best matches first
+
+    Args:
+        text: Free-text query
+        limit: Page size
+        cursor: next_cursor from the previous page
+        mark: Strings wrapped around matched terms in snippets
+
+    Returns:
+        {"jobs": [...list fields, snippet, score], "next_cursor": str or None}
+    """
+    match = build_fts_query(text)
+    if not match:
+        return {"jobs": [], "next_cursor": None}
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    # Keyset on (score, id): bm25 is lower-is-better, id breaks ties deterministically
+    after = ""
+    params: List[Any] = [match]
+    if cursor:
+        last_score, last_id = decode_cursor(cursor, 2)
+        after = "WHERE score > ? OR (score = ? AND id > ?)"
+        params += [last_score, last_score, last_id]
+    params += [limit + 1, mark[0], mark[1], match]
+    with get_db_connection(readonly=True) as conn:
+        # Rank all matches, then build snippets only for the page (snippet() is the costly part)
+        rows = conn.execute(f"""
+            WITH ranked AS (
+                SELECT id, score FROM (
+                    SELECT rowid AS id, bm25(jobs_fts, {weights}) AS score
+                    FROM jobs_fts WHERE jobs_fts MATCH ?
+                )
+                {after}
+                ORDER BY score, id
+                LIMIT ?
+            )
+            SELECT j.id, j.title, j.company, j.link, j.status, j.tags_json, j.created_at, j.updated_at,
+                   snippet(jobs_fts, -1, ?, ?, '...', 16) AS snippet, ranked.score
+            FROM ranked
+            JOIN jobs_fts ON jobs_fts.rowid = ranked.id
+            JOIN jobs j ON j.id = ranked.id
+            WHERE jobs_fts MATCH ?
+            ORDER BY ranked.score, ranked.id
+        """, params).fetchall()
+    jobs = [_with_tags(dict(row)) for row in rows[:limit]]
+    next_cursor = encode_cursor(jobs[-1]["score"], jobs[-1]["id"]) if len(rows) > limit else None
+    return {"jobs": jobs, "next_cursor": next_cursor}
 
 def update_job(job_id: int, **kwargs) -> bool:
     """Update a job"""
@@ -94,42 +240,87 @@ def delete_job(job_id: int) -> bool:
         # Clean up related rows to avoid orphaned analysis/assets that can cause confusing states.
         cursor.execute("DELETE FROM job_analysis WHERE job_id = ?", (job_id,))
         cursor.execute("DELETE FROM job_assets WHERE job_id = ?", (job_id,))
+        cursor.execute("DELETE FROM resume_versions WHERE job_id = ?", (job_id,))
+        cursor.execute("DELETE FROM cover_letter_versions WHERE job_id = ?", (job_id,))
         cursor.execute("DELETE FROM practice_sessions WHERE job_id = ?", (job_id,))
         cursor.execute("DELETE FROM coding_sessions WHERE job_id = ?", (job_id,))
+        cursor.execute("DELETE FROM job_bullet_scores WHERE job_id = ?", (job_id,))
+        cursor.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
         cursor.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
         return cursor.rowcount > 0
 
+def _row_to_resume(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    resume = dict(row)
+    if resume.get("parsed_json"):
+        try:
+            resume["parsed"] = json.loads(resume["parsed_json"])
+        except (json.JSONDecodeError, TypeError):
+            pass  # unreadable parse: treated as unparsed (ensure_parsed re-parses)
+    return resume
+
+def resume_content_hash(raw_text: Optional[str]) -> Optional[str]:
+    """SHA-256 of a resume's raw text; identical uploads share one resume_sources row (and parse)"""
+    if raw_text is None:
+        return None
+    return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+
+# Millisecond timestamps so a re-upload (which reuses its row) still sorts as the latest resume
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
 def get_resume_source_by_file_path(file_path: str) -> Optional[Dict[str, Any]]:
     """Get a resume source by file_path"""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM resume_sources WHERE file_path = ? ORDER BY created_at DESC LIMIT 1", (file_path,))
-        row = cursor.fetchone()
-        if row:
-            resume = dict(row)
-            if resume.get("parsed_json"):
-                resume["parsed"] = json.loads(resume["parsed_json"])
-            return resume
-        return None
+        cursor.execute("SELECT * FROM resume_sources WHERE file_path = ? ORDER BY created_at DESC, id DESC LIMIT 1", (file_path,))
+        return _row_to_resume(cursor.fetchone())
+
+def get_resume_source(resume_id: int) -> Optional[Dict[str, Any]]:
+    """Get a resume source by id"""
+    with get_db_connection(readonly=True) as conn:
+        return _row_to_resume(conn.execute("SELECT * FROM resume_sources WHERE id = ?", (resume_id,)).fetchone())
+
+def get_resume_source_by_hash(content_hash: str) -> Optional[Dict[str, Any]]:
+    """Get the resume source holding this raw-text hash"""
+    with get_db_connection(readonly=True) as conn:
+        return _row_to_resume(conn.execute("SELECT * FROM resume_sources WHERE content_hash = ?", (content_hash,)).fetchone())
 
 def upsert_resume_source_by_file_path(file_path: str, raw_text: str = None, parsed_json: Dict = None) -> int:
     """Upsert a resume source by file_path (used for sticky demo resume)."""
+    content_hash = resume_content_hash(raw_text)
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM resume_sources WHERE file_path = ? ORDER BY created_at DESC LIMIT 1", (file_path,))
+        cursor.execute("SELECT id, content_hash FROM resume_sources WHERE file_path = ? ORDER BY created_at DESC, id DESC LIMIT 1", (file_path,))
         existing = cursor.fetchone()
+        if content_hash is not None:
+            cursor.execute("SELECT id FROM resume_sources WHERE content_hash = ?", (content_hash,))
+            same_text = cursor.fetchone()
+            if same_text and (not existing or same_text[0] != existing[0]):
+                # Text already stored under another row: adopt that row (and its parse)
+                if existing:
+                    cursor.execute("DELETE FROM resume_sources WHERE id = ?", (existing[0],))
+                cursor.execute("UPDATE resume_sources SET file_path = ? WHERE id = ?", (file_path, same_text[0]))
+                existing = (same_text[0], content_hash)
         parsed_json_str = json.dumps(parsed_json) if parsed_json else None
         if existing:
-            cursor.execute(
-                "UPDATE resume_sources SET raw_text = COALESCE(?, raw_text), parsed_json = ? WHERE id = ?",
-                (raw_text, parsed_json_str, existing[0]),
-            )
+            # Unchanged text keeps its parse; changed text drops the stale one
+            text_changed = content_hash is not None and content_hash != existing[1]
+            cursor.execute(f"""
+                UPDATE resume_sources SET raw_text = COALESCE(?, raw_text), content_hash = COALESCE(?, content_hash),
+                    parsed_json = CASE WHEN ? IS NOT NULL OR ? THEN ? ELSE parsed_json END
+                WHERE id = ?
+            """, (raw_text, content_hash, parsed_json_str, text_changed, parsed_json_str, existing[0]))
+            if parsed_json_str is not None or text_changed:
+                _sync_resume_bullets(cursor, existing[0], parsed_json)
             return existing[0]
         cursor.execute(
-            "INSERT INTO resume_sources (file_path, raw_text, parsed_json) VALUES (?, ?, ?)",
-            (file_path, raw_text, parsed_json_str),
+            f"INSERT INTO resume_sources (file_path, raw_text, content_hash, parsed_json, created_at) VALUES (?, ?, ?, ?, {_NOW})",
+            (file_path, raw_text, content_hash, parsed_json_str),
         )
-        return cursor.lastrowid
+        resume_id = cursor.lastrowid
+        _sync_resume_bullets(cursor, resume_id, parsed_json)
+        return resume_id
 
 def delete_resume_sources_by_file_path(file_path: str) -> int:
     """Delete resume sources matching a file_path (used for demo reset)."""
@@ -139,66 +330,102 @@ def delete_resume_sources_by_file_path(file_path: str) -> int:
         return cursor.rowcount
 
 # Resume Source Queries
+def _sync_resume_bullets(cursor, resume_id: int, parsed: Optional[Dict[str, Any]]):
+    """Replace a resume's per-bullet records (text + content hash) to match its parse"""
+    from core.incremental import bullet_records
+    cursor.execute("DELETE FROM resume_bullets WHERE resume_id = ?", (resume_id,))
+    if isinstance(parsed, dict):
+        cursor.executemany(
+            "INSERT OR REPLACE INTO resume_bullets (resume_id, section, entry_index, bullet_index, text, content_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            [(resume_id, r["section"], r["entry_index"], r["bullet_index"], r["text"], r["content_hash"]) for r in bullet_records(parsed)],
+        )
+
+def get_resume_bullets(resume_id: int) -> List[Dict[str, Any]]:
+    """Per-bullet records of a resume in resume order"""
+    with get_db_connection(readonly=True) as conn:
+        rows = conn.execute("""
+            SELECT section, entry_index, bullet_index, text, content_hash FROM resume_bullets
+            WHERE resume_id = ?
+            ORDER BY CASE section WHEN 'experience' THEN 0 ELSE 1 END, entry_index, bullet_index
+        """, (resume_id,)).fetchall()
+        return [dict(row) for row in rows]
+
 def save_resume_source(file_path: str = None, raw_text: str = None, parsed_json: Dict = None) -> int:
-    """Save a resume source"""
+    """
+    Save a resume source
+
+    Text that is already stored reuses its row: the row becomes the latest resume and keeps
+    its parse unless a new one is passed.
+    """
+    content_hash = resume_content_hash(raw_text)
     with get_db_connection() as conn:
         cursor = conn.cursor()
         parsed_json_str = json.dumps(parsed_json) if parsed_json else None
-        cursor.execute("""
-            INSERT INTO resume_sources (file_path, raw_text, parsed_json)
-            VALUES (?, ?, ?)
-        """, (file_path, raw_text, parsed_json_str))
-        return cursor.lastrowid
+        cursor.execute(f"""
+            INSERT INTO resume_sources (file_path, raw_text, content_hash, parsed_json, created_at)
+            VALUES (?, ?, ?, ?, {_NOW})
+            ON CONFLICT(content_hash) DO UPDATE SET
+                file_path = COALESCE(excluded.file_path, resume_sources.file_path),
+                parsed_json = COALESCE(excluded.parsed_json, resume_sources.parsed_json),
+                created_at = excluded.created_at
+            RETURNING id
+        """, (file_path, raw_text, content_hash, parsed_json_str))
+        resume_id = cursor.fetchone()[0]
+        if parsed_json_str is not None:
+            _sync_resume_bullets(cursor, resume_id, parsed_json)
+        return resume_id
 
 def get_latest_resume_source() -> Optional[Dict[str, Any]]:
     """Get the latest resume source"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM resume_sources ORDER BY created_at DESC, id DESC LIMIT 1")
+        return _row_to_resume(cursor.fetchone())
+
+def save_resume_parse(resume_id: int, parsed: Dict[str, Any]) -> bool:
+    """Store the parsed form of an existing resume source"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM resume_sources ORDER BY created_at DESC LIMIT 1")
-        row = cursor.fetchone()
-        if row:
-            resume = dict(row)
-            if resume.get("parsed_json"):
-                resume["parsed"] = json.loads(resume["parsed_json"])
-            return resume
-        return None
+        cursor.execute("UPDATE resume_sources SET parsed_json = ? WHERE id = ?", (json.dumps(parsed), resume_id))
+        if cursor.rowcount == 0:
+            return False
+        _sync_resume_bullets(cursor, resume_id, parsed)
+        return True
 
 # Job Analysis Queries
 def save_job_analysis(job_id: int, jd_extract: Dict = None, evidence_map: Dict = None, 
-                     score_breakdown: Dict = None, rewrite_plan: Dict = None) -> int:
-    """Save or update job analysis"""
+                     score_breakdown: Dict = None, rewrite_plan: Dict = None,
+                     resume_fingerprint: str = None) -> int:
+    """Save or update job analysis (fields passed as None keep their stored value)"""
+    jd_extract_json = json.dumps(jd_extract) if jd_extract else None
+    evidence_map_json = json.dumps(evidence_map) if evidence_map else None
+    score_breakdown_json = json.dumps(score_breakdown) if score_breakdown else None
+    rewrite_plan_json = json.dumps(rewrite_plan) if rewrite_plan else None
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        # Check if analysis exists
-        cursor.execute("SELECT id FROM job_analysis WHERE job_id = ?", (job_id,))
-        existing = cursor.fetchone()
-        
-        jd_extract_json = json.dumps(jd_extract) if jd_extract else None
-        evidence_map_json = json.dumps(evidence_map) if evidence_map else None
-        score_breakdown_json = json.dumps(score_breakdown) if score_breakdown else None
-        rewrite_plan_json = json.dumps(rewrite_plan) if rewrite_plan else None
-        
-        if existing:
-            cursor.execute("""
-                UPDATE job_analysis 
-                SET jd_extract_json = COALESCE(?, jd_extract_json),
-                    evidence_map_json = COALESCE(?, evidence_map_json),
-                    score_breakdown_json = COALESCE(?, score_breakdown_json),
-                    rewrite_plan_json = COALESCE(?, rewrite_plan_json),
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE job_id = ?
-            """, (jd_extract_json, evidence_map_json, score_breakdown_json, rewrite_plan_json, job_id))
-            return existing[0]
-        else:
-            cursor.execute("""
-                INSERT INTO job_analysis (job_id, jd_extract_json, evidence_map_json, score_breakdown_json, rewrite_plan_json)
-                VALUES (?, ?, ?, ?, ?)
-            """, (job_id, jd_extract_json, evidence_map_json, score_breakdown_json, rewrite_plan_json))
-            return cursor.lastrowid
+        # Single statement against UNIQUE(job_id): no read-then-write race, one index probe
+        cursor.execute("""
+            INSERT INTO job_analysis (job_id, jd_extract_json, evidence_map_json, score_breakdown_json, rewrite_plan_json, resume_fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET
+                jd_extract_json = COALESCE(excluded.jd_extract_json, job_analysis.jd_extract_json),
+                evidence_map_json = COALESCE(excluded.evidence_map_json, job_analysis.evidence_map_json),
+                score_breakdown_json = COALESCE(excluded.score_breakdown_json, job_analysis.score_breakdown_json),
+                rewrite_plan_json = COALESCE(excluded.rewrite_plan_json, job_analysis.rewrite_plan_json),
+                resume_fingerprint = COALESCE(excluded.resume_fingerprint, job_analysis.resume_fingerprint),
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        """, (job_id, jd_extract_json, evidence_map_json, score_breakdown_json, rewrite_plan_json, resume_fingerprint))
+        analysis_id = cursor.fetchone()[0]
+        if jd_extract_json:
+            # Cached bullet contributions were computed against the previous JD
+            cursor.execute("DELETE FROM job_bullet_scores WHERE job_id = ?", (job_id,))
+        return analysis_id
 
 def get_job_analysis(job_id: int) -> Optional[Dict[str, Any]]:
     """Get job analysis"""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM job_analysis WHERE job_id = ?", (job_id,))
         row = cursor.fetchone()
@@ -211,56 +438,129 @@ def get_job_analysis(job_id: int) -> Optional[Dict[str, Any]]:
         return None
 
 # Job Assets Queries
-def save_job_assets(job_id: int, resume_versions: List[Dict] = None, 
-                   cover_letter_versions: List[Dict] = None,
-                   roadmap: Dict = None, interview_pack: Dict = None) -> int:
-    """Save or update job assets"""
+def get_bullet_contributions(job_id: int) -> Dict[str, Dict[str, Any]]:
+    """Cached per-bullet score contributions for a job, keyed by bullet content hash"""
+    with get_db_connection(readonly=True) as conn:
+        rows = conn.execute("SELECT content_hash, contribution_json FROM job_bullet_scores WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+def save_bullet_contributions(job_id: int, contributions: Dict[str, Dict[str, Any]]):
+    """Cache per-bullet score contributions for a job"""
+    if not contributions:
+        return
+    with get_db_connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO job_bullet_scores (job_id, content_hash, contribution_json) VALUES (?, ?, ?)",
+            [(job_id, content_hash, json.dumps(c)) for content_hash, c in contributions.items()],
+        )
+
+def save_job_assets(job_id: int, roadmap: Dict = None, interview_pack: Dict = None) -> int:
+    """Save or update job assets (resume / cover letter versions live in their own tables)"""
+    roadmap_json = json.dumps(roadmap) if roadmap else None
+    interview_pack_json = json.dumps(interview_pack) if interview_pack else None
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM job_assets WHERE job_id = ?", (job_id,))
-        existing = cursor.fetchone()
-        
-        resume_versions_json = json.dumps(resume_versions) if resume_versions else None
-        cover_letter_versions_json = json.dumps(cover_letter_versions) if cover_letter_versions else None
-        roadmap_json = json.dumps(roadmap) if roadmap else None
-        interview_pack_json = json.dumps(interview_pack) if interview_pack else None
-        
-        if existing:
-            cursor.execute("""
-                UPDATE job_assets 
-                SET resume_versions_json = COALESCE(?, resume_versions_json),
-                    cover_letter_versions_json = COALESCE(?, cover_letter_versions_json),
-                    roadmap_json = COALESCE(?, roadmap_json),
-                    interview_pack_json = COALESCE(?, interview_pack_json),
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE job_id = ?
-            """, (resume_versions_json, cover_letter_versions_json, roadmap_json, interview_pack_json, job_id))
-            return existing[0]
-        else:
-            cursor.execute("""
-                INSERT INTO job_assets (job_id, resume_versions_json, cover_letter_versions_json, roadmap_json, interview_pack_json)
-                VALUES (?, ?, ?, ?, ?)
-            """, (job_id, resume_versions_json, cover_letter_versions_json, roadmap_json, interview_pack_json))
-            return cursor.lastrowid
+        cursor.execute("""
+            INSERT INTO job_assets (job_id, roadmap_json, interview_pack_json)
+            VALUES (?, ?, ?)
+            ON CONFLICT(job_id) DO UPDATE SET
+                roadmap_json = COALESCE(excluded.roadmap_json, job_assets.roadmap_json),
+                interview_pack_json = COALESCE(excluded.interview_pack_json, job_assets.interview_pack_json),
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        """, (job_id, roadmap_json, interview_pack_json))
+        return cursor.fetchone()[0]
 
 def get_job_assets(job_id: int) -> Optional[Dict[str, Any]]:
-    """Get job assets"""
-    with get_db_connection() as conn:
+    """Get job assets (roadmap, interview pack)"""
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM job_assets WHERE job_id = ?", (job_id,))
+        cursor.execute("SELECT id, job_id, roadmap_json, interview_pack_json, updated_at FROM job_assets WHERE job_id = ?", (job_id,))
         row = cursor.fetchone()
         if row:
             assets = dict(row)
-            for key in ["resume_versions_json", "cover_letter_versions_json", "roadmap_json", "interview_pack_json"]:
+            for key in ["roadmap_json", "interview_pack_json"]:
                 if assets.get(key):
                     assets[key.replace("_json", "")] = json.loads(assets[key])
             return assets
         return None
 
+# Resume / Cover Letter Version Queries
+def _row_to_resume_version(row) -> Dict[str, Any]:
+    version = json.loads(row["version_json"])
+    version["id"] = row["id"]
+    version["created_at"] = version.get("created_at") or row["created_at"]
+    return version
+
+def add_resume_version(job_id: int, version: Dict[str, Any]) -> int:
+    """Append a resume version (dict with label, parsed, ...) for a job"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO resume_versions (job_id, label, version_json) VALUES (?, ?, ?)",
+            (job_id, version.get("label"), json.dumps(version)),
+        )
+        return cursor.lastrowid
+
+def get_resume_versions(job_id: int) -> List[Dict[str, Any]]:
+    """All resume versions for a job, oldest first"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, version_json, created_at FROM resume_versions WHERE job_id = ? ORDER BY created_at, id",
+            (job_id,),
+        )
+        return [_row_to_resume_version(row) for row in cursor.fetchall()]
+
+def get_latest_resume_version(job_id: int) -> Optional[Dict[str, Any]]:
+    """Most recent resume version for a job (single indexed row)"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, version_json, created_at FROM resume_versions WHERE job_id = ? "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (job_id,),
+        )
+        row = cursor.fetchone()
+        return _row_to_resume_version(row) if row else None
+
+def add_cover_letter_version(job_id: int, text: str, tone: str = None) -> int:
+    """Append a cover letter version for a job"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO cover_letter_versions (job_id, tone, text) VALUES (?, ?, ?)",
+            (job_id, tone, text),
+        )
+        return cursor.lastrowid
+
+def get_cover_letter_versions(job_id: int) -> List[Dict[str, Any]]:
+    """All cover letter versions for a job, oldest first"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, text, tone, created_at FROM cover_letter_versions WHERE job_id = ? ORDER BY created_at, id",
+            (job_id,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+def get_latest_cover_letter_version(job_id: int) -> Optional[Dict[str, Any]]:
+    """Most recent cover letter version for a job (single indexed row)"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, text, tone, created_at FROM cover_letter_versions WHERE job_id = ? "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (job_id,),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
 # Settings Queries
 def get_setting(key: str, default: Any = None) -> Any:
     """Get an app setting"""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
         row = cursor.fetchone()
@@ -0,0 +1,67 @@
+"""
+Resume parse service - parse each distinct resume text at most once
+
+resume_sources rows are unique per SHA-256 of their raw text, so a parse stored on a row
+serves every upload of that text. ensure_parsed fills the parse in on first use; concurrent
+callers for the same text share one LLM call (single-flight keyed by the hash).
+"""
+import json
+from typing import Dict, Any, Optional
+from storage import queries
+from storage.singleflight import single_flight
+from ai.provider import AsyncAIProvider
+from core.resume_parser import parse_resume_async
+
+DEMO_RESUME_FILE_PATH = "__demo_resume__"
+
+def _has_parse(resume: Dict[str, Any]) -> bool:
+    return isinstance(resume.get("parsed"), dict) and bool(resume["parsed"])
+
+def is_demo_job(job: Optional[Dict[str, Any]]) -> bool:
+    """Demo jobs use the sticky demo resume instead of the latest upload"""
+    if not job:
+        return False
+    return bool((job.get("tags") and "demo" in job.get("tags", [])) or ("[Demo]" in str(job.get("title", ""))))
+
+def resume_for_job(job: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Resume source to use for a job: the demo resume for demo jobs, otherwise the latest upload"""
+    if is_demo_job(job):
+        return queries.get_resume_source_by_file_path(DEMO_RESUME_FILE_PATH)
+    return queries.get_latest_resume_source()
+
+async def ensure_parsed(resume: Dict[str, Any], ai_provider: AsyncAIProvider) -> Dict[str, Any]:
+    """
+    Resume source with its parse, parsing (and persisting the parse) on first use
+
+    Args:
+        resume: resume_sources row (as returned by queries)
+        ai_provider: Async AI provider
+
+    Returns:
+        The resume dict with "parsed" filled in
+
+    Raises:
+        ValueError: The resume has no usable parse and no raw text to parse
+    """
+    if _has_parse(resume):
+        return resume
+    raw_text = resume.get("raw_text") or ""
+    if not raw_text.strip():
+        raise ValueError("Resume text missing")
+    content_hash = resume.get("content_hash") or queries.resume_content_hash(raw_text)
+
+    async def _parse():
+        # Another caller (or worker) may have stored this text's parse since the row was read
+        stored = queries.get_resume_source_by_hash(content_hash)
+        if stored and _has_parse(stored):
+            return stored["parsed"]
+        parsed = await parse_resume_async(raw_text, ai_provider)
+        resume_id = (stored or resume).get("id")
+        if resume_id:
+            queries.save_resume_parse(resume_id, parsed)
+        else:
+            queries.save_resume_source(raw_text=raw_text, parsed_json=parsed)
+        return parsed
+
+    parsed = await single_flight(f"resume:parse:{content_hash}", _parse)
+    return {**resume, "parsed": parsed, "parsed_json": json.dumps(parsed)}
@@ -0,0 +1,141 @@
+"""
+Single-flight request coalescing
+
+Concurrent identical requests (same key) share one in-flight computation. Within a
+worker, followers simply await the leader's task. Across uvicorn workers, a lease row
+in SQLite elects one leader; when it finishes it stores its JSON-serialized result on the
+lease row, and followers on other workers that were waiting for that lease return it
+instead of computing again. If the leader fails (or its result is not JSON), followers
+race for a new lease and compute themselves.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from storage.db import get_db_connection
+
+LEASE_TTL_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.5
+# How long a finished lease keeps its result for followers still polling
+RESULT_TTL_SECONDS = 30
+
+_OWNER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+_inflight: Dict[str, "asyncio.Task"] = {}
+
+def try_acquire_lease(key: str, ttl_seconds: float = LEASE_TTL_SECONDS,
+                      waiting_for: Optional[str] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Take the cross-worker lease for key
+
+    Args:
+        key: Work identity
+        ttl_seconds: Lease TTL
+        waiting_for: Token of the lease this caller has been waiting on; its finished row is
+                     kept (and returned) so the caller can read the result. Any other finished
+                     row predates the caller and is replaced.
+
+    Returns:
+        (acquired, lease row {"token", "done", "result"}); the row is ours when acquired
+    """
+    now = time.time()
+    token = uuid.uuid4().hex
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM request_leases WHERE key = ? AND (expires_at < ? OR (done = 1 AND token IS NOT ?))",
+            (key, now, waiting_for),
+        )
+        cursor.execute(
+            "INSERT OR IGNORE INTO request_leases (key, owner, token, expires_at) VALUES (?, ?, ?, ?)",
+            (key, _OWNER_ID, token, now + ttl_seconds),
+        )
+        acquired = cursor.rowcount == 1
+        row = cursor.execute("SELECT token, done, result FROM request_leases WHERE key = ?", (key,)).fetchone()
+    return acquired, (dict(row) if row else None)
+
+def renew_lease(key: str, ttl_seconds: float = LEASE_TTL_SECONDS) -> bool:
+    """Extend a lease we own (heartbeat for long computations)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE request_leases SET expires_at = ? WHERE key = ? AND owner = ? AND done = 0",
+            (time.time() + ttl_seconds, key, _OWNER_ID),
+        )
+        return cursor.rowcount > 0
+
+def release_lease(key: str):
+    """Release a lease we own without a result (followers compute themselves)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM request_leases WHERE key = ? AND owner = ? AND done = 0", (key, _OWNER_ID))
+
+def finish_lease(key: str, token: str, result: Any):
+    """Hand a lease's result to its followers (stored for RESULT_TTL_SECONDS)"""
+    try:
+        payload = json.dumps(result)
+    except (TypeError, ValueError):
+        release_lease(key)
+        return
+    with get_db_connection() as conn:
+        conn.execute(
+            "UPDATE request_leases SET done = 1, result = ?, expires_at = ? WHERE key = ? AND token = ?",
+            (payload, time.time() + RESULT_TTL_SECONDS, key, token),
+        )
+
+async def _heartbeat(key: str, ttl_seconds: float):
+    while True:
+        await asyncio.sleep(ttl_seconds / 3)
+        await asyncio.to_thread(renew_lease, key, ttl_seconds)
+
+async def _run_with_lease(key: str, compute: Callable[[], Awaitable[Any]], ttl_seconds: float) -> Any:
+    waiting_for = None
+    while True:
+        acquired, lease = await asyncio.to_thread(try_acquire_lease, key, ttl_seconds, waiting_for)
+        if acquired:
+            break
+        if lease is not None:
+            if lease["done"] and lease["token"] == waiting_for:
+                return json.loads(lease["result"])
+            # Follow the run in progress (a new one if the lease we waited for failed)
+            waiting_for = lease["token"]
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+    heartbeat = asyncio.create_task(_heartbeat(key, ttl_seconds))
+    try:
+        result = await compute()
+    except BaseException:
+        heartbeat.cancel()
+        await asyncio.to_thread(release_lease, key)
+        raise
+    heartbeat.cancel()
+    await asyncio.to_thread(finish_lease, key, lease["token"], result)
+    return result
+
+def _forget(key: str, task: "asyncio.Task"):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception as retrieved even if every waiter went away.
+    if not task.cancelled():
+        task.exception()
+
+async def single_flight(key: str, compute: Callable[[], Awaitable[Any]],
+                        lease_ttl_seconds: float = LEASE_TTL_SECONDS) -> Any:
+    """
+    Run compute() once for all concurrent callers with the same key
+    
+    Args:
+        key: Identity of the work (e.g. "analysis:score:12")
+        compute: Zero-argument coroutine factory producing the result
+        lease_ttl_seconds: Cross-worker lease TTL (renewed while computing)
+    
+    Returns:
+        The shared result; exceptions propagate to every caller
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_with_lease(key, compute, lease_ttl_seconds))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget(key, t))
+    # Shield so one disconnecting client does not cancel the work for everyone else.
+    return await asyncio.shield(task)
@@ -0,0 +1,271 @@
+"""
+Background task queue - persistent SQLite-backed queue with an asyncio worker pool
+
+Long-running LLM work (analysis, optimize, roadmap, cover letter) is submitted as a
+task row and picked up by a bounded pool of workers, so API requests return a task id
+immediately and the work survives client disconnects. Handlers are registered per
+task kind by the API layer and report per-stage progress that clients can follow.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+from storage.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUSES = ("queued", "running", "succeeded", "failed")
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Workers touch a running task's updated_at this often, even inside one long stage
+TASK_HEARTBEAT_SECONDS = int(os.getenv("TASK_HEARTBEAT_SECONDS", "30"))
+# A running task whose row has not been touched for this long is assumed orphaned
+# (worker crashed / process restarted) and is put back in the queue.
+STALE_TASK_SECONDS = int(os.getenv("STALE_TASK_SECONDS", str(TASK_HEARTBEAT_SECONDS * 4)))
+# How often each pool looks for orphaned tasks
+REQUEUE_INTERVAL_SECONDS = int(os.getenv("TASK_REQUEUE_INTERVAL_SECONDS", "60"))
+MAX_ATTEMPTS = 3
+
+ProgressReporter = Callable[[str], Awaitable[None]]
+TaskHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Any]]
+
+_handlers: Dict[str, TaskHandler] = {}
+
+def register_task_handler(kind: str, handler: TaskHandler):
+    """Register the coroutine that executes tasks of this kind"""
+    _handlers[kind] = handler
+
+def get_task_kinds() -> List[str]:
+    """Task kinds that currently have a handler"""
+    return sorted(_handlers)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+def _row_to_task(row) -> Dict[str, Any]:
+    task = dict(row)
+    for key in ["params_json", "progress_json", "result_json"]:
+        value = task.pop(key, None)
+        task[key.replace("_json", "")] = json.loads(value) if value else None
+    task["progress"] = task.get("progress") or []
+    task["params"] = task.get("params") or {}
+    return task
+
+# Task Queries
+def create_task(kind: str, job_id: int = None, params: Dict[str, Any] = None) -> str:
+    """Enqueue a task and return its id"""
+    task_id = uuid.uuid4().hex
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO tasks (id, kind, job_id, params_json, status, progress_json)
+            VALUES (?, ?, ?, ?, 'queued', '[]')
+        """, (task_id, kind, job_id, json.dumps(params or {})))
+    return task_id
+
+def get_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """Get a task by id"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+        row = cursor.fetchone()
+        return _row_to_task(row) if row else None
+
+def get_tasks_for_job(job_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent tasks for a job"""
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM tasks WHERE job_id = ? ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (job_id, limit),
+        )
+        return [_row_to_task(row) for row in cursor.fetchall()]
+
+def claim_next_task(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Atomically move the oldest queued task to running and return it"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # BEGIN IMMEDIATE takes the write lock up front so two workers cannot claim the same row.
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("SELECT id FROM tasks WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1")
+        row = cursor.fetchone()
+        if not row:
+            return None
+        cursor.execute("""
+            UPDATE tasks
+            SET status = 'running', worker = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+        """, (worker_id, row[0]))
+        if cursor.rowcount != 1:
+            return None
+        cursor.execute("SELECT * FROM tasks WHERE id = ?", (row[0],))
+        return _row_to_task(cursor.fetchone())
+
+def record_task_stage(task_id: str, stage: str):
+    """Mark the previous stage done and start a new one"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT progress_json FROM tasks WHERE id = ?", (task_id,))
+        row = cursor.fetchone()
+        if not row:
+            return
+        progress = json.loads(row[0]) if row[0] else []
+        now = _now()
+        for entry in progress:
+            if entry.get("status") == "running":
+                entry["status"] = "done"
+                entry["finished_at"] = now
+        progress.append({"stage": stage, "status": "running", "started_at": now})
+        cursor.execute("""
+            UPDATE tasks SET stage = ?, progress_json = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+        """, (stage, json.dumps(progress), task_id))
+
+def heartbeat_task(task_id: str):
+    """Touch a running task so requeue_stale_tasks leaves it alone"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE tasks SET updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'running'", (task_id,))
+
+def finish_task(task_id: str, result: Any = None, error: str = None):
+    """Mark a task succeeded (with result) or failed (with error)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT progress_json FROM tasks WHERE id = ?", (task_id,))
+        row = cursor.fetchone()
+        progress = json.loads(row[0]) if row and row[0] else []
+        now = _now()
+        for entry in progress:
+            if entry.get("status") == "running":
+                entry["status"] = "failed" if error else "done"
+                entry["finished_at"] = now
+        cursor.execute("""
+            UPDATE tasks
+            SET status = ?, result_json = ?, error = ?, progress_json = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, ("failed" if error else "succeeded", json.dumps(result) if result is not None else None,
+              error, json.dumps(progress), task_id))
+
+def requeue_stale_tasks(stale_after_seconds: int = STALE_TASK_SECONDS) -> int:
+    """Put orphaned running tasks back in the queue (or fail them after MAX_ATTEMPTS)"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cutoff = f"-{int(stale_after_seconds)} seconds"
+        cursor.execute("""
+            UPDATE tasks SET status = 'failed', error = 'Task abandoned after repeated worker failures',
+                             updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running' AND updated_at < datetime('now', ?) AND attempts >= ?
+        """, (cutoff, MAX_ATTEMPTS))
+        cursor.execute("""
+            UPDATE tasks SET status = 'queued', worker = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running' AND updated_at < datetime('now', ?)
+        """, (cutoff,))
+        return cursor.rowcount
+
+class TaskWorkerPool:
+    """Fixed-size pool of asyncio workers draining the tasks table"""
+
+    def __init__(self, concurrency: int = 2, poll_interval: float = 1.0):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._requeuer: Optional[asyncio.Task] = None
+        self._running = False
+        self.active = 0
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        await asyncio.to_thread(requeue_stale_tasks)
+        self._workers = [
+            asyncio.create_task(self._worker_loop(f"{self.worker_prefix}-{i}"))
+            for i in range(self.concurrency)
+        ]
+        self._requeuer = asyncio.create_task(self._requeue_loop())
+
+    async def stop(self):
+        self._running = False
+        background = self._workers + ([self._requeuer] if self._requeuer else [])
+        for worker in background:
+            worker.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        self._workers = []
+        self._requeuer = None
+
+    def notify(self):
+        """Wake idle workers (called right after a task is submitted)"""
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "active": self.active, "kinds": get_task_kinds()}
+
+    async def _requeue_loop(self):
+        """Periodically recover tasks orphaned by a crashed worker (in this or another process)"""
+        while self._running:
+            await asyncio.sleep(REQUEUE_INTERVAL_SECONDS)
+            try:
+                if await asyncio.to_thread(requeue_stale_tasks):
+                    self.notify()
+            except Exception:
+                logger.exception("Requeueing stale tasks failed")
+
+    async def _heartbeat(self, task_id: str):
+        while True:
+            await asyncio.sleep(TASK_HEARTBEAT_SECONDS)
+            try:
+                await asyncio.to_thread(heartbeat_task, task_id)
+            except Exception:
+                logger.exception("Heartbeat for task %s failed", task_id)
+
+    async def _worker_loop(self, worker_id: str):
+        while self._running:
+            task = await asyncio.to_thread(claim_next_task, worker_id)
+            if task is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.active += 1
+            try:
+                await self._execute(task)
+            finally:
+                self.active -= 1
+
+    async def _execute(self, task: Dict[str, Any]):
+        handler = _handlers.get(task["kind"])
+        if handler is None:
+            await asyncio.to_thread(finish_task, task["id"], None, f"No handler for task kind '{task['kind']}'")
+            return
+
+        async def report(stage: str):
+            await asyncio.to_thread(record_task_stage, task["id"], stage)
+
+        heartbeat = asyncio.create_task(self._heartbeat(task["id"]))
+        try:
+            result = await handler(task, report)
+            await asyncio.to_thread(finish_task, task["id"], result, None)
+        except asyncio.CancelledError:
+            # Shutdown mid-task: leave it running so requeue_stale_tasks picks it up later.
+            raise
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+            logger.exception("Task %s (%s) failed: %s", task["id"], task["kind"], detail)
+            await asyncio.to_thread(finish_task, task["id"], None, str(detail))
+        finally:
+            heartbeat.cancel()
+
+_pool: Optional[TaskWorkerPool] = None
+
+def get_task_pool() -> TaskWorkerPool:
+    """Process-wide worker pool (size from TASK_WORKER_CONCURRENCY)"""
+    global _pool
+    if _pool is None:
+        _pool = TaskWorkerPool(concurrency=int(os.getenv("TASK_WORKER_CONCURRENCY", "2")))
+    return _pool
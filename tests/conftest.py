@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+# storage.db reads DATABASE_PATH at import: keep test runs away from the real database
+_tmp = tempfile.mkdtemp(prefix="path_to_offer_tests_")
+os.environ.setdefault("DATABASE_PATH", os.path.join(_tmp, "test.db"))
+os.environ.setdefault("VECTOR_INDEX_DIR", os.path.join(_tmp, "vector_index"))
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, fully initialized database for one test"""
+    from storage import db as storage_db
+    monkeypatch.setattr(storage_db, "DB_PATH", str(tmp_path / "test.db"))
+    storage_db.init_database()
+    yield storage_db
+    storage_db.close_connection_pool()
@@ -0,0 +1,27 @@
+import threading
+from storage.db import ConnectionPool
+
+
+def test_stats_count_every_checkout_across_threads(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_readers=2)
+    per_thread = 200
+
+    def work():
+        for i in range(per_thread):
+            with pool.reader() as conn:
+                conn.execute("SELECT 1")
+            if i % 20 == 0:
+                with pool.writer() as conn:
+                    conn.execute("CREATE TABLE IF NOT EXISTS t (x)")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    pool.close()
+
+    assert stats["reader_acquires"] == 8 * per_thread
+    assert stats["writer_acquires"] == 8 * (per_thread // 20)
+    assert stats["connections_opened"] == stats["readers_open"] + 1 == 3
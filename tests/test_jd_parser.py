@@ -0,0 +1,27 @@
+from core.jd_parser import prepass_jd, _unmatched_terms
+
+
+def _jd(*requirements):
+    return "Senior Data Engineer\n\nResponsibilities:\n- Build streaming pipelines\n\nRequirements:\n" + \
+        "\n".join(f"- {r}" for r in requirements)
+
+
+def test_partially_matched_requirement_is_a_gap():
+    prepass = prepass_jd(_jd("5+ years of Python", "Strong Kafka and Flink streaming background", "Experience with SQL"))
+
+    assert "Kafka" in prepass.extract["must_have_skills"]
+    assert "must_have_skills" in prepass.gaps
+    assert "Flink" in prepass.llm_text
+
+
+def test_fully_matched_requirements_need_no_llm():
+    prepass = prepass_jd(_jd("5+ years of Python and AWS", "Proficiency in Go, Docker and Kubernetes",
+                             "Bachelor's degree in Computer Science"))
+
+    assert "must_have_skills" not in prepass.gaps
+
+
+def test_unmatched_terms_look_like_technology_names():
+    assert _unmatched_terms("Strong Kafka and Flink streaming background") == ["Flink"]
+    assert _unmatched_terms("Experience with PySpark") == ["PySpark"]
+    assert _unmatched_terms("Excellent communication skills. Team player") == []
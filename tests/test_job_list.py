@@ -0,0 +1,48 @@
+import pytest
+from storage import queries
+
+def _pages(limit, **filters):
+    jobs, cursor = [], None
+    while True:
+        page = queries.list_jobs(limit=limit, cursor=cursor, **filters)
+        jobs.extend(page["jobs"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return jobs
+
+@pytest.fixture
+def jobs(db):
+    # Created within the same second: most share updated_at, so id breaks the ties
+    ids = [queries.create_job(f"Job {i}", "Acme", status="Applied" if i % 2 else "Saved",
+                              tags=["remote"] if i % 3 == 0 else None) for i in range(10)]
+    with db.get_db_connection() as conn:
+        conn.execute("UPDATE jobs SET updated_at = '2030-01-01 00:00:00' WHERE id = ?", (ids[4],))
+    return ids
+
+def test_list_cursor_round_trip_matches_one_page(jobs):
+    everything = queries.list_jobs(limit=None)["jobs"]
+    assert everything[0]["id"] == jobs[4]
+    for limit in (1, 3, 4, 10):
+        assert [j["id"] for j in _pages(limit)] == [j["id"] for j in everything]
+
+def test_last_page_has_no_cursor(jobs):
+    assert queries.list_jobs(limit=10)["next_cursor"] is None
+    assert queries.list_jobs(limit=9)["next_cursor"] is not None
+
+@pytest.mark.parametrize("filters", [{"status": "Applied"}, {"tag": "remote"}, {"status": "Saved", "tag": "remote"}])
+def test_filtered_paging(jobs, filters):
+    expected = [j["id"] for j in queries.list_jobs(limit=None, **filters)["jobs"]]
+    assert expected
+    assert [j["id"] for j in _pages(2, **filters)] == expected
+    assert queries.count_jobs(**filters) == len(expected)
+
+def test_projection(jobs):
+    page = queries.list_jobs(limit=2, fields=["title", "tags"])
+    assert set(page["jobs"][0]) == {"id", "title", "tags"}
+    assert [j["id"] for j in _pages(2)][2:4] == [j["id"] for j in queries.list_jobs(limit=2, cursor=page["next_cursor"])["jobs"]]
+    with pytest.raises(ValueError):
+        queries.list_jobs(fields=["jd_text"])
+
+def test_rejects_malformed_cursor(jobs):
+    with pytest.raises(ValueError):
+        queries.list_jobs(cursor="%%%")
@@ -0,0 +1,51 @@
+import pytest
+from storage import queries
+
+def _pages(fetch, limit):
+    jobs, cursor, pages = [], None, 0
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        jobs.extend(page["jobs"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return jobs, pages
+
+@pytest.fixture
+def jobs(db):
+    ids = [
+        queries.create_job("Python Engineer", "Acme", jd_text="Python services", tags=["python"]),
+        queries.create_job("Data Analyst", "Python Labs", jd_text="SQL dashboards"),
+        queries.create_job("Backend Developer", "Initech", jd_text="Build Python and Go APIs with Python tooling"),
+        queries.create_job("Frontend Developer", "Globex", jd_text="React"),
+        queries.create_job("Platform Engineer", "Umbrella", jd_text="Kubernetes, some Python scripting"),
+        queries.create_job("ML Engineer", "Hooli", jd_text="Train models in Python", tags=["ml", "python"]),
+    ]
+    # Identical JDs rank equally: paging must break the tie by id
+    ids += [queries.create_job("Python Developer", "Same Co", jd_text="Python") for _ in range(3)]
+    return ids
+
+def test_search_cursor_round_trip_matches_one_page(jobs):
+    everything = queries.search_jobs("python", limit=100)
+    assert everything["next_cursor"] is None
+    paged, pages = _pages(lambda **kw: queries.search_jobs("python", **kw), limit=2)
+    assert [j["id"] for j in paged] == [j["id"] for j in everything["jobs"]]
+    assert pages == (len(paged) + 1) // 2
+    assert len(paged) == len(set(j["id"] for j in paged)) == 8
+    scores = [j["score"] for j in paged]
+    assert scores == sorted(scores)
+
+def test_search_snippets_and_prefix_match(jobs):
+    result = queries.search_jobs("kube")
+    assert [j["title"] for j in result["jobs"]] == ["Platform Engineer"]
+    assert "<mark>" in result["jobs"][0]["snippet"]
+
+def test_search_operators_are_plain_text(jobs):
+    assert queries.search_jobs('python OR "')["jobs"] == []
+    assert queries.search_jobs("   ") == {"jobs": [], "next_cursor": None}
+
+def test_search_rejects_foreign_cursor(jobs):
+    with pytest.raises(ValueError):
+        queries.search_jobs("python", cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        queries.search_jobs("python", cursor=queries.encode_cursor(1, 2, 3))
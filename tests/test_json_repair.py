@@ -0,0 +1,44 @@
+import pytest
+from ai.json_repair import decode_json, JSONRepairError
+from ai.prompts import extract_jd_call, json_decoder
+from core.schemas import JDExtract
+
+def test_complete_value_inside_prose():
+    assert decode_json('Here you go:\n```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+
+def test_truncated_value_is_cut_back_to_last_complete_member():
+    assert decode_json('{"a": 1, "b": "two", "c": "thr') == {"a": 1, "b": "two"}
+    assert decode_json('{"a": [1, 2], "b": [') == {"a": [1, 2]}
+    assert decode_json('[{"a":1},{"b":', expect="array") == [{"a": 1}]
+
+@pytest.mark.parametrize("text", [
+    '{"a": "hel',
+    '{"a": tru',
+    '{"a": {"b": "x',
+    '[',
+    '{"a":',
+])
+def test_truncation_with_nothing_complete_raises(text):
+    with pytest.raises(JSONRepairError):
+        decode_json(text)
+
+def test_no_repairs_allowed():
+    with pytest.raises(JSONRepairError):
+        decode_json('{"a": 1, "b": 2', max_repairs=0)
+    assert decode_json('{"a": 1}', max_repairs=0) == {"a": 1}
+
+def test_repair_must_match_schema():
+    decode = json_decoder(error_message="bad", schema=JDExtract)
+    with pytest.raises(Exception, match="bad"):
+        decode('{"role_title": "Engineer", "must_have_skills": ["Go", "Rust"], "seniority": "sen')
+    assert decode('{"role_title": "Engineer", "seniority": "senior", "keywords": ["a", "b')["seniority"] == "senior"
+
+def test_truncated_extraction_raises():
+    call = extract_jd_call("Backend engineer")
+    with pytest.raises(Exception):
+        call.decode('{"role_title": "Backend Eng')
+    with pytest.raises(Exception):
+        call.decode_reply('{"role_title": "Backend Eng')
+
+def test_fallback_used_when_repair_fails():
+    assert json_decoder(fallback=list, expect="array")('[{"a": "x') == []
@@ -0,0 +1,88 @@
+import pytest
+from core.evidence_mapper import build_local_evidence_map
+from core.keyword_matcher import SkillMatcher
+from core.skill_taxonomy import get_skill_taxonomy
+
+AMBIGUOUS = ["Go", "C", "R", "Node.js", "React", "Express"]
+
+@pytest.mark.parametrize("text", [
+    "Helped customers react quickly and go to market",
+    "Built plan C for express delivery",
+    "Used r and node graph theory",
+    "Advised the C-suite on R&D spending",
+    "Earned a grade C in vitamin C chemistry",
+])
+def test_plain_english_is_not_skill_evidence(text):
+    assert SkillMatcher(AMBIGUOUS).match(text) == set()
+    assert get_skill_taxonomy().find(text) == []
+
+def test_evidence_map_ignores_plain_english():
+    jd = {"must_have_skills": AMBIGUOUS}
+    resume = {"experience": [{"role": "Account Manager", "company": "Acme", "bullets": [
+        "Helped customers react quickly and go to market",
+        "Built plan C for express delivery",
+        "Used r and node graph theory",
+    ]}]}
+    evidence_map = build_local_evidence_map(jd, resume)
+    assert evidence_map["evidence"] == {}
+    assert evidence_map["missing"] == AMBIGUOUS
+
+@pytest.mark.parametrize("text, expected", [
+    ("Built services in Go and C", {"Go", "C"}),
+    ("Wrote R scripts for churn analysis", {"R"}),
+    ("Shipped a React app backed by Node and Express", {"React", "Node.js", "Express"}),
+    ("Ported golang and nodejs tools", {"Go", "Node.js"}),
+    ("Languages: C, C++, R", {"C", "R"}),
+])
+def test_exact_spellings_still_match(text, expected):
+    assert SkillMatcher(AMBIGUOUS).match(text) == expected
+
+def test_other_skills_stay_case_insensitive():
+    assert SkillMatcher(["Python", "Kubernetes"]).match("python services on k8s") == {"Python", "Kubernetes"}
+
+def test_taxonomy_binary_round_trip_keeps_exact_aliases():
+    taxonomy = get_skill_taxonomy()
+    loaded, digest = type(taxonomy).from_bytes(taxonomy.to_bytes(b"\0" * 32))
+    assert loaded.find("Used node and Node") == ["Node.js"]
+    assert not loaded.is_mention("node", 0, 4)
+    assert loaded.skill_id("node") == taxonomy.skill_id("Node.js")
+
+def test_sub_skills_are_inferred_not_cited():
+    jd = {"must_have_skills": ["JavaScript", "SQL"]}
+    resume = {"experience": [{"role": "Engineer", "company": "Acme", "bullets": [
+        "Built a React dashboard on PostgreSQL",
+        "Helped customers react quickly with express delivery",
+    ]}]}
+    evidence_map = build_local_evidence_map(jd, resume)
+    assert evidence_map["evidence"] == {}
+    assert evidence_map["inferred"] == {"JavaScript": ["React"], "SQL": ["PostgreSQL"]}
+    assert evidence_map["missing"] == ["JavaScript", "SQL"]
+
+def test_direct_citation_drops_inferred_credit():
+    jd = {"must_have_skills": ["JavaScript"]}
+    resume = {"experience": [{"role": "Engineer", "company": "Acme",
+                              "bullets": ["Built a React app in JavaScript"]}]}
+    evidence_map = build_local_evidence_map(jd, resume)
+    assert list(evidence_map["evidence"]) == ["JavaScript"]
+    assert evidence_map["inferred"] == {}
+
+def test_matcher_separates_direct_and_inferred_hits():
+    matcher = SkillMatcher(["SQL"])
+    assert matcher.match("Tuned Postgres queries") == set()
+    assert [(kw, sub) for _, _, kw, sub in matcher.iter_inferred("Tuned Postgres queries")] == [("SQL", "PostgreSQL")]
+
+def test_inferred_keywords_get_partial_coverage():
+    from core.scorer import _keyword_coverage
+    jd = {"must_have_skills": ["SQL", "Python"]}
+    none = _keyword_coverage(jd, {})
+    inferred = _keyword_coverage(jd, {}, {"SQL": ["PostgreSQL"]})
+    cited = _keyword_coverage(jd, {"SQL": [{"section": "skills", "index": 0}]})
+    assert none["score"] < inferred["score"] < cited["score"]
+    assert inferred["details"]["must_have_inferred"] == {"SQL": ["PostgreSQL"]}
+
+def test_compiled_binary_goes_to_the_given_path(tmp_path):
+    from core.skill_taxonomy import SKILL_TAXONOMY_SOURCE, load_taxonomy
+    binary = tmp_path / "cache" / "taxonomy.bin"
+    taxonomy = load_taxonomy(SKILL_TAXONOMY_SOURCE, str(binary))
+    assert binary.exists()
+    assert load_taxonomy(SKILL_TAXONOMY_SOURCE, str(binary)).names == taxonomy.names
@@ -0,0 +1,82 @@
+import time
+import pytest
+from ai.cache import LLMResponseCache
+from ai.prompts import LLMCall, json_decoder
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=60, max_entries=3)
+
+def test_get_returns_stored_response(cache):
+    cache.set("k", "extract_jd", "m", '{"a": 1}')
+    assert cache.get("k") == '{"a": 1}'
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_expired_entry_is_dropped_on_read(cache, monkeypatch):
+    cache.set("k", "extract_jd", "m", "reply")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+def test_set_purges_expired_entries(cache, monkeypatch):
+    cache.set("old", "extract_jd", "m", "reply")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    cache.set("new", "extract_jd", "m", "reply")
+    assert cache.stats()["entries"] == 1
+    assert cache.get("new") == "reply"
+
+def test_least_recently_used_entry_is_evicted(cache, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    for key in ("a", "b", "c"):
+        cache.set(key, "extract_jd", "m", key)
+        clock[0] += 1
+    assert cache.get("a") == "a"  # "b" is now the least recently used
+    clock[0] += 1
+    cache.set("d", "extract_jd", "m", "d")
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+
+def test_delete_and_clear(cache):
+    cache.set("a", "extract_jd", "m", "a")
+    cache.set("b", "extract_jd", "m", "b")
+    cache.delete("a")
+    assert cache.get("a") is None
+    assert cache.clear() == 1
+
+def test_uncached_methods(cache):
+    assert cache.is_cacheable("extract_jd")
+    assert not cache.is_cacheable(None)
+    assert not LLMResponseCache(db_path=cache.db_path, uncached_methods={"x"}).is_cacheable("x")
+
+def test_fallback_decodes_are_not_clean():
+    call = LLMCall("m", "", "", 0.3, json_decoder(fallback=dict))
+    assert call.decode_reply('{"a": 1}') == ({"a": 1}, True)
+    assert call.decode_reply("not json") == ({}, False)
+    strict = LLMCall("m", "", "", 0.3, json_decoder())
+    with pytest.raises(Exception):
+        strict.decode_reply("not json")
+
+def test_repaired_replies_are_not_clean():
+    call = LLMCall("m", "", "", 0.3, json_decoder(fallback=dict))
+    value, clean = call.decode_reply('{"a": 1, "b": [1, 2')
+    assert value == {"a": 1, "b": [1]}  # a trailing number may itself be cut off
+    assert not clean
+
+def test_cache_key_includes_response_format():
+    from ai.cache import make_cache_key
+    plain = make_cache_key("m", "rewrite_bullet", "s", "u", 0.4)
+    json_mode = make_cache_key("m", "rewrite_bullet", "s", "u", 0.4, {"type": "json_object"})
+    assert plain != json_mode
+    assert json_mode == make_cache_key("m", "rewrite_bullet", "s", "u", 0.4, {"type": "json_object"})
+
+def test_repair_rewrites_bypass_the_cache():
+    from ai.prompts import rewrite_bullet_call, rewrite_bullets_batch_call
+    assert rewrite_bullet_call("Did things", {"max_length": 100}, {}).cacheable
+    assert not rewrite_bullet_call("Did things", {"fix_violations": ["Too long"]}, {}).cacheable
+    assert rewrite_bullets_batch_call([{"id": "0", "bullet": "Did things"}], {}, {}).cacheable
+    repair = [{"id": "0", "bullet": "Did things", "constraints": {"fix_violations": ["Too long"]}}]
+    assert not rewrite_bullets_batch_call(repair, {}, {}).cacheable
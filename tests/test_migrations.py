@@ -0,0 +1,134 @@
+import hashlib
+import json
+import sqlite3
+import pytest
+from storage import migrations
+from storage.migrations import MIGRATIONS, run_migrations, get_schema_version
+
+# Schema created by init_database before versioned migrations existed
+BASELINE_SCHEMA = """
+CREATE TABLE users_profile (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, city_country TEXT, email TEXT, phone TEXT,
+    linkedin_url TEXT, github_url TEXT, portfolio_url TEXT, other_platforms_json TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, company TEXT, link TEXT, jd_text TEXT,
+    status TEXT DEFAULT 'Saved', tags_json TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_jobs_updated_at ON jobs(updated_at DESC);
+CREATE TABLE resume_sources (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, file_path TEXT, raw_text TEXT, parsed_json TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE job_analysis (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER NOT NULL, jd_extract_json TEXT,
+    evidence_map_json TEXT, score_breakdown_json TEXT, rewrite_plan_json TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+CREATE TABLE job_assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER NOT NULL, resume_versions_json TEXT,
+    cover_letter_versions_json TEXT, roadmap_json TEXT, interview_pack_json TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+CREATE TABLE practice_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER, mode TEXT, transcript_json TEXT,
+    rubric_scores_json TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+CREATE TABLE coding_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER, problem_json TEXT, attempt_code TEXT,
+    test_results_json TEXT, feedback_json TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+CREATE TABLE app_settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+PARSED = {"experience": [{"company": "Acme", "role": "Engineer", "bullets": ["Built  the API", "Cut latency 40%"]}],
+          "projects": [{"title": "Tool", "bullets": ["Wrote a CLI"]}]}
+
+@pytest.fixture
+def baseline_db(tmp_path, monkeypatch):
+    from storage import db as storage_db
+    path = str(tmp_path / "baseline.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO jobs (title, company, jd_text, tags_json) VALUES ('Backend Engineer', 'Acme', 'Python APIs', '[\"remote\", \"python\"]')")
+    conn.execute("INSERT INTO job_analysis (job_id, jd_extract_json) VALUES (1, '{\"role_title\": \"old\"}')")
+    conn.execute("INSERT INTO job_analysis (job_id, score_breakdown_json) VALUES (1, '{\"final_score\": 70}')")
+    conn.execute("INSERT INTO job_assets (job_id, resume_versions_json, cover_letter_versions_json) VALUES (1, ?, ?)",
+                 (json.dumps([{"label": "v1"}, {"label": "v2"}]), json.dumps([{"tone": "formal", "text": "Dear team"}])))
+    for created_at, parsed in (("2024-01-01", None), ("2024-02-01", json.dumps(PARSED))):
+        conn.execute("INSERT INTO resume_sources (raw_text, parsed_json, created_at) VALUES ('same resume', ?, ?)",
+                     (parsed, created_at))
+    conn.execute("INSERT INTO resume_sources (raw_text, parsed_json) VALUES ('other resume', NULL)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(storage_db, "DB_PATH", path)
+    yield storage_db
+    storage_db.close_connection_pool()
+
+def test_baseline_database_migrates_to_latest(baseline_db):
+    baseline_db.init_database()
+    with baseline_db.get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        assert get_schema_version(cursor) == MIGRATIONS[-1][0] == 7
+        # 1: version blobs moved to their tables
+        assert [r[0] for r in conn.execute("SELECT label FROM resume_versions ORDER BY id")] == ["v1", "v2"]
+        assert conn.execute("SELECT text FROM cover_letter_versions").fetchone()[0] == "Dear team"
+        # 2: duplicate job_analysis rows merged
+        rows = conn.execute("SELECT jd_extract_json, score_breakdown_json FROM job_analysis").fetchall()
+        assert len(rows) == 1 and rows[0][0] and rows[0][1]
+        # 3 and 4: search index and tag table backfilled
+        assert conn.execute("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'python'").fetchone()[0] == 1
+        assert sorted(r[0] for r in conn.execute("SELECT tag FROM job_tags")) == ["python", "remote"]
+        # 5: bullet records backfilled, new column present
+        bullets = conn.execute("SELECT section, entry_index, bullet_index, text, content_hash FROM resume_bullets "
+                               "ORDER BY section, entry_index, bullet_index").fetchall()
+        assert [tuple(b)[:4] for b in bullets] == [("experience", 0, 0, "Built  the API"), ("experience", 0, 1, "Cut latency 40%"),
+                                                   ("projects", 0, 0, "Wrote a CLI")]
+        assert "resume_fingerprint" in {r[1] for r in conn.execute("PRAGMA table_info(job_analysis)")}
+        # 6: duplicate resumes merged on content hash, newest row kept with its parse
+        resumes = conn.execute("SELECT raw_text, content_hash, parsed_json FROM resume_sources ORDER BY id").fetchall()
+        assert [r[0] for r in resumes] == ["same resume", "other resume"]
+        assert resumes[0][1] == hashlib.sha256(b"same resume").hexdigest()
+        assert json.loads(resumes[0][2]) == PARSED
+        # 7: leases carry a token and the leader's result
+        assert {"token", "done", "result"} <= {r[1] for r in conn.execute("PRAGMA table_info(request_leases)")}
+
+def test_frozen_bullet_rows_match_current_records(baseline_db):
+    from core.incremental import bullet_records
+    frozen = [row[1:] for row in migrations._bullet_rows(7, PARSED)]
+    current = [(r["section"], r["entry_index"], r["bullet_index"], r["text"], r["content_hash"]) for r in bullet_records(PARSED)]
+    assert frozen == current
+
+def test_migrating_again_is_a_no_op(baseline_db):
+    baseline_db.init_database()
+    baseline_db.init_database()
+    with baseline_db.get_db_connection(readonly=True) as conn:
+        assert get_schema_version(conn.cursor()) == 7
+        assert conn.execute("SELECT COUNT(*) FROM resume_versions").fetchone()[0] == 2
+
+def test_failed_migration_rolls_back_and_retries(baseline_db, monkeypatch):
+    def broken(cursor):
+        migrations._add_bullet_records(cursor)
+        raise RuntimeError("crash after ALTER TABLE")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m if m[0] != 5 else (5, m[1], broken) for m in MIGRATIONS])
+    with pytest.raises(RuntimeError):
+        baseline_db.init_database()
+    with baseline_db.get_db_connection(readonly=True) as conn:
+        assert get_schema_version(conn.cursor()) == 4
+        assert "resume_fingerprint" not in {r[1] for r in conn.execute("PRAGMA table_info(job_analysis)")}
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+    baseline_db.init_database()
+    with baseline_db.get_db_connection(readonly=True) as conn:
+        assert get_schema_version(conn.cursor()) == 7
+
+def test_add_column_is_idempotent(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "x.db"))
+    conn.execute("CREATE TABLE t (a TEXT)")
+    migrations._add_column(conn.cursor(), "t", "b", "TEXT")
+    migrations._add_column(conn.cursor(), "t", "b", "TEXT")
+    assert [r[1] for r in conn.execute("PRAGMA table_info(t)")] == ["a", "b"]
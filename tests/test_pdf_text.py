@@ -0,0 +1,72 @@
+import io
+import os
+import threading
+import time
+import pytest
+
+pypdf = pytest.importorskip("pypdf")
+from core.pdf_text import PdfTextExtractor, PdfExtractionError
+
+
+def _pdf_bytes(pages=1):
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def extractor():
+    extractor = PdfTextExtractor(workers=2, timeout=3)
+    yield extractor
+    extractor.close()
+
+
+def test_small_pdf_is_extracted_in_one_round_trip(extractor, tmp_path, monkeypatch):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(_pdf_bytes(3))
+    from core import pdf_text
+    counted = []
+    monkeypatch.setattr(pdf_text, "_count_pages", lambda *a: counted.append(1) or 3)
+    assert extractor.extract(str(path)) == "\n\n\n"
+    assert counted == []
+    assert extractor.stats.stats()["pages"] == 3
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_timeout_does_not_strand_other_extractions(extractor, tmp_path):
+    # A FIFO nobody writes to blocks its worker like a pathological PDF
+    stuck, slow = str(tmp_path / "stuck.pdf"), str(tmp_path / "slow.pdf")
+    os.mkfifo(stuck)
+    os.mkfifo(slow)
+    extractor.extract(str(_write(tmp_path / "warm.pdf")))  # start the pool so spawn time does not count
+    outcomes = {}
+
+    def run(name, path):
+        try:
+            outcomes[name] = extractor.extract(path, sha256=name)
+        except PdfExtractionError as e:
+            outcomes[name] = e
+
+    first = threading.Thread(target=run, args=("stuck", stuck))
+    first.start()
+    time.sleep(1)
+    second = threading.Thread(target=run, args=("slow", slow))
+    second.start()
+    first.join()  # times out while "slow" is still waiting on its worker
+    # Fails (ENXIO) instead of blocking if the timeout killed the worker reading "slow"
+    fd = os.open(slow, os.O_WRONLY | os.O_NONBLOCK)
+    with os.fdopen(fd, "wb") as f:
+        f.write(_pdf_bytes(2))
+    second.join()
+
+    assert isinstance(outcomes["stuck"], PdfExtractionError)
+    assert outcomes["slow"] == "\n\n"
+    assert extractor.stats.stats()["timeouts"] == 1
+
+
+def _write(path):
+    path.write_bytes(_pdf_bytes(1))
+    return path
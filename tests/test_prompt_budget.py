@@ -0,0 +1,49 @@
+import json
+from ai import prompt_budget
+from ai.prompt_budget import render_sections, estimate_tokens, TOKEN_BUDGETS
+
+
+def _resume(entries, bullets):
+    return {"experience": [{"role": f"Role {e}", "bullets": [f"Built system {e}-{b} with Python and Kafka" * 2
+                                                            for b in range(bullets)]}
+                           for e in range(entries)]}
+
+
+def test_under_budget_sections_are_sent_whole():
+    resume = _resume(2, 3)
+    rendered = render_sections("rewrite_bullet", {"context": resume}, {"context": resume})
+    assert json.loads(rendered["context"]) == resume
+
+
+def test_over_budget_sections_keep_leading_items_within_budget():
+    resume = _resume(40, 12)
+    jd = {"must_have_skills": ["Python", "Kafka"]}
+    rendered = render_sections("build_evidence_map", {"resume": resume, "jd": jd}, {"resume": resume, "jd": jd},
+                               protect=("jd",))
+
+    assert sum(estimate_tokens(t) for t in rendered.values()) <= TOKEN_BUDGETS["build_evidence_map"]
+    kept = json.loads(rendered["resume"])["experience"]
+    assert kept[0] == {"role": "Role 0", "bullets": resume["experience"][0]["bullets"][:len(kept[0]["bullets"])]}
+    # The cut is close to the budget, not far below it
+    assert sum(estimate_tokens(t) for t in rendered.values()) > 0.9 * TOKEN_BUDGETS["build_evidence_map"]
+    assert json.loads(rendered["jd"]) == jd
+
+
+def test_trimming_measures_a_bounded_number_of_candidates(monkeypatch):
+    calls = []
+    original = prompt_budget.estimate_tokens
+    monkeypatch.setattr(prompt_budget, "estimate_tokens", lambda text: calls.append(1) or original(text))
+    resume = _resume(200, 20)
+    render_sections("build_evidence_map", {"resume": resume}, {"resume": resume})
+    assert len(calls) <= 1 + prompt_budget._TRIM_SEARCH_STEPS + 1
+
+
+def test_baseline_is_only_built_when_tracked(monkeypatch):
+    built = []
+    monkeypatch.setattr(prompt_budget, "TRACK_BASELINE", False)
+    prompt_budget.PromptStats().record("m", lambda: built.append(1) or "x", "y", False)
+    assert not built
+    monkeypatch.setattr(prompt_budget, "TRACK_BASELINE", True)
+    stats = prompt_budget.PromptStats()
+    stats.record("m", lambda: built.append(1) or "x" * 40, "y", False)
+    assert built and stats.stats()["tokens_saved"] > 0
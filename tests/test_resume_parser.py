@@ -0,0 +1,36 @@
+from core.resume_parser import sectionize_resume, merge_llm_parse
+
+RESUME = """Jane Doe
+jane@example.com | Austin, TX
+
+EXPERIENCE
+Software Engineer | Acme Corp | Jan 2022 - Present
+- Built Kafka streaming pipelines
+
+INTERNSHIPS
+Globex Summer Program 2021
+- Wrote ETL jobs in Python
+"""
+
+
+def test_ambiguous_section_keeps_clean_entries_of_the_same_field():
+    local = sectionize_resume(RESUME)
+
+    assert local.ambiguous == {"experience"}
+    assert "INTERNSHIPS" in local.llm_text and "Acme Corp" not in local.llm_text
+
+    llm = {"experience": [{"company": "Globex", "role": "Intern", "dates": "2021", "bullets": ["Wrote ETL jobs in Python"]}]}
+    merged = merge_llm_parse(local, llm)
+
+    assert [e["company"] for e in merged["experience"]] == ["Acme Corp", "Globex"]
+    assert merged["identity"]["name"] == "Jane Doe"
+
+
+def test_partial_parse_of_an_ambiguous_section_is_not_duplicated():
+    text = RESUME.replace("Globex Summer Program 2021", "Data Intern | Initech | 2020\n- Cleaned data\n\nGlobex Summer Program 2021")
+    local = sectionize_resume(text)
+
+    # Initech parsed cleanly but shares a span with the ambiguous entry, so only the LLM reports it
+    assert [e["company"] for e in local.parse["experience"]] == ["Acme Corp"]
+    merged = merge_llm_parse(local, {"experience": [{"company": "Initech"}, {"company": "Globex"}]})
+    assert [e["company"] for e in merged["experience"]] == ["Acme Corp", "Initech", "Globex"]
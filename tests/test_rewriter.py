@@ -0,0 +1,65 @@
+import asyncio
+from core.rewriter import rewrite_bullets, rewrite_bullets_async
+
+GOOD = "Built streaming pipelines with Kafka"
+BAD = "streaming stuff"
+
+
+class FakeProvider:
+    """Replies from a script: one {id: bullet} dict per rewrite_bullets_batch call"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def rewrite_bullets_batch(self, bullets, constraints, context):
+        self.requests.append(bullets)
+        return self.replies.pop(0) if self.replies else {}
+
+    def rewrite_bullet(self, bullet, constraints, context):
+        raise AssertionError("repairs must go through rewrite_bullets_batch")
+
+
+class AsyncFakeProvider(FakeProvider):
+    async def rewrite_bullets_batch(self, bullets, constraints, context):
+        return FakeProvider.rewrite_bullets_batch(self, bullets, constraints, context)
+
+
+RULES = {"required_keywords": ["Kafka"], "must_start_with_action_verb": True}
+BULLETS = [{"id": i, "bullet": BAD} for i in range(3)]
+
+
+def test_failing_bullets_are_repaired_in_one_call_per_round():
+    provider = FakeProvider([
+        {"0": GOOD, "1": BAD, "2": BAD},
+        {"1": GOOD, "2": BAD},
+        {"2": GOOD},
+    ])
+    result = rewrite_bullets(BULLETS, RULES, {}, provider, max_attempts=2)
+
+    assert result["calls"] == 3
+    assert result["invalid"] == 0
+    assert [b["attempts"] for b in result["bullets"]] == [1, 2, 3]
+    assert [entry["id"] for entry in provider.requests[1]] == ["1", "2"]
+    assert [entry["id"] for entry in provider.requests[2]] == ["2"]
+    assert provider.requests[1][0]["constraints"]["fix_violations"]
+
+
+def test_repair_rounds_stop_at_max_attempts_and_budget():
+    provider = FakeProvider([{}] * 10)
+    result = rewrite_bullets(BULLETS, RULES, {}, provider, max_attempts=3, repair_budget=4)
+
+    # Round one repairs all three bullets, round two only the one the budget still covers
+    assert result["calls"] == 3
+    assert [len(request) for request in provider.requests[1:]] == [3, 1]
+    assert result["invalid"] == 3
+    assert all(b["bullet"] == BAD for b in result["bullets"])
+
+
+def test_async_path_batches_repairs_too():
+    provider = AsyncFakeProvider([{"0": BAD, "1": GOOD, "2": BAD}, {"0": GOOD, "2": GOOD}])
+    result = asyncio.run(rewrite_bullets_async(BULLETS, RULES, {}, provider))
+
+    assert result["calls"] == 2
+    assert result["invalid"] == 0
+    assert [b["attempts"] for b in result["bullets"]] == [2, 1, 2]
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from storage import singleflight
+from storage.singleflight import _run_with_lease
+
+
+@pytest.fixture
+def leases(db, monkeypatch):
+    monkeypatch.setattr(singleflight, "POLL_INTERVAL_SECONDS", 0.02)
+    return db
+
+
+def _optimizer(job_id, calls):
+    """Stand-in for the optimize route: appends one resume version per run"""
+    from storage import queries
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        queries.add_resume_version(job_id, {"label": "Optimized", "source": "ai", "parsed": {}})
+        versions = queries.get_resume_versions(job_id)
+        return {"resume_versions": versions, "latest": versions[-1]}
+    return compute
+
+
+async def _two_workers(key, first, second):
+    # Each call contends for the lease row the way two uvicorn workers do (no shared in-process task)
+    leader = asyncio.ensure_future(_run_with_lease(key, first, 30))
+    await asyncio.sleep(0.05)
+    follower = asyncio.ensure_future(_run_with_lease(key, second, 30))
+    return await asyncio.gather(leader, follower, return_exceptions=True)
+
+
+def test_follower_on_another_worker_gets_the_leaders_result(leases):
+    from storage import queries
+    job_id = queries.create_job("Engineer")
+    calls = []
+    compute = _optimizer(job_id, calls)
+
+    leader, follower = asyncio.run(_two_workers(f"resume:optimize:{job_id}:", compute, compute))
+
+    assert len(calls) == 1
+    assert len(queries.get_resume_versions(job_id)) == 1
+    assert follower == leader
+
+
+def test_later_request_computes_again(leases):
+    from storage import queries
+    job_id = queries.create_job("Engineer")
+    calls = []
+    compute = _optimizer(job_id, calls)
+
+    asyncio.run(_run_with_lease("k", compute, 30))
+    asyncio.run(_run_with_lease("k", compute, 30))
+
+    assert len(calls) == 2
+    assert len(queries.get_resume_versions(job_id)) == 2
+
+
+def test_follower_computes_when_the_leader_fails(leases):
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise RuntimeError("LLM down")
+
+    async def working():
+        return {"ok": True}
+
+    leader, follower = asyncio.run(_two_workers("k", failing, working))
+
+    assert isinstance(leader, RuntimeError)
+    assert follower == {"ok": True}
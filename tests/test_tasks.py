@@ -0,0 +1,75 @@
+import asyncio
+from storage import queries, tasks
+
+def _age(db, task_id, seconds):
+    with db.get_db_connection() as conn:
+        conn.execute("UPDATE tasks SET updated_at = datetime('now', ?) WHERE id = ?", (f"-{seconds} seconds", task_id))
+
+def _job(db):
+    with db.get_db_connection() as conn:
+        return conn.execute("INSERT INTO jobs (title, company, jd_text) VALUES ('Engineer', 'Acme', 'JD')").lastrowid
+
+def test_requeue_stale_tasks_only_touches_old_running_rows(db):
+    job_id = _job(db)
+    stale = tasks.create_task("analysis", job_id)
+    fresh = tasks.create_task("analysis", job_id)
+    queued = tasks.create_task("analysis", job_id)
+    assert tasks.claim_next_task("w1")["id"] == stale
+    assert tasks.claim_next_task("w2")["id"] == fresh
+    _age(db, stale, 300)
+
+    assert tasks.requeue_stale_tasks(stale_after_seconds=120) == 1
+    assert tasks.get_task(stale)["status"] == "queued"
+    assert tasks.get_task(stale)["worker"] is None
+    assert tasks.get_task(fresh)["status"] == "running"
+    assert tasks.get_task(queued)["status"] == "queued"
+
+def test_requeue_fails_tasks_out_of_attempts(db):
+    task_id = tasks.create_task("analysis", _job(db))
+    for attempt in range(tasks.MAX_ATTEMPTS):
+        assert tasks.claim_next_task(f"w{attempt}")["id"] == task_id
+        _age(db, task_id, 300)
+        tasks.requeue_stale_tasks(stale_after_seconds=120)
+    task = tasks.get_task(task_id)
+    assert task["status"] == "failed"
+    assert task["attempts"] == tasks.MAX_ATTEMPTS
+
+def test_heartbeat_keeps_a_long_stage_from_being_requeued(db):
+    task_id = tasks.create_task("analysis", _job(db))
+    tasks.claim_next_task("w1")
+    _age(db, task_id, 300)
+    tasks.heartbeat_task(task_id)
+    assert tasks.requeue_stale_tasks(stale_after_seconds=120) == 0
+    assert tasks.get_task(task_id)["status"] == "running"
+
+def test_pool_runs_handler_and_records_progress(db):
+    async def handler(task, report):
+        await report("first")
+        await report("second")
+        return {"ok": task["params"]["n"]}
+
+    tasks.register_task_handler("test_kind", handler)
+    task_id = tasks.create_task("test_kind", _job(db), {"n": 3})
+
+    async def run():
+        pool = tasks.TaskWorkerPool(concurrency=1, poll_interval=0.05)
+        await pool.start()
+        try:
+            for _ in range(100):
+                if tasks.get_task(task_id)["status"] in tasks.TERMINAL_STATUSES:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+    task = tasks.get_task(task_id)
+    assert task["status"] == "succeeded"
+    assert task["result"] == {"ok": 3}
+    assert [(p["stage"], p["status"]) for p in task["progress"]] == [("first", "done"), ("second", "done")]
+
+def test_delete_job_removes_its_tasks(db):
+    job_id = _job(db)
+    task_id = tasks.create_task("analysis", job_id)
+    assert queries.delete_job(job_id)
+    assert tasks.get_task(task_id) is None
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI, UploadFile, File
+from fastapi.testclient import TestClient
+from storage.files import UploadSizeLimit
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"size": received[-1]}
+
+    app.add_middleware(UploadSizeLimit, paths=("/upload",), max_bytes=1000)
+    client = TestClient(app)
+    client.received = received
+    return client
+
+
+def test_small_upload_passes(client):
+    response = client.post("/upload", files={"file": ("cv.txt", b"x" * 200)})
+    assert response.status_code == 200 and response.json() == {"size": 200}
+
+
+def test_declared_oversized_body_is_refused_before_the_route(client):
+    response = client.post("/upload", files={"file": ("cv.txt", b"x" * 5000)})
+    assert response.status_code == 413
+    assert client.received == []
+
+
+def test_chunked_oversized_body_is_cut_off(client):
+    def chunks():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.txt\"\r\n\r\n"
+        for _ in range(50):
+            yield b"x" * 100
+
+    response = client.post("/upload", content=chunks(),
+                           headers={"content-type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    assert client.received == []
@@ -0,0 +1,84 @@
+import multiprocessing
+import numpy as np
+import pytest
+from core.vector_index import VectorIndex, text_vector
+
+TEXTS = ["python django rest apis", "kafka flink streaming pipelines", "react typescript frontend",
+         "kubernetes terraform aws infrastructure", "pytorch computer vision models"]
+
+
+def _write_rows(directory, worker, count):
+    index = VectorIndex(directory, "shared", dim=256)
+    for i in range(count):
+        index.upsert(f"{worker}-{i}", f"{TEXTS[i % len(TEXTS)]} {worker} {i}")
+
+
+def test_instances_see_each_others_writes(tmp_path):
+    a = VectorIndex(str(tmp_path), "jobs", dim=256)
+    b = VectorIndex(str(tmp_path), "jobs", dim=256)
+    a.upsert_many([(str(i), TEXTS[i % len(TEXTS)], None) for i in range(100)])  # grows past one capacity step
+    b.upsert("extra", "golang grpc microservices")
+
+    assert len(a) == len(b) == 101
+    assert a.search(text_vector("golang grpc microservices", 256), limit=1)[0][0] == "extra"
+    assert np.allclose(b.vector("7"), text_vector(TEXTS[2], 256))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_writers_do_not_lose_rows(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_rows, args=(str(tmp_path), w, 80)) for w in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+    assert all(worker.exitcode == 0 for worker in workers)
+
+    index = VectorIndex(str(tmp_path), "shared", dim=256)
+    assert len(index) == 240
+    for w in range(3):
+        for i in (0, 41, 79):
+            expected = text_vector(f"{TEXTS[i % len(TEXTS)]} {w} {i}", 256)
+            assert np.allclose(index.vector(f"{w}-{i}"), expected)
+
+
+@pytest.fixture
+def job_index(db, tmp_path, monkeypatch):
+    from storage import job_index
+    monkeypatch.setattr(job_index, "VECTOR_INDEX_DIR", str(tmp_path / "vector_index"))
+    monkeypatch.setattr(job_index, "_indexes", {})
+    monkeypatch.setattr(job_index, "_jobs_synced", None)
+    return job_index
+
+
+def test_similar_jobs_lists_matching_resume_bullets(job_index):
+    from storage import queries
+    data_id = queries.create_job("Data Engineer", jd_text="Build Kafka and Flink streaming pipelines in Python")
+    queries.create_job("Frontend Engineer", jd_text="React and TypeScript user interfaces")
+    parsed = {"experience": [{"role": "Engineer", "bullets": [
+        "Built Kafka streaming pipelines processing 2M events a day",
+        "Designed React dashboards for support staff",
+    ]}]}
+    resume_id = queries.save_resume_source(raw_text="resume", parsed_json=parsed)
+
+    results = job_index.similar_jobs(query_text="Kafka streaming pipelines", resume_id=resume_id)
+
+    assert results[0]["id"] == data_id
+    assert results[0]["matching_bullets"][0]["text"].startswith("Built Kafka")
+    assert len(job_index.get_bullet_index()) == 2
+    # Nothing changed: the next request skips the sync
+    assert job_index.ensure_job_index() is False
+    queries.create_job("Platform Engineer", jd_text="Kubernetes and Terraform")
+    assert job_index.ensure_job_index() is True
+    assert len(job_index.get_job_index()) == 3
+
+
+def test_bullet_index_drops_deleted_resumes(job_index):
+    from storage import queries
+    parsed = {"projects": [{"title": "Site", "bullets": ["Shipped a Django site"]}]}
+    resume_id = queries.save_resume_source(raw_text="resume", parsed_json=parsed)
+    assert job_index.sync_bullet_index()["embedded"] == 1
+
+    with job_index.get_db_connection() as conn:
+        conn.execute("DELETE FROM resume_sources WHERE id = ?", (resume_id,))
+    assert job_index.sync_bullet_index() == {"embedded": 0, "removed": 1, "size": 0}
@@ -36,12 +36,12 @@ def render_sidebar():
         st.markdown("### Jobs")
         
         from storage.queries import get_all_jobs
-        jobs = get_all_jobs()
+        jobs = get_all_jobs(limit=10, fields=["id", "title", "company"])
         
         if not jobs:
             st.markdown('<p style="color: #9ca3af; font-size: 0.875rem; padding: 1rem 0;">No jobs yet</p>', unsafe_allow_html=True)
         else:
-            for job in jobs[:10]:  # Show first 10
+            for job in jobs:  # 10 most recently updated
                 job_title = job.get("title", "Untitled")
                 company = job.get("company", "")
                 display_text = f"{job_title}"
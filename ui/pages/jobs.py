@@ -2,9 +2,14 @@
 Jobs List Page
 """
 import streamlit as st
-from storage.queries import get_all_jobs, create_job, delete_job
+from storage.queries import get_all_jobs, count_jobs, search_jobs, create_job, delete_job
 from ui.layout import render_top_bar, render_sidebar
 
+JOBS_PAGE_SIZE = 50
+
+# Snippet highlight markers (control characters never appear in pasted JD text)
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
 def render():
     """Render jobs list page"""
     render_top_bar()
@@ -46,10 +51,16 @@ def render():
                 st.session_state.show_new_job_form = False
                 st.rerun()
     
-    # Jobs list
-    jobs = get_all_jobs()
+    # Jobs list (search runs against the FTS index instead of filtering the full list)
+    search_term = st.text_input("Search jobs", placeholder="Search by title, company, skills...", key="job_search")
+    if search_term.strip():
+        jobs = search_jobs(search_term, limit=50, mark=(_MARK_OPEN, _MARK_CLOSE))["jobs"]
+    else:
+        jobs = get_all_jobs(limit=st.session_state.get("jobs_list_limit", JOBS_PAGE_SIZE))
     
-    if not jobs:
+    if not jobs and search_term.strip():
+        st.info("No jobs match your search.")
+    elif not jobs:
         st.markdown("""
         <div class="empty-state">
             <div class="empty-state-title">No jobs yet</div>
@@ -57,19 +68,8 @@ def render():
         </div>
         """, unsafe_allow_html=True)
     else:
-        # Search and filter
-        search_term = st.text_input("Search jobs", placeholder="Search by title, company...", key="job_search")
-        
-        # Filter jobs
-        filtered_jobs = jobs
-        if search_term:
-            search_lower = search_term.lower()
-            filtered_jobs = [j for j in jobs if 
-                            search_lower in j.get("title", "").lower() or 
-                            search_lower in j.get("company", "").lower()]
-        
         # Display jobs
-        for job in filtered_jobs:
+        for job in jobs:
             with st.container():
                 col1, col2, col3 = st.columns([3, 1, 1])
                 
@@ -77,6 +77,8 @@ def render():
                     st.markdown(f"### {job.get('title', 'Untitled')}")
                     if job.get('company'):
                         st.markdown(f"**{job['company']}**")
+                    if job.get('snippet'):
+                        st.caption(job['snippet'].replace(_MARK_OPEN, "**").replace(_MARK_CLOSE, "**"))
                     if job.get('status'):
                         status_colors = {
                             "Saved": "badge",
@@ -98,4 +100,8 @@ def render():
                         st.rerun()
                 
                 st.divider()
-
+        
+        if not search_term.strip() and len(jobs) < count_jobs():
+            if st.button("Show more"):
+                st.session_state.jobs_list_limit = len(jobs) + JOBS_PAGE_SIZE
+                st.rerun()
@@ -22,7 +22,7 @@ def check_dependencies():
         "openai": "openai",
         "pydantic": "pydantic",
         "reportlab": "reportlab",
-        "PyPDF2": "PyPDF2",
+        "pypdf": "pypdf",
         "python-dotenv": "dotenv",  # Import name is 'dotenv', not 'python-dotenv'
         "sqlalchemy": "sqlalchemy"
     }